@@ -0,0 +1,544 @@
+"""
+Formatos de armazenamento dos boletos do DDA
+
+- JSON (dda.json): formato original, {"data": [ {boleto}, ... ]}. Arquivos
+  grandes (acima de LIMITE_STREAMING) são lidos em streaming, um boleto por
+  vez, direto para arrays tipados por coluna.
+- Colunar (dda.colunar/): um arquivo .npy por coluna + manifest.json, carregado
+  com memory-map. Textos repetidos (cnpj, beneficiário, status) são codificados
+  em dicionário (códigos inteiros + lista de categorias). Como os arquivos são
+  abertos em modo somente leitura, vários processos compartilham a mesma cópia
+  no page cache do sistema operacional em vez de cada um manter um DataFrame
+  próprio.
+- Log de alterações (dda.delta.jsonl): eventos acrescentados ao longo do dia
+  (boletos novos e mudanças de status), aplicados por cima do JSON/colunar
+  até a próxima compactação. Quem acrescenta eventos e quem compacta o log
+  seguram a mesma trava de arquivo (dda.delta.jsonl.lock, ver trava_delta),
+  que vale também entre processos.
+
+Uso (conversão):
+    python armazenamento_dda.py [caminho/dda.json] [destino]
+"""
+import json
+import os
+import re
+import shutil
+import sys
+from array import array
+from contextlib import contextmanager
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+VERSAO_COLUNAR = 1
+ARQUIVO_MANIFEST = "manifest.json"
+
+# Colunas de texto com poucos valores distintos: sempre em dicionário
+COLUNAS_DICIONARIO = ("cnpj", "beneficiario", "status")
+
+# Código reservado para nulo (None/NaN) nas colunas em dicionário; é também o
+# código que o pd.Categorical.from_codes lê como valor ausente
+CODIGO_NULO = -1
+
+# Acima deste tamanho o dda.json é lido em streaming (ver ler_dataframe_json_streaming)
+LIMITE_STREAMING = 64 * 1024 * 1024  # 64 MB
+TAMANHO_BLOCO_STREAMING = 1024 * 1024  # 1 MB
+
+_ESPACOS = re.compile(r'[ \t\n\r]*')
+_VIRGULA = re.compile(r'[ \t\n\r]*,[ \t\n\r]*')
+
+
+def ler_dataframe_json(caminho):
+    """Faz o parse do dda.json para um DataFrame (em streaming se o arquivo for grande)"""
+    if os.path.getsize(caminho) > LIMITE_STREAMING:
+        return ler_dataframe_json_streaming(caminho)
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        json_data = json.load(f)
+
+    # Extrai a lista de boletos (array dentro de "data") e cria o DataFrame
+    df = pd.json_normalize(json_data["data"])
+    df['data_vencimento'] = pd.to_datetime(df['data_vencimento'])
+    return df
+
+
+class _LeitorJSON:
+    """Lê valores JSON de um arquivo em blocos, sem carregar o texto inteiro"""
+
+    def __init__(self, arquivo, tamanho_bloco):
+        self._arquivo = arquivo
+        self._tamanho_bloco = tamanho_bloco
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._fim_arquivo = False
+
+    def _ler_bloco(self):
+        bloco = self._arquivo.read(self._tamanho_bloco)
+        if not bloco:
+            self._fim_arquivo = True
+            return False
+        # Descarta o que já foi consumido antes de acrescentar o bloco novo
+        self._buffer = self._buffer[self._pos:] + bloco
+        self._pos = 0
+        return True
+
+    def proximo_caractere(self):
+        """Pula espaços e retorna o próximo caractere significativo (sem consumir)"""
+        while True:
+            self._pos = _ESPACOS.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._ler_bloco():
+                raise ValueError("Fim inesperado do arquivo JSON.")
+
+    def consumir(self, esperado):
+        caractere = self.proximo_caractere()
+        if caractere != esperado:
+            raise ValueError(f"JSON inválido: esperado '{esperado}', encontrado '{caractere}'.")
+        self._pos += 1
+
+    def valor(self):
+        """Decodifica o próximo valor JSON completo, lendo mais blocos se necessário"""
+        self.proximo_caractere()
+        while True:
+            try:
+                valor, fim = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fim_arquivo or not self._ler_bloco():
+                    raise
+                continue
+            # Um número no fim do buffer pode estar incompleto: confirma com mais texto
+            if fim == len(self._buffer) and not self._fim_arquivo and self._ler_bloco():
+                continue
+            self._pos = fim
+            return valor
+
+    def itens_do_array(self, chave):
+        """
+        Percorre, um a um, os itens do array em {"chave": [...]} (nível superior).
+
+        As vírgulas seguem o json.load: exatamente uma entre dois valores e
+        nenhuma antes de '}' ou ']'; qualquer outra coisa é ValueError.
+        """
+        self.consumir("{")
+        if self.proximo_caractere() == "}":
+            raise KeyError(chave)
+        while True:
+            nome = self.valor()
+            if not isinstance(nome, str):
+                raise ValueError("JSON inválido: nome de chave deve ser texto.")
+            self.consumir(":")
+            if nome == chave:
+                self.consumir("[")
+                yield from self._itens()
+                return
+            self.valor()  # outras chaves são ignoradas
+            if self.proximo_caractere() == "}":
+                raise KeyError(chave)
+            self.consumir(",")
+
+    def _separador(self):
+        """
+        Consome o que vem depois de um item: ',' seguida de espaços (retorna
+        True) ou o ']' que fecha o array (retorna False)
+        """
+        if self.proximo_caractere() == "]":
+            self._pos += 1
+            return False
+        self.consumir(",")
+        if self.proximo_caractere() in ",]":
+            raise ValueError(f"JSON inválido: '{self._buffer[self._pos]}' depois de ','.")
+        return True
+
+    def _itens(self):
+        """Itens até o ']' que fecha o array (laço principal do streaming)"""
+        decodificar = self._decoder.raw_decode
+        if self.proximo_caractere() == "]":
+            self._pos += 1
+            return
+        separar = False  # True logo depois de um item: falta o separador
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            if separar:
+                # Caminho rápido: vírgula e o início do próximo item no mesmo bloco
+                virgula = _VIRGULA.match(buffer, pos)
+                if virgula and virgula.end() < len(buffer) and buffer[virgula.end()] not in ",]":
+                    pos = virgula.end()
+                elif self._separador():  # fronteira de bloco ou JSON inválido (levanta ValueError)
+                    buffer, pos = self._buffer, self._pos
+                else:
+                    return
+                self._pos = pos
+                separar = False
+            try:
+                valor, fim = decodificar(buffer, pos)
+            except json.JSONDecodeError:
+                # Item cortado no fim do bloco: lê mais texto e tenta de novo
+                self._pos = pos
+                if self._fim_arquivo or not self._ler_bloco():
+                    raise
+                continue
+            if fim == len(buffer) and not self._fim_arquivo:
+                self._pos = pos
+                if self._ler_bloco():
+                    continue
+            self._pos = fim
+            separar = True
+            yield valor
+
+
+_TIPOS_NUMERICOS = {int, float, type(None)}
+_TIPOS_TEXTO = {str, type(None)}
+
+# Boletos decodificados por lote antes de irem para os arrays das colunas
+TAMANHO_LOTE_STREAMING = 10_000
+
+
+class _ColunaStreaming:
+    """
+    Acumula os valores de uma coluna em arrays tipados durante o streaming.
+
+    Números vão para um array de float64 (e voltam a int64 se todos forem
+    inteiros); textos são codificados em dicionário (código int32 por linha +
+    valores distintos). Colunas com tipos misturados caem para lista de objetos.
+    """
+
+    def __init__(self, linhas_anteriores=0):
+        self.tipo = None
+        self.numeros = array("d")
+        self.inteiros = True
+        self.tem_nulos = False
+        self.codigos = array("i")
+        self.categorias = {None: -1}
+        self.objetos = []
+        self.linhas = 0
+        if linhas_anteriores:
+            self.adicionar_lote([None] * linhas_anteriores)
+
+    def _para_objetos(self):
+        """Converte o que já foi acumulado para lista de objetos (tipos misturados)"""
+        if self.tipo == "texto":
+            valores = list(self.categorias)[1:]
+            self.objetos = [valores[codigo] if codigo >= 0 else None for codigo in self.codigos]
+        elif self.tipo == "numero":
+            self.objetos = [None if v != v else int(v) if self.inteiros else v for v in self.numeros]
+        else:
+            self.objetos = [None] * self.linhas
+        self.tipo = "objeto"
+        self.numeros, self.codigos, self.categorias = array("d"), array("i"), {None: -1}
+
+    def adicionar_lote(self, valores):
+        tipos = set(map(type, valores))
+        if self.tipo is None and tipos != {type(None)}:
+            if self.linhas:
+                # Até aqui só havia nulos: converte-os para o tipo da coluna
+                anteriores, self.linhas = [None] * self.linhas, 0
+                valores = anteriores + valores
+                tipos.add(type(None))
+            self.tipo = ("numero" if tipos <= _TIPOS_NUMERICOS else
+                         "texto" if tipos <= _TIPOS_TEXTO else "objeto")
+
+        if self.tipo is None:
+            pass
+        elif self.tipo == "numero" and tipos <= _TIPOS_NUMERICOS:
+            if type(None) in tipos:
+                valores = [float("nan") if v is None else v for v in valores]
+                self.tem_nulos = True
+            self.inteiros = self.inteiros and tipos <= {int, type(None)}
+            self.numeros.extend(valores)
+        elif self.tipo == "texto" and tipos <= _TIPOS_TEXTO:
+            for valor in set(valores).difference(self.categorias):
+                self.categorias[valor] = len(self.categorias) - 1
+            self.codigos.extend(map(self.categorias.__getitem__, valores))
+        else:
+            if self.tipo != "objeto":
+                self._para_objetos()
+            self.objetos.extend(valores)
+        self.linhas += len(valores)
+
+    def finalizar(self, converter_categorias=None):
+        """Array final da coluna; converter_categorias transforma os valores distintos (ex: datas)"""
+        if self.tipo is None:
+            return np.full(self.linhas, None, dtype=object)
+        if self.tipo == "numero":
+            valores = np.frombuffer(self.numeros, dtype=np.float64)
+            return valores.astype(np.int64) if self.inteiros and not self.tem_nulos else valores.copy()
+        if self.tipo == "objeto":
+            return np.array(self.objetos + [None], dtype=object)[:-1]
+
+        categorias = np.empty(len(self.categorias), dtype=object)
+        categorias[:-1] = list(self.categorias)[1:]
+        categorias[-1] = None  # código -1 (nulo) aponta para o último elemento
+        if converter_categorias is not None:
+            categorias = converter_categorias(categorias)
+        return categorias[np.frombuffer(self.codigos, dtype=np.int32)]
+
+
+def _achatar(registro, prefixo=""):
+    """Achata dicionários aninhados como o json_normalize (chaves 'a.b')"""
+    for chave, valor in registro.items():
+        if isinstance(valor, dict):
+            yield from _achatar(valor, f"{prefixo}{chave}.")
+        else:
+            yield f"{prefixo}{chave}", valor
+
+
+def _converter_datas(categorias):
+    return pd.to_datetime(pd.Series(categorias)).to_numpy()
+
+
+def _adicionar_lote(colunas, lote, linhas):
+    """Distribui um lote de boletos entre as colunas (criando as que ainda não existem)"""
+    lote = [dict(_achatar(registro)) if dict in map(type, registro.values()) else registro
+            for registro in lote]
+    for nome in dict.fromkeys(chain.from_iterable(lote)):
+        if nome not in colunas:
+            colunas[nome] = _ColunaStreaming(linhas)
+    for nome, coluna in colunas.items():
+        try:
+            valores = list(map(itemgetter(nome), lote))
+        except KeyError:
+            valores = [registro.get(nome) for registro in lote]
+        coluna.adicionar_lote(valores)
+
+
+def ler_dataframe_json_streaming(caminho, tamanho_bloco=TAMANHO_BLOCO_STREAMING):
+    """
+    Lê o dda.json em streaming, montando arrays tipados por coluna.
+
+    Apenas um bloco do texto e um lote de boletos decodificados ficam em
+    memória por vez, em vez do texto inteiro + lista de dicionários + cópia do
+    json_normalize. As datas de vencimento são convertidas uma vez por valor
+    distinto. O resultado é equivalente ao de ler_dataframe_json.
+    """
+    colunas = {}
+    linhas = 0
+    lote = []
+    with open(caminho, "r", encoding="utf-8") as f:
+        for registro in _LeitorJSON(f, tamanho_bloco).itens_do_array("data"):
+            lote.append(registro)
+            if len(lote) == TAMANHO_LOTE_STREAMING:
+                _adicionar_lote(colunas, lote, linhas)
+                linhas += len(lote)
+                lote = []
+    if lote:
+        _adicionar_lote(colunas, lote, linhas)
+
+    df = pd.DataFrame({
+        nome: coluna.finalizar(_converter_datas if nome == "data_vencimento" else None)
+        for nome, coluna in colunas.items()
+    })
+    if "data_vencimento" in df:
+        df['data_vencimento'] = pd.to_datetime(df['data_vencimento'])
+    return df
+
+
+def caminho_colunar(json_path):
+    """Diretório colunar correspondente a um JSON (dda.json -> dda.colunar/)"""
+    base, _ = os.path.splitext(json_path)
+    return base + ".colunar"
+
+
+def assinatura_arquivo(caminho):
+    """Assinatura (mtime, tamanho) usada para detectar alterações no arquivo"""
+    stat = os.stat(caminho)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def ler_manifest(destino):
+    """Lê o manifest de um diretório colunar, ou None se não existir"""
+    try:
+        with open(os.path.join(destino, ARQUIVO_MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def caminho_delta(json_path):
+    """Log de alterações correspondente a um JSON (dda.json -> dda.delta.jsonl)"""
+    base, _ = os.path.splitext(json_path)
+    return base + ".delta.jsonl"
+
+
+@contextmanager
+def trava_delta(caminho):
+    """
+    Trava exclusiva do log de alterações, entre processos (flock em <log>.lock).
+
+    A compactação lê o log, grava o JSON e remove o log segurando a trava;
+    quem acrescenta eventos espera, e nenhum evento cai entre a leitura e a
+    remoção. Sem fcntl (Windows) a trava não tem efeito.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(caminho + ".lock", "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def anexar_delta(caminho, eventos):
+    """Acrescenta eventos ao log de alterações (uma linha JSON por evento)"""
+    linhas = "".join(json.dumps(evento, ensure_ascii=False) + "\n" for evento in eventos)
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(linhas)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def ler_delta(caminho, posicao=0):
+    """
+    Lê os eventos do log a partir da posição (em bytes) informada.
+
+    Retorna (eventos, nova_posicao). Uma última linha incompleta (escrita em
+    andamento) é ignorada e será lida na próxima chamada.
+    """
+    try:
+        with open(caminho, "rb") as f:
+            f.seek(posicao)
+            conteudo = f.read()
+    except FileNotFoundError:
+        return [], 0
+
+    completo = conteudo[:conteudo.rfind(b"\n") + 1]
+    eventos = [json.loads(linha) for linha in completo.decode("utf-8").splitlines() if linha.strip()]
+    return eventos, posicao + len(completo)
+
+
+def salvar_json(df, caminho):
+    """Grava o DataFrame de boletos no formato do dda.json (escrita atômica)"""
+    df = df.copy()
+    df['data_vencimento'] = df['data_vencimento'].dt.strftime('%Y-%m-%d')
+    registros = df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({"data": registros}, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def colunar_atualizado(destino, json_path):
+    """
+    Indica se o diretório colunar pode ser usado no lugar do JSON.
+
+    É o caso quando o manifest existe e o JSON de origem não mudou desde a
+    conversão (ou o JSON não existe mais).
+    """
+    manifest = ler_manifest(destino)
+    if manifest is None or manifest.get("versao") != VERSAO_COLUNAR:
+        return False
+    if not os.path.exists(json_path):
+        return True
+    return tuple(manifest.get("origem", ())) == assinatura_arquivo(json_path)
+
+
+def _codificar_coluna(nome, serie):
+    """Retorna (array, metadados) para gravar uma coluna em .npy"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.to_numpy(dtype="datetime64[ns]"), {"codificacao": "data"}
+
+    if serie.dtype != object:
+        return serie.to_numpy(), {"codificacao": "numerico"}
+
+    # Nulos vão sempre para o dicionário, com o código reservado CODIGO_NULO:
+    # no texto de largura fixa None/NaN virariam as strings 'None'/'nan'
+    nulos = serie.isna().to_numpy()
+    distintos = serie.nunique(dropna=False)
+    if nome in COLUNAS_DICIONARIO or nulos.any() or distintos <= len(serie) // 2:
+        categorico = pd.Categorical(serie[~nulos])
+        codigos = np.full(len(serie), CODIGO_NULO, dtype=categorico.codes.dtype)
+        codigos[~nulos] = categorico.codes
+        return codigos, {
+            "codificacao": "dicionario",
+            "categorias": categorico.categories.tolist(),
+            "nulo": CODIGO_NULO
+        }
+
+    # Texto com alta cardinalidade e sem nulos (ex: id): largura fixa, sem dicionário
+    return serie.to_numpy(dtype=str), {"codificacao": "texto"}
+
+
+def salvar_colunar(df, destino, origem=None):
+    """
+    Grava o DataFrame no formato colunar.
+
+    As linhas devem estar na ordem em que serão usadas (o DatasetDDA grava já
+    ordenado por cnpj e vencimento). Os arquivos são escritos em um diretório
+    temporário e trocados no final, para que leitores nunca vejam um diretório
+    pela metade.
+    """
+    temporario = destino + ".tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    colunas = []
+    for nome in df.columns:
+        valores, metadados = _codificar_coluna(nome, df[nome])
+        arquivo = f"{nome}.npy"
+        np.save(os.path.join(temporario, arquivo), valores, allow_pickle=False)
+        colunas.append({"nome": nome, "arquivo": arquivo, **metadados})
+
+    np.save(os.path.join(temporario, "_indice.npy"), df.index.to_numpy(dtype=np.int64), allow_pickle=False)
+
+    manifest = {
+        "versao": VERSAO_COLUNAR,
+        "linhas": len(df),
+        "origem": list(origem) if origem is not None else None,
+        "colunas": colunas
+    }
+    with open(os.path.join(temporario, ARQUIVO_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(temporario, destino)
+    return destino
+
+
+def ler_dataframe_colunar(destino):
+    """
+    Carrega o formato colunar com memory-map, sem copiar as colunas numéricas,
+    de datas e os códigos dos dicionários.
+
+    Retorna um DataFrame somente leitura; apenas colunas de texto sem dicionário
+    (ex: id) são materializadas em memória.
+    """
+    manifest = ler_manifest(destino)
+    if manifest is None:
+        raise FileNotFoundError(f"Manifest não encontrado em: {destino}")
+
+    colunas = {}
+    for coluna in manifest["colunas"]:
+        valores = np.load(os.path.join(destino, coluna["arquivo"]), mmap_mode="r", allow_pickle=False)
+        match coluna["codificacao"]:
+            case "dicionario":
+                if coluna.get("nulo", CODIGO_NULO) != CODIGO_NULO:
+                    raise ValueError(f"Código de nulo inesperado na coluna {coluna['nome']}: {coluna['nulo']}")
+                categorias = pd.Index(coluna["categorias"], dtype=object)
+                colunas[coluna["nome"]] = pd.Categorical.from_codes(valores, categories=categorias)
+            case "texto":
+                colunas[coluna["nome"]] = valores.astype(object)
+            case _:
+                colunas[coluna["nome"]] = valores
+
+    indice = np.load(os.path.join(destino, "_indice.npy"), mmap_mode="r", allow_pickle=False)
+    return pd.DataFrame(colunas, index=pd.Index(indice, copy=False), copy=False)
+
+
+if __name__ == "__main__":
+    from queries_dda import converter_para_colunar
+
+    json_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "dda.json")
+    destino = converter_para_colunar(json_path, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"✅ Dados convertidos para o formato colunar em: {destino}")
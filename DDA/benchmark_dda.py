@@ -0,0 +1,258 @@
+"""
+Benchmarks das consultas do DDA
+
+Uso:
+    python benchmark_dda.py [num_boletos]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from boleto_dda import boletos_de_dataframe
+from armazenamento_dda import ler_dataframe_colunar, ler_dataframe_json_streaming
+from queries_dda import (
+    DatasetDDA,
+    converter_para_colunar,
+    boletos_do_dia,
+    boletos_no_dia,
+    boletos_por_vencimento,
+    boletos_vencidos_antes,
+    dash_intervalo,
+)
+
+CNPJ = "12.345.678/0001-90"
+
+
+def gerar_dataframe(num_boletos: int, num_cnpjs: int = 1, seed: int = 42) -> pd.DataFrame:
+    """Gera um DataFrame sintético no mesmo formato do dda.json"""
+    rng = np.random.default_rng(seed)
+    inicio = np.datetime64('2025-01-01')
+    dias = rng.integers(0, 365, size=num_boletos)
+
+    cnpjs = np.array([CNPJ] + [f"00.000.000/{i:04d}-00" for i in range(1, num_cnpjs)], dtype=object)
+
+    return pd.DataFrame({
+        "id": np.array([f"BOL{i:07d}" for i in range(num_boletos)], dtype=object),
+        "cnpj": cnpjs[rng.integers(0, num_cnpjs, size=num_boletos)],
+        "beneficiario": np.array([f"Fornecedor {i}" for i in rng.integers(0, 500, size=num_boletos)], dtype=object),
+        "valor": np.round(rng.uniform(50, 20000, size=num_boletos), 2),
+        "data_vencimento": pd.to_datetime(inicio + dias),
+        "multa": rng.choice([0.015, 0.02, 0.025], size=num_boletos),
+        "status": rng.choice(np.array(["PAGO", "NAO_PAGO"], dtype=object), size=num_boletos),
+    })
+
+
+def medir(func, repeticoes: int = 20) -> float:
+    """Retorna o melhor tempo (em ms) entre as repetições"""
+    return min(timeit.repeat(func, number=1, repeat=repeticoes)) * 1000
+
+
+def imprimir_resultado(nome: str, tempo_antes: float, tempo_depois: float):
+    print(f"{nome:<28} antes: {tempo_antes:9.3f} ms   depois: {tempo_depois:9.3f} ms   "
+          f"speedup: {tempo_antes / tempo_depois:7.1f}x")
+
+
+def benchmark_fatias_vencimento(num_boletos: int):
+    """Compara máscaras booleanas com as fatias por busca binária"""
+    print(f"\n📅 Consultas por vencimento ({num_boletos:,} boletos de um CNPJ)")
+    dataset = DatasetDDA(gerar_dataframe(num_boletos))
+    boletos = dataset.boletos_do_cnpj(CNPJ)
+    venc = boletos['data_vencimento']
+
+    dia = pd.Timestamp('2025-06-15')
+    inicio, fim = pd.Timestamp('2025-03-01'), pd.Timestamp('2025-03-31')
+    hoje = pd.Timestamp('2025-09-01')
+
+    assert boletos_no_dia(boletos, dia).index.equals(boletos[venc == dia].index)
+
+    imprimir_resultado(
+        "dia (== dia)",
+        medir(lambda: boletos[venc == dia]),
+        medir(lambda: boletos_no_dia(boletos, dia)),
+    )
+    imprimir_resultado(
+        "intervalo (>= & <=)",
+        medir(lambda: boletos[(venc >= inicio) & (venc <= fim)]),
+        medir(lambda: boletos_por_vencimento(boletos, inicio, fim)),
+    )
+    imprimir_resultado(
+        "vencidos (< hoje)",
+        medir(lambda: boletos[venc < hoje]),
+        medir(lambda: boletos_vencidos_antes(boletos, hoje)),
+    )
+
+
+def _boletos_do_dia_iterrows(df, cnpj, dia):
+    """Implementação anterior de boletos_do_dia (iterrows), usada como referência"""
+    dia = pd.to_datetime(dia)
+    hoje = pd.Timestamp.now().normalize()
+    df_cnpj = df[df['cnpj'] == cnpj]
+
+    boletos_hoje = df_cnpj[df_cnpj['data_vencimento'] == dia].copy()
+    vencidos = df_cnpj[df_cnpj['data_vencimento'] < hoje].copy()
+    boletos_hoje['data_str'] = boletos_hoje['data_vencimento'].dt.strftime('%Y-%m-%d')
+    vencidos['data_str'] = vencidos['data_vencimento'].dt.strftime('%Y-%m-%d')
+
+    overview = {
+        "total_boletos_no_dia": len(boletos_hoje),
+        "total_boletos_vencidos": len(vencidos),
+        "valor_total_no_dia": boletos_hoje['valor'].sum(),
+        "valor_total_vencidos": vencidos['valor'].sum()
+    }
+
+    boletos_dict = {}
+    for idx, row in boletos_hoje.iterrows():
+        boletos_dict[f"Boleto_{idx}"] = {
+            "empresa": row['cnpj'],
+            "beneficiario": row.get('beneficiario', 'Não informado'),
+            "valor": row['valor'],
+            "juros": 0,
+            "data_vencimento": row['data_str']
+        }
+    return overview, boletos_dict
+
+
+def benchmark_boletos_do_dia(num_boletos: int, boletos_no_dia_movimentado: int = 5_000):
+    """Compara a montagem do boletos_dict via iterrows com a versão por colunas"""
+    print(f"\n🗓️ boletos_do_dia em dia movimentado ({boletos_no_dia_movimentado:,} boletos no dia)")
+    df = gerar_dataframe(num_boletos)
+    dia = pd.Timestamp('2025-06-06')  # 5º dia útil
+    df.loc[df.index[:boletos_no_dia_movimentado], 'data_vencimento'] = dia
+    dataset = DatasetDDA(df)
+
+    # Mesma ordem de linhas nas duas versões, para que as somas batam exatamente
+    assert _boletos_do_dia_iterrows(dataset.df, CNPJ, dia) == boletos_do_dia(dataset, CNPJ, dia)
+
+    imprimir_resultado(
+        "boletos_do_dia",
+        medir(lambda: _boletos_do_dia_iterrows(dataset.df, CNPJ, dia), repeticoes=3),
+        medir(lambda: boletos_do_dia(dataset, CNPJ, dia), repeticoes=3),
+    )
+
+
+def _dias_por_groupby(df, cnpj, inicio, fim):
+    """Contagem e soma por dia com groupby sobre o período (implementação anterior)"""
+    df_cnpj = df[df['cnpj'] == cnpj]
+    df_periodo = df_cnpj[(df_cnpj['data_vencimento'] >= inicio) & (df_cnpj['data_vencimento'] <= fim)].copy()
+    df_periodo['data_vencimento_str'] = df_periodo['data_vencimento'].dt.strftime('%Y-%m-%d')
+    count_por_dia = df_periodo.groupby('data_vencimento_str').size().sort_values(ascending=False).head(3)
+    valor_por_dia = df_periodo.groupby('data_vencimento_str')['valor'].sum().sort_values(ascending=False).head(3)
+    return count_por_dia.to_dict(), valor_por_dia.to_dict()
+
+
+def benchmark_dash_intervalo(num_boletos: int):
+    """Compara os totais por dia via groupby com o agregado diário pré-calculado"""
+    print(f"\n📊 dash_intervalo (ano inteiro, {num_boletos:,} boletos)")
+    dataset = DatasetDDA(gerar_dataframe(num_boletos))
+    inicio, fim = pd.Timestamp('2025-01-01'), pd.Timestamp('2025-12-31')
+
+    dash = dash_intervalo(dataset, CNPJ, inicio, fim)
+    assert (dash["dias_com_mais_boletos"], dash["dias_com_maior_valor"]) == _dias_por_groupby(dataset.df, CNPJ, inicio, fim)
+
+    imprimir_resultado(
+        "dias do intervalo",
+        medir(lambda: _dias_por_groupby(dataset.df, CNPJ, inicio, fim), repeticoes=3),
+        medir(lambda: dash_intervalo(dataset, CNPJ, inicio, fim), repeticoes=3),
+    )
+
+
+def _ler_dataframe_json_load(caminho):
+    """json.load + json_normalize sempre, sem o desvio para streaming; usada como referência"""
+    with open(caminho, "r", encoding="utf-8") as f:
+        json_data = json.load(f)
+    df = pd.json_normalize(json_data["data"])
+    df['data_vencimento'] = pd.to_datetime(df['data_vencimento'])
+    return df
+
+
+def benchmark_carregamento(num_boletos: int):
+    """Compara o carregamento do dda.json com o do formato colunar (memory-map)"""
+    print(f"\n💾 Carregamento do dataset ({num_boletos:,} boletos)")
+    df = gerar_dataframe(num_boletos, num_cnpjs=50)
+    df['data_vencimento'] = df['data_vencimento'].dt.strftime('%Y-%m-%d')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'dda.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"data": df.to_dict(orient='records')}, f)
+
+        inicio = time.perf_counter()
+        destino = converter_para_colunar(json_path)
+        print(f"conversão JSON -> colunar: {(time.perf_counter() - inicio) * 1000:9.1f} ms")
+
+        imprimir_resultado(
+            "carregar dataset",
+            medir(lambda: DatasetDDA(_ler_dataframe_json_load(json_path)), repeticoes=3),
+            medir(lambda: DatasetDDA(ler_dataframe_colunar(destino), ordenado=True), repeticoes=3),
+        )
+
+
+def _medir_pico_memoria(func):
+    """Retorna (tempo em ms, pico de memória alocada em MB) de uma execução"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    func()
+    tempo = (time.perf_counter() - inicio) * 1000
+    pico = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return tempo, pico
+
+
+def benchmark_streaming(num_boletos: int):
+    """Compara json.load + json_normalize com a leitura em streaming (tempo e pico de memória)"""
+    print(f"\n🌊 Leitura do dda.json em streaming ({num_boletos:,} boletos)")
+    df = gerar_dataframe(num_boletos, num_cnpjs=50)
+    df['data_vencimento'] = df['data_vencimento'].dt.strftime('%Y-%m-%d')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'dda.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"data": df.to_dict(orient='records')}, f)
+        del df
+
+        pd.testing.assert_frame_equal(ler_dataframe_json_streaming(json_path), _ler_dataframe_json_load(json_path))
+
+        print(f"arquivo: {os.path.getsize(json_path) / 1024 / 1024:.1f} MB")
+        for nome, func in (("json.load", _ler_dataframe_json_load), ("streaming", ler_dataframe_json_streaming)):
+            tempo, pico = _medir_pico_memoria(lambda: func(json_path))
+            print(f"{nome:<28} tempo: {tempo:9.1f} ms   pico de memória: {pico:8.1f} MB")
+
+
+def benchmark_registros_boletos(num_boletos: int):
+    """Compara to_dict(orient='records') com a lista de Boleto (tempo e memória)"""
+    print(f"\n🧾 Registros de boletos em aberto ({num_boletos:,} boletos)")
+    df = gerar_dataframe(num_boletos)
+
+    def registros_dict():
+        copia = df.copy()
+        copia['data_vencimento'] = copia['data_vencimento'].dt.strftime('%Y-%m-%d')
+        return copia.to_dict(orient='records')
+
+    assert boletos_de_dataframe(df.head(100)) == registros_dict()[:100]
+
+    for nome, func in (("dicts (to_dict)", registros_dict), ("Boleto (__slots__)", lambda: boletos_de_dataframe(df))):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        registros = func()
+        tempo = (time.perf_counter() - inicio) * 1000
+        memoria = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+        tracemalloc.stop()
+        del registros
+        print(f"{nome:<28} tempo: {tempo:9.1f} ms   memória retida: {memoria:8.1f} MB")
+
+
+if __name__ == "__main__":
+    num_boletos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    benchmark_fatias_vencimento(num_boletos)
+    benchmark_boletos_do_dia(num_boletos)
+    benchmark_dash_intervalo(num_boletos)
+    benchmark_carregamento(num_boletos)
+    benchmark_streaming(num_boletos)
+    benchmark_registros_boletos(num_boletos)
@@ -0,0 +1,150 @@
+"""
+Representação compacta de um boleto do DDA
+
+Boleto guarda os campos em __slots__ (sem dicionário por instância):
+- valor em centavos (inteiro, ponto fixo)
+- vencimento como número de dias desde 1970-01-01
+- beneficiário, CNPJ e status internados (uma única string por valor distinto)
+
+Para o restante do sistema ele se comporta como o dict de antes
+(boleto['valor'], boleto.get('beneficiario'), boleto.keys(), == dict), então
+quem consome os boletos não precisa mudar.
+"""
+import sys
+from collections.abc import Mapping
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+EPOCA = date(1970, 1, 1)
+
+# Ordem dos campos no dda.json (mesma ordem de to_dict)
+CAMPOS = ("id", "cnpj", "beneficiario", "valor", "data_vencimento", "multa", "status")
+
+
+@lru_cache(maxsize=4096)
+def data_iso(vencimento_dia):
+    """Dias desde 1970-01-01 -> 'YYYY-MM-DD' (poucas datas distintas, por isso o cache)"""
+    return (EPOCA + timedelta(days=vencimento_dia)).isoformat()
+
+
+class Boleto(Mapping):
+    """Boleto do DDA com acesso no estilo dict"""
+
+    __slots__ = ("id", "cnpj", "beneficiario", "valor_centavos", "vencimento_dia", "multa", "status", "extras")
+
+    def __init__(self, id, cnpj, beneficiario, valor_centavos, vencimento_dia, multa=None, status=None, extras=None):
+        self.id = id
+        self.cnpj = cnpj
+        self.beneficiario = beneficiario
+        self.valor_centavos = valor_centavos
+        self.vencimento_dia = vencimento_dia
+        self.multa = multa
+        self.status = status
+        # Colunas além das do dda.json (None quando não há)
+        self.extras = extras
+
+    @property
+    def valor(self):
+        return self.valor_centavos / 100 if self.valor_centavos is not None else None
+
+    @property
+    def vencimento(self):
+        """Data de vencimento como datetime.date"""
+        return EPOCA + timedelta(days=self.vencimento_dia) if self.vencimento_dia is not None else None
+
+    @property
+    def data_vencimento(self):
+        return data_iso(self.vencimento_dia) if self.vencimento_dia is not None else None
+
+    def __getitem__(self, chave):
+        match chave:
+            case "valor":
+                return self.valor
+            case "data_vencimento":
+                return self.data_vencimento
+            case "id" | "cnpj" | "beneficiario" | "multa" | "status":
+                return getattr(self, chave)
+        if self.extras is not None and chave in self.extras:
+            return self.extras[chave]
+        raise KeyError(chave)
+
+    def __iter__(self):
+        yield from CAMPOS
+        if self.extras is not None:
+            yield from self.extras
+
+    def __len__(self):
+        return len(CAMPOS) + (len(self.extras) if self.extras is not None else 0)
+
+    def to_dict(self):
+        """Cópia em dict simples (ex: para serializar em JSON)"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"Boleto({self.to_dict()!r})"
+
+
+def _internar(valores):
+    """Lista de strings internadas (None para valores ausentes)"""
+    return [sys.intern(v) if isinstance(v, str) else None for v in valores]
+
+
+def boletos_de_dataframe(df):
+    """
+    Converte um DataFrame de boletos (formato do dda.json) em lista de Boleto.
+
+    A conversão é feita por coluna: centavos e dias são calculados de forma
+    vetorizada e só a montagem dos objetos percorre as linhas.
+    """
+    if len(df) == 0:
+        return []
+
+    valores = df['valor'].to_numpy(dtype=float)
+    centavos = np.rint(valores * 100)
+    centavos = [int(c) if c == c else None for c in centavos.tolist()]
+
+    vencimentos = df['data_vencimento'].to_numpy(dtype='datetime64[D]')
+    dias = vencimentos.astype(np.int64).tolist()
+    sem_data = np.isnat(vencimentos)
+    if sem_data.any():
+        dias = [None if nat else dia for dia, nat in zip(dias, sem_data.tolist())]
+
+    def coluna(nome, internar=False, compartilhar=False):
+        if nome not in df:
+            return [None] * len(df)
+        valores_coluna = df[nome].tolist()
+        if internar:
+            return _internar(valores_coluna)
+        if compartilhar:
+            # Poucos valores distintos (ex: multa): um único objeto float por valor
+            unicos = {}
+            return [unicos.setdefault(v, v) for v in valores_coluna]
+        return valores_coluna
+
+    outras = [nome for nome in df.columns if nome not in CAMPOS]
+    if outras:
+        extras = df[outras]
+        # Colunas em dicionário (formato colunar) devolvem nulo como NaN; no JSON é None
+        categoricas = [nome for nome in outras if extras[nome].dtype == 'category']
+        if categoricas:
+            extras = extras.astype({nome: object for nome in categoricas})
+            extras[categoricas] = extras[categoricas].where(extras[categoricas].notna(), None)
+        extras = extras.to_dict(orient='records')
+    else:
+        extras = [None] * len(df)
+
+    return [
+        Boleto(*campos)
+        for campos in zip(
+            coluna('id'),
+            coluna('cnpj', internar=True),
+            coluna('beneficiario', internar=True),
+            centavos,
+            dias,
+            coluna('multa', compartilhar=True),
+            coluna('status', internar=True),
+            extras,
+        )
+    ]
@@ -1,19 +1,361 @@
-import json
+import numpy as np
 import pandas as pd
 import os
+import threading
+
+from boleto_dda import boletos_de_dataframe
+from armazenamento_dda import (
+    ARQUIVO_MANIFEST,
+    anexar_delta,
+    assinatura_arquivo,
+    caminho_colunar,
+    caminho_delta,
+    colunar_atualizado,
+    ler_dataframe_colunar,
+    ler_dataframe_json,
+    ler_delta,
+    salvar_colunar,
+    salvar_json,
+    trava_delta,
+)
+
+# Cache global dos datasets já carregados, compartilhado entre threads.
+# Chave: caminho absoluto do JSON -> (assinatura do JSON e do formato colunar, DatasetDDA)
+_CACHE_DATASETS = {}
+_CACHE_LOCK = threading.Lock()
+
+# Tamanho do log de alterações a partir do qual ingest() compacta automaticamente
+LIMITE_COMPACTACAO_DELTA = 8 * 1024 * 1024  # 8 MB
+
+class DatasetDDA:
+    """
+    Boletos carregados em memória com índices construídos no carregamento.
+    
+    As linhas ficam ordenadas por (cnpj, data_vencimento), de modo que os boletos
+    de cada CNPJ formam uma fatia contígua do DataFrame. Os índices mapeiam:
+    - cnpj -> (início, fim) da fatia
+    - (cnpj, id) -> posição da linha
+    
+    Assim as consultas custam proporcionalmente aos boletos de uma única empresa,
+    e não ao arquivo inteiro.
+    
+    Com ordenado=True o DataFrame é usado como está (já ordenado e somente
+    leitura, como o carregado do formato colunar com memory-map).
+    
+    Eventos do log de alterações (ver ingest) são aplicados por empresa: só os
+    CNPJs afetados ganham uma nova fatia (base + alterações), o restante do
+    dataset e seus índices continuam os mesmos.
+    """
+    
+    def __init__(self, df, ordenado=False):
+        if not ordenado:
+            # mergesort é estável: dentro do mesmo dia, mantém a ordem do arquivo
+            df = _congelar_dataframe(df.sort_values(['cnpj', 'data_vencimento'], kind='mergesort'))
+        self.df = df
+        self._fatias = {}
+        self._posicao_por_id = {}
+        # CNPJs alterados pelo log: cnpj -> (DataFrame da empresa, {id: posição})
+        self._cnpjs_alterados = {}
+        self._linhas = len(df)
+        self._proximo_indice = int(df.index.max()) + 1 if len(df) else 0
+        # Posição (em bytes) até onde o log de alterações já foi aplicado
+        self.posicao_delta = 0
+        # Agregados diários por CNPJ, montados sob demanda (ver agregado_diario)
+        self._agregados = {}
+        
+        if len(df) == 0:
+            return
+        
+        # Com cnpj em dicionário, compara os códigos inteiros em vez das strings
+        coluna_cnpj = df['cnpj']
+        if isinstance(coluna_cnpj.dtype, pd.CategoricalDtype):
+            chaves = coluna_cnpj.cat.codes.to_numpy()
+            categorias = coluna_cnpj.cat.categories.to_numpy()
+            cnpjs = categorias[chaves]
+        else:
+            chaves = cnpjs = coluna_cnpj.to_numpy()
+        
+        inicios = np.concatenate(([0], np.flatnonzero(chaves[1:] != chaves[:-1]) + 1))
+        fins = np.append(inicios[1:], len(chaves))
+        for inicio, fim in zip(inicios.tolist(), fins.tolist()):
+            self._fatias[cnpjs[inicio]] = (inicio, fim)
+        
+        for posicao, chave in enumerate(zip(cnpjs, df['id'].to_numpy())):
+            # Em caso de id duplicado, mantém a primeira ocorrência (como o filtro original)
+            self._posicao_por_id.setdefault(chave, posicao)
+    
+    def __len__(self):
+        return self._linhas
+    
+    def boletos_do_cnpj(self, cnpj):
+        """Fatia (sem cópia) com os boletos do CNPJ, ordenados por vencimento"""
+        alterado = self._cnpjs_alterados.get(cnpj)
+        if alterado is not None:
+            return alterado[0]
+        inicio, fim = self._fatias.get(cnpj, (0, 0))
+        return self.df.iloc[inicio:fim]
+    
+    def boleto(self, cnpj, id_boleto):
+        """DataFrame de uma linha com o boleto (cnpj, id), ou vazio se não existir"""
+        alterado = self._cnpjs_alterados.get(cnpj)
+        if alterado is not None:
+            boletos, posicoes = alterado
+            posicao = posicoes.get(id_boleto)
+        else:
+            boletos = self.df
+            posicao = self._posicao_por_id.get((cnpj, id_boleto))
+        
+        if posicao is None:
+            return boletos.iloc[0:0]
+        return boletos.iloc[posicao:posicao + 1]
+    
+    def todos_os_boletos(self):
+        """DataFrame com todos os boletos (base + alterações), na ordem original do arquivo"""
+        if not self._cnpjs_alterados:
+            return self.df.sort_index()
+        
+        partes = [self.df.iloc[inicio:fim] for cnpj, (inicio, fim) in self._fatias.items()
+                  if cnpj not in self._cnpjs_alterados]
+        partes.extend(boletos for boletos, _ in self._cnpjs_alterados.values())
+        return pd.concat(partes).sort_index()
+    
+    def aplicar_eventos(self, eventos):
+        """
+        Aplica eventos do log de alterações:
+        - {"op": "upsert", "boleto": {...}}: boleto novo (ou substitui o de mesmo id)
+        - {"op": "status", "cnpj": ..., "id": ..., "status": "PAGO"}: muda o status
+        """
+        por_cnpj = {}
+        for evento in eventos:
+            cnpj = evento['cnpj'] if evento['op'] == 'status' else evento['boleto']['cnpj']
+            por_cnpj.setdefault(cnpj, []).append(evento)
+        
+        for cnpj, eventos_cnpj in por_cnpj.items():
+            self._aplicar_eventos_cnpj(cnpj, eventos_cnpj)
+    
+    def _aplicar_eventos_cnpj(self, cnpj, eventos):
+        """Reconstrói apenas a fatia de um CNPJ com os eventos aplicados"""
+        # Consolida os eventos na ordem: o último upsert/status de cada id prevalece
+        upserts = {}
+        status = {}
+        for evento in eventos:
+            if evento['op'] == 'status':
+                if evento['id'] in upserts:
+                    upserts[evento['id']] = {**upserts[evento['id']], 'status': evento['status']}
+                else:
+                    status[evento['id']] = evento['status']
+            elif evento['op'] == 'upsert':
+                upserts[evento['boleto']['id']] = evento['boleto']
+                status.pop(evento['boleto']['id'], None)
+            else:
+                raise ValueError(f"Operação '{evento['op']}' não reconhecida no log de alterações.")
+        
+        atual = self.boletos_do_cnpj(cnpj)
+        indice_por_id = dict(zip(atual['id'], atual.index))
+        
+        mantidos = atual[~atual['id'].isin(upserts.keys())]
+        if status:
+            mantidos = mantidos.copy()
+            alterar = mantidos['id'].isin(status.keys())
+            mantidos['status'] = mantidos['status'].astype(object).where(~alterar, mantidos['id'].map(status))
+        
+        partes = [mantidos]
+        if upserts:
+            novos = pd.json_normalize(list(upserts.values()))
+            novos['data_vencimento'] = pd.to_datetime(novos['data_vencimento'])
+            rotulos = []
+            for id_boleto in novos['id']:
+                if id_boleto not in indice_por_id:
+                    indice_por_id[id_boleto] = self._proximo_indice
+                    self._proximo_indice += 1
+                rotulos.append(indice_por_id[id_boleto])
+            novos.index = pd.Index(rotulos)
+            partes.append(novos)
+        
+        boletos = _congelar_dataframe(pd.concat(partes).sort_values('data_vencimento', kind='mergesort'))
+        posicoes = {}
+        for posicao, id_boleto in enumerate(boletos['id'].tolist()):
+            posicoes.setdefault(id_boleto, posicao)
+        
+        self._linhas += len(boletos) - len(atual)
+        self._cnpjs_alterados[cnpj] = (boletos, posicoes)
+        self._agregados.pop(cnpj, None)
+    
+    def agregado_diario(self, cnpj):
+        """Tabela de totais por dia de vencimento do CNPJ (montada uma vez e reaproveitada)"""
+        agregado = self._agregados.get(cnpj)
+        if agregado is None:
+            agregado = AgregadoDiario(self.boletos_do_cnpj(cnpj))
+            self._agregados[cnpj] = agregado
+        return agregado
+
+
+class AgregadoDiario:
+    """
+    Totais por dia de vencimento dos boletos de um CNPJ.
+    
+    Para cada dia com boletos guarda a quantidade, o valor total e a divisão
+    entre pagos e não pagos, além das somas acumuladas. Consultas de intervalo
+    localizam os dias por busca binária e os totais saem da diferença entre
+    duas somas acumuladas, sem percorrer os boletos do período.
+    """
+    
+    def __init__(self, boletos):
+        pago = (boletos['status'] == 'PAGO').to_numpy()
+        por_dia = pd.DataFrame({
+            "data_vencimento": boletos['data_vencimento'].to_numpy(),
+            "valor": boletos['valor'].to_numpy(dtype=float),
+            "pago": pago.astype(np.int64),
+            "valor_pago": np.where(pago, boletos['valor'].to_numpy(dtype=float), 0.0),
+        }).groupby('data_vencimento', sort=True).agg(
+            quantidade=('valor', 'size'),
+            valor=('valor', 'sum'),
+            quantidade_pagos=('pago', 'sum'),
+            valor_pagos=('valor_pago', 'sum'),
+        )
+        
+        self.dias = por_dia.index.to_numpy(dtype='datetime64[ns]')
+        self.quantidade = por_dia['quantidade'].to_numpy(dtype=np.int64)
+        self.valor = por_dia['valor'].to_numpy(dtype=float)
+        self.quantidade_pagos = por_dia['quantidade_pagos'].to_numpy(dtype=np.int64)
+        self.valor_pagos = por_dia['valor_pagos'].to_numpy(dtype=float)
+        
+        # Somas acumuladas com zero à esquerda: total de [i, j) = acumulado[j] - acumulado[i]
+        self._acumulados = {
+            nome: np.concatenate(([0], np.cumsum(valores)))
+            for nome, valores in (
+                ("quantidade", self.quantidade),
+                ("valor", self.valor),
+                ("quantidade_pagos", self.quantidade_pagos),
+                ("valor_pagos", self.valor_pagos),
+            )
+        }
+    
+    def __len__(self):
+        return len(self.dias)
+    
+    def posicoes(self, data_inicio=None, data_fim=None):
+        """Intervalo [inicio, fim) dos dias entre as datas (inclusivas)"""
+        inicio = 0 if data_inicio is None else int(np.searchsorted(self.dias, np.datetime64(pd.Timestamp(data_inicio)), side='left'))
+        fim = len(self.dias) if data_fim is None else int(np.searchsorted(self.dias, np.datetime64(pd.Timestamp(data_fim)), side='right'))
+        return inicio, max(inicio, fim)
+    
+    def por_dia(self, data_inicio=None, data_fim=None):
+        """DataFrame (um dia por linha, índice 'YYYY-MM-DD') com os totais dos dias do intervalo"""
+        inicio, fim = self.posicoes(data_inicio, data_fim)
+        dias = pd.DatetimeIndex(self.dias[inicio:fim]).strftime('%Y-%m-%d')
+        return pd.DataFrame({
+            "quantidade": self.quantidade[inicio:fim],
+            "valor": self.valor[inicio:fim],
+            "quantidade_pagos": self.quantidade_pagos[inicio:fim],
+            "valor_pagos": self.valor_pagos[inicio:fim],
+        }, index=pd.Index(dias, name='data_vencimento_str'))
+    
+    def totais(self, data_inicio=None, data_fim=None):
+        """Totais do intervalo (datas inclusivas) a partir das somas acumuladas"""
+        inicio, fim = self.posicoes(data_inicio, data_fim)
+        total = {nome: acumulado[fim] - acumulado[inicio] for nome, acumulado in self._acumulados.items()}
+        return {
+            "quantidade": int(total["quantidade"]),
+            "valor_total": float(total["valor"]),
+            "quantidade_pagos": int(total["quantidade_pagos"]),
+            "valor_pagos": float(total["valor_pagos"]),
+            "quantidade_nao_pagos": int(total["quantidade"] - total["quantidade_pagos"]),
+            "valor_nao_pagos": float(total["valor"] - total["valor_pagos"]),
+        }
+
+
+class _ConsultaCNPJ:
+    """
+    Boletos de um CNPJ já filtrados, compartilhados entre várias ações.
+    
+    Usado por sistema_boletos_batch: o filtro do CNPJ é feito uma vez e os
+    conjuntos de vencidos (por data de referência) são calculados sob demanda
+    e reaproveitados por overview_dia, dash_intervalo e atrasados.
+    """
+    
+    def __init__(self, df, cnpj):
+        self.dataset = df
+        self.cnpj = cnpj
+        self.boletos = _boletos_do_cnpj(df, cnpj)
+        self._vencidos = {}
+        self._agregado = None
+    
+    def agregado_diario(self):
+        if self._agregado is None:
+            self._agregado = _agregado_diario(self.dataset, self.cnpj, self.boletos)
+        return self._agregado
+    
+    def vencidos_antes(self, referencia):
+        if referencia not in self._vencidos:
+            self._vencidos[referencia] = boletos_vencidos_antes(self.boletos, referencia)
+        return self._vencidos[referencia]
+
+
+def _boletos_do_cnpj(df, cnpj):
+    """Boletos de um CNPJ ordenados por vencimento, usando o índice quando disponível"""
+    if isinstance(df, _ConsultaCNPJ):
+        if cnpj != df.cnpj:
+            raise ValueError(f"Consulta preparada para o CNPJ '{df.cnpj}', não '{cnpj}'.")
+        return df.boletos
+    if isinstance(df, DatasetDDA):
+        return df.boletos_do_cnpj(cnpj)
+    return df[df['cnpj'] == cnpj].sort_values('data_vencimento', kind='mergesort')
+
+
+def _agregado_diario(df, cnpj, df_cnpj):
+    """Agregado diário do CNPJ: em cache no DatasetDDA, ou montado na hora para DataFrames"""
+    if isinstance(df, _ConsultaCNPJ):
+        return df.agregado_diario()
+    if isinstance(df, DatasetDDA):
+        return df.agregado_diario(cnpj)
+    return AgregadoDiario(df_cnpj)
+
+
+def _vencidos_do_cnpj(df, df_cnpj, referencia):
+    """Vencidos antes da referência, reaproveitando o cálculo de uma _ConsultaCNPJ"""
+    if isinstance(df, _ConsultaCNPJ):
+        return df.vencidos_antes(referencia)
+    return boletos_vencidos_antes(df_cnpj, referencia)
+
+
+# =================================================================
+# CONSULTAS POR VENCIMENTO (busca binária)
+# =================================================================
+# As funções abaixo esperam boletos ORDENADOS por data_vencimento (como as
+# fatias de DatasetDDA.boletos_do_cnpj) e retornam fatias .iloc, sem cópia,
+# localizadas com np.searchsorted em vez de máscaras booleanas.
+
+def _posicao_vencimento(boletos, data, lado):
+    vencimentos = boletos['data_vencimento'].to_numpy()
+    return int(np.searchsorted(vencimentos, pd.Timestamp(data).to_datetime64(), side=lado))
+
+
+def boletos_por_vencimento(boletos, data_inicio=None, data_fim=None):
+    """Boletos com data_inicio <= data_vencimento <= data_fim (None = sem limite)"""
+    inicio = 0 if data_inicio is None else _posicao_vencimento(boletos, data_inicio, 'left')
+    fim = len(boletos) if data_fim is None else _posicao_vencimento(boletos, data_fim, 'right')
+    return boletos.iloc[inicio:max(inicio, fim)]
+
+
+def boletos_no_dia(boletos, dia):
+    """Boletos que vencem exatamente em `dia`"""
+    return boletos_por_vencimento(boletos, dia, dia)
+
+
+def boletos_vencidos_antes(boletos, referencia):
+    """Boletos com vencimento anterior à data de referência (vencidos)"""
+    return boletos.iloc[:_posicao_vencimento(boletos, referencia, 'left')]
+
 
 def boletos_do_dia(df, cnpj, dia):
     dia = pd.to_datetime(dia)
     hoje = pd.Timestamp.now().normalize()  # Data atual (hoje)
-    df_cnpj = df[df['cnpj'] == cnpj]
+    df_cnpj = _boletos_do_cnpj(df, cnpj)
     
-    boletos_hoje = df_cnpj[df_cnpj['data_vencimento'] == dia].copy()
+    boletos_hoje = boletos_no_dia(df_cnpj, dia)
     # Vencidos são sempre relativos à data ATUAL, não à data consultada
-    vencidos = df_cnpj[df_cnpj['data_vencimento'] < hoje].copy()
-    
-    # Criar coluna formatada apenas para saída
-    boletos_hoje['data_str'] = boletos_hoje['data_vencimento'].dt.strftime('%Y-%m-%d')
-    vencidos['data_str'] = vencidos['data_vencimento'].dt.strftime('%Y-%m-%d')
+    vencidos = _vencidos_do_cnpj(df, df_cnpj, hoje)
     
     # Overview
     overview = {
@@ -23,18 +365,32 @@ def boletos_do_dia(df, cnpj, dia):
         "valor_total_vencidos": vencidos['valor'].sum()
     }
     
-    # Criar dicionário de boletos detalhado
-    boletos_dict = {}
-    for idx, row in boletos_hoje.iterrows():
-        codigo = f"Boleto_{idx}"  # pode usar id real
-        juros_acumulado = 0  # ou calcular depois
-        boletos_dict[codigo] = {
-            "empresa": row['cnpj'],
-            "beneficiario": row.get('beneficiario', 'Não informado'),
-            "valor": row['valor'],
+    # Criar dicionário de boletos detalhado, coluna a coluna (sem iterrows)
+    codigos = [f"Boleto_{idx}" for idx in boletos_hoje.index]  # pode usar id real
+    if 'beneficiario' in boletos_hoje.columns:
+        beneficiarios = boletos_hoje['beneficiario'].tolist()
+    else:
+        beneficiarios = ['Não informado'] * len(boletos_hoje)
+    # Data formatada como string apenas para saída
+    datas_str = boletos_hoje['data_vencimento'].dt.strftime('%Y-%m-%d').tolist()
+    juros_acumulado = 0  # ou calcular depois
+    
+    boletos_dict = {
+        codigo: {
+            "empresa": empresa,
+            "beneficiario": beneficiario,
+            "valor": valor,
             "juros": juros_acumulado,
-            "data_vencimento": row['data_str']  # aqui usamos a string
+            "data_vencimento": data_str  # aqui usamos a string
         }
+        for codigo, empresa, beneficiario, valor, data_str in zip(
+            codigos,
+            boletos_hoje['cnpj'].tolist(),
+            beneficiarios,
+            boletos_hoje['valor'].tolist(),
+            datas_str
+        )
+    }
     
     return overview, boletos_dict
 
@@ -44,7 +400,7 @@ def detalhe_boleto(df, cnpj, id_boleto, campos=None):
     Retorna os detalhes de um boleto específico pelo ID e CNPJ.
     
     Parâmetros:
-    - df: DataFrame de boletos
+    - df: DatasetDDA (ou DataFrame) de boletos
     - cnpj: CNPJ da empresa
     - id_boleto: ID do boleto
     - campos: lista de strings com os campos desejados (ex: ['valor','data_vencimento','status'])
@@ -52,7 +408,13 @@ def detalhe_boleto(df, cnpj, id_boleto, campos=None):
     Retorna:
     - dicionário com os campos solicitados, ou None se não encontrado
     """
-    boleto = df[(df['cnpj'] == cnpj) & (df['id'] == id_boleto)].copy()
+    if isinstance(df, _ConsultaCNPJ):
+        df = df.dataset
+    
+    if isinstance(df, DatasetDDA):
+        boleto = df.boleto(cnpj, id_boleto).copy()
+    else:
+        boleto = df[(df['cnpj'] == cnpj) & (df['id'] == id_boleto)].copy()
     
     if boleto.empty:
         return None
@@ -77,28 +439,25 @@ def dash_intervalo(df, cnpj, data_inicio, data_fim):
     inicio = pd.to_datetime(data_inicio)
     fim = pd.to_datetime(data_fim)
     
-    df_cnpj = df[df['cnpj'] == cnpj]
-    df_periodo = df_cnpj[(df_cnpj['data_vencimento'] >= inicio) & 
-                         (df_cnpj['data_vencimento'] <= fim)].copy()
+    df_cnpj = _boletos_do_cnpj(df, cnpj)
     
-    # Formatar datas
-    df_periodo.loc[:, 'data_vencimento_str'] = df_periodo['data_vencimento'].dt.strftime('%Y-%m-%d')
+    # Totais por dia vêm do agregado diário (um registro por dia, não por boleto)
+    por_dia = _agregado_diario(df, cnpj, df_cnpj).por_dia(inicio, fim)
     
     # Count de boletos por dia
-    count_por_dia = df_periodo.groupby('data_vencimento_str').size().sort_values(ascending=False).head(3)
+    count_por_dia = por_dia['quantidade'].sort_values(ascending=False).head(3)
     
     # Dias com maior valor total
-    valor_por_dia = df_periodo.groupby('data_vencimento_str')['valor'].sum().sort_values(ascending=False).head(3)
+    valor_por_dia = por_dia['valor'].sort_values(ascending=False).head(3)
     
     # Contas atrasadas - sempre usa data ATUAL, não a data do intervalo
     hoje = pd.Timestamp.now().normalize()
-    atrasadas = df_cnpj[df_cnpj['data_vencimento'] < hoje].copy()
-    atrasadas.loc[:, 'data_vencimento_str'] = atrasadas['data_vencimento'].dt.strftime('%Y-%m-%d')
+    atrasadas = _vencidos_do_cnpj(df, df_cnpj, hoje)
     
-    # Visão de urgente: 3 primeiros dias do período
-    primeiros_dias = df_periodo.sort_values('data_vencimento').head(3)
+    # Visão de urgente: 3 primeiros boletos do período (já ordenados por vencimento)
+    primeiros_dias = boletos_por_vencimento(df_cnpj, inicio, fim).head(3)
     urgent_overview = {}
-    for dia, grupo in primeiros_dias.groupby('data_vencimento_str'):
+    for dia, grupo in primeiros_dias.groupby(primeiros_dias['data_vencimento'].dt.strftime('%Y-%m-%d')):
         urgent_overview[dia] = grupo[['id','valor','status']].to_dict(orient='records')
     
     dashboard = {
@@ -114,6 +473,16 @@ def dash_intervalo(df, cnpj, data_inicio, data_fim):
     return dashboard
 
 
+def resumo_intervalo(df, cnpj, data_inicio=None, data_fim=None):
+    """Quantidade e valor dos boletos do período, separados em pagos e não pagos"""
+    df_cnpj = _boletos_do_cnpj(df, cnpj)
+    agregado = _agregado_diario(df, cnpj, df_cnpj)
+    return agregado.totais(
+        pd.to_datetime(data_inicio) if data_inicio is not None else None,
+        pd.to_datetime(data_fim) if data_fim is not None else None
+    )
+
+
 def boletos_atrasados(df, cnpj, referencia=None):
     # Se referencia não for fornecida, usa a data atual
     if referencia is None:
@@ -121,20 +490,192 @@ def boletos_atrasados(df, cnpj, referencia=None):
     else:
         hoje = pd.to_datetime(referencia)
     
-    df_cnpj = df[df['cnpj'] == cnpj]
-    atrasados = df_cnpj[df_cnpj['data_vencimento'] < hoje].copy()  # copy aqui
+    df_cnpj = _boletos_do_cnpj(df, cnpj)
+    atrasados = _vencidos_do_cnpj(df, df_cnpj, hoje)
     
-    atrasados['data_vencimento'] = atrasados['data_vencimento'].dt.strftime('%Y-%m-%d')
-    return atrasados.to_dict(orient='records')
+    # Registros compactos (Boleto), lidos como dict pelo restante do sistema
+    return boletos_de_dataframe(atrasados)
+
+def _resolver_caminho_json(json_path):
+    """Resolve o caminho do dda.json (relativo ao diretório atual ou a este módulo)"""
+    # Se o caminho não for absoluto, tenta encontrar relativo ao diretório atual
+    if not os.path.isabs(json_path) and not os.path.exists(json_path):
+        # Tenta encontrar relativo ao diretório deste arquivo
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        json_path = os.path.join(current_dir, 'dda.json')
+    
+    return os.path.abspath(json_path)
+
+
+def _congelar_dataframe(df):
+    """
+    Reconstrói o DataFrame sobre arrays somente leitura.
+    
+    Qualquer tentativa de alterar valores, datas ou multas do dataset
+    compartilhado (ex: df.loc[...] = x) levanta ValueError; as consultas
+    trabalham sempre sobre filtros/cópias. Colunas de texto (object) ficam de
+    fora porque os kernels do pandas exigem buffers graváveis para comparar
+    strings (df['cnpj'] == cnpj).
+    """
+    colunas = {}
+    for coluna in df.columns:
+        valores = df[coluna].to_numpy(copy=True)
+        if valores.dtype != object:
+            valores.flags.writeable = False
+        colunas[coluna] = valores
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+def _assinatura_opcional(caminho):
+    try:
+        return assinatura_arquivo(caminho)
+    except FileNotFoundError:
+        return None
+
+
+def carregar_dataset(json_path='dda.json'):
+    """
+    Retorna o DatasetDDA de boletos, fazendo o parse apenas uma vez por processo.
+    
+    Se existir uma versão colunar atualizada do JSON (dda.colunar/, ver
+    converter_para_colunar), ela é carregada com memory-map no lugar do JSON.
+    
+    O resultado fica em cache, indexado pelo caminho absoluto do arquivo, e só é
+    recarregado quando o mtime ou o tamanho do JSON (ou do manifest colunar)
+    mudam. O DataFrame do dataset (dataset.df) é somente leitura e compartilhado
+    entre todas as chamadas; os índices por CNPJ e por (cnpj, id) são
+    construídos uma única vez no carregamento. Eventos novos do log de
+    alterações (dda.delta.jsonl) são aplicados sobre o dataset em cache.
+    """
+    caminho = _resolver_caminho_json(json_path)
+    colunar = caminho_colunar(caminho)
+    
+    with _CACHE_LOCK:
+        assinatura = (_assinatura_opcional(caminho),
+                      _assinatura_opcional(os.path.join(colunar, ARQUIVO_MANIFEST)))
+        entrada = _CACHE_DATASETS.get(caminho)
+        if entrada is not None and entrada[0] == assinatura:
+            dataset = entrada[1]
+        elif colunar_atualizado(colunar, caminho):
+            dataset = DatasetDDA(ler_dataframe_colunar(colunar), ordenado=True)
+        else:
+            dataset = DatasetDDA(ler_dataframe_json(caminho))
+        _CACHE_DATASETS[caminho] = (assinatura, dataset)
+        
+        # Aplica apenas os eventos novos do log de alterações
+        eventos, dataset.posicao_delta = ler_delta(caminho_delta(caminho), dataset.posicao_delta)
+        if eventos:
+            dataset.aplicar_eventos(eventos)
+        return dataset
+
+
+def versao_dataset(json_path='dda.json'):
+    """
+    Versão do dataset: (assinatura dos arquivos base, posição no log de alterações).
+    
+    Muda quando o JSON (ou o formato colunar) é regravado e quando o dataset
+    aplica eventos novos do log (ingest); serve de chave para caches de
+    resultados derivados dos boletos.
+    """
+    caminho = _resolver_caminho_json(json_path)
+    dataset = carregar_dataset(caminho)
+    with _CACHE_LOCK:
+        assinatura = _CACHE_DATASETS.get(caminho, (None,))[0]
+        return assinatura, dataset.posicao_delta
+
+
+def converter_para_colunar(json_path='dda.json', destino=None):
+    """
+    Converte o dda.json para o formato colunar (.npy + manifest, ver armazenamento_dda).
+    
+    As linhas são gravadas já ordenadas por (cnpj, data_vencimento), então o
+    carregamento não precisa reordenar nem copiar as colunas. Por padrão grava
+    em dda.colunar/ ao lado do JSON, onde carregar_dataset o encontra sozinho.
+    
+    Retorna o caminho do diretório gerado.
+    """
+    caminho = _resolver_caminho_json(json_path)
+    if destino is None:
+        destino = caminho_colunar(caminho)
+    
+    origem = assinatura_arquivo(caminho)
+    dataset = DatasetDDA(ler_dataframe_json(caminho))
+    return salvar_colunar(dataset.df, destino, origem=origem)
+
+
+def ingest(eventos, dda_json_path='dda.json', limite_compactacao=LIMITE_COMPACTACAO_DELTA):
+    """
+    Registra boletos novos e mudanças de status no log de alterações (append-only).
+    
+    Parâmetros:
+    - eventos: lista de eventos; cada item é
+      - um boleto (dict com id, cnpj, valor, data_vencimento, ...): novo ou atualizado
+      - {"op": "status", "cnpj": ..., "id": ..., "status": "PAGO"}: mudança de status
+    - dda_json_path: caminho do dda.json de base
+    - limite_compactacao: tamanho do log (bytes) a partir do qual ele é
+      compactado no arquivo base (None desativa)
+    
+    O dataset em cache aplica os eventos na próxima consulta, sem refazer o
+    parse do arquivo base.
+    """
+    caminho = _resolver_caminho_json(dda_json_path)
+    normalizados = [evento if 'op' in evento else {"op": "upsert", "boleto": evento}
+                    for evento in eventos]
+    
+    delta = caminho_delta(caminho)
+    with _CACHE_LOCK, trava_delta(delta):
+        anexar_delta(delta, normalizados)
+    
+    if limite_compactacao is not None and os.path.getsize(delta) >= limite_compactacao:
+        compactar(dda_json_path)
+
+
+def compactar(dda_json_path='dda.json'):
+    """
+    Incorpora o log de alterações ao dda.json e esvazia o log.
+    
+    Segura a trava do log (trava_delta) da leitura até a remoção, de modo que
+    eventos acrescentados por outro processo durante a compactação esperam e
+    vão para um log novo, em vez de se perderem. Os boletos são gravados na ordem original do arquivo (novos ao final), de
+    modo que os códigos Boleto_X continuam os mesmos. Se existir formato
+    colunar, ele é regenerado a partir do novo JSON.
+    """
+    caminho = _resolver_caminho_json(dda_json_path)
+    dataset = carregar_dataset(caminho)
+    
+    delta = caminho_delta(caminho)
+    with _CACHE_LOCK, trava_delta(delta):
+        # Eventos que chegaram depois do carregamento acima
+        eventos, dataset.posicao_delta = ler_delta(delta, dataset.posicao_delta)
+        if eventos:
+            dataset.aplicar_eventos(eventos)
+        
+        salvar_json(dataset.todos_os_boletos(), caminho)
+        if os.path.exists(delta):
+            os.remove(delta)
+        _CACHE_DATASETS.pop(caminho, None)
+        
+        colunar = caminho_colunar(caminho)
+        regerar_colunar = os.path.isdir(colunar)
+    
+    if regerar_colunar:
+        converter_para_colunar(caminho, colunar)
+
+
+def limpar_cache_dataset():
+    """Descarta todos os datasets em cache (o próximo acesso refaz o parse)"""
+    with _CACHE_LOCK:
+        _CACHE_DATASETS.clear()
+
 
 def sistema_boletos(acao, **kwargs):
     """
     Função switch-case para gerenciar diferentes funções de boletos.
     
     Parâmetros:
-    - df: DataFrame de boletos
     - acao: string indicando a ação a executar
     - kwargs: parâmetros adicionais necessários para cada ação
+      (opcional: dda_json_path, caminho do JSON; o dataset é reaproveitado do cache)
     
     Ações possíveis:
     - "overview_dia" -> chama boletos_do_dia(df, cnpj, dia)
@@ -143,25 +684,43 @@ def sistema_boletos(acao, **kwargs):
     - "atrasados" -> chama boletos_atrasados(df, cnpj, referencia)
     """
     
-    # Permite especificar um caminho customizado para o JSON
-    json_path = kwargs.get('dda_json_path', 'dda.json')
+    df = carregar_dataset(kwargs.get('dda_json_path', 'dda.json'))
+    return _executar_acao(df, acao, kwargs)
+
+
+def sistema_boletos_batch(acoes, **kwargs):
+    """
+    Executa várias ações de boletos para o MESMO CNPJ de uma só vez.
     
-    # Se o caminho não for absoluto, tenta encontrar relativo ao diretório atual
-    if not os.path.isabs(json_path) and not os.path.exists(json_path):
-        # Tenta encontrar relativo ao diretório deste arquivo
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        json_path = os.path.join(current_dir, 'dda.json')
+    O dataset é obtido uma vez, o CNPJ é filtrado uma vez e o conjunto de
+    boletos vencidos (relativo a hoje) é calculado uma única vez e compartilhado
+    entre as ações.
+    
+    Parâmetros:
+    - acoes: lista de ações; cada item é o nome da ação ("atrasados") ou um dict
+      com a chave "acao" e os parâmetros específicos
+      (ex: {"acao": "overview_dia", "dia": "2025-10-19"})
+    - kwargs: parâmetros comuns a todas as ações (cnpj obrigatório, dda_json_path opcional)
     
-    with open(json_path, "r", encoding="utf-8") as f:
-        json_data = json.load(f)
+    Retorna:
+    - lista com os resultados, na mesma ordem de `acoes`
+    """
+    df = carregar_dataset(kwargs.get('dda_json_path', 'dda.json'))
+    consulta = _ConsultaCNPJ(df, kwargs['cnpj'])
+    
+    resultados = []
+    for item in acoes:
+        if isinstance(item, str):
+            item = {"acao": item}
+        parametros = {**kwargs, **item}
+        acao = parametros.pop('acao')
+        resultados.append(_executar_acao(consulta, acao, parametros))
+    
+    return resultados
 
-    # 2. Extrair a lista de boletos (array dentro de "data")
-    boletos = json_data["data"]
 
-    # 3. Criar DataFrame
-    df = pd.json_normalize(boletos)
-    df['data_vencimento'] = pd.to_datetime(df['data_vencimento'])
-    
+def _executar_acao(df, acao, kwargs):
+    """Despacha uma ação para a função de consulta correspondente"""
     match acao:
         case "overview_dia":
             return boletos_do_dia(df, kwargs['cnpj'], kwargs['dia'])
@@ -172,6 +731,9 @@ def sistema_boletos(acao, **kwargs):
         case "dash_intervalo":
             return dash_intervalo(df, kwargs['cnpj'], kwargs['data_inicio'], kwargs['data_fim'])
         
+        case "resumo_intervalo":
+            return resumo_intervalo(df, kwargs['cnpj'], kwargs.get('data_inicio'), kwargs.get('data_fim'))
+        
         case "atrasados":
             referencia = kwargs.get('referencia')  # None se não fornecido, usa data atual
             return boletos_atrasados(df, kwargs['cnpj'], referencia)
@@ -202,7 +764,18 @@ def sistema_boletos(acao, **kwargs):
 # print(dash)
 # print()
 
+# # 3b. Totais do intervalo (pagos x não pagos)
+# resumo = sistema_boletos("resumo_intervalo", cnpj="12.345.678/0001-90", data_inicio="2025-10-01", data_fim="2025-10-31")
+# print(resumo)
+# print()
+
 # # 4. Boletos atrasados
 # atrasados = sistema_boletos("atrasados", cnpj="12.345.678/0001-90")
 # print("Boletos atrasados:")
-# print(atrasados)
\ No newline at end of file
+# print(atrasados)
+
+# # 5. Várias ações de uma vez (mesmo CNPJ)
+# (overview, lista), atrasados = sistema_boletos_batch(
+#     [{"acao": "overview_dia", "dia": "2025-10-19"}, "atrasados"],
+#     cnpj="12.345.678/0001-90"
+# )
\ No newline at end of file
@@ -0,0 +1,318 @@
+"""
+Benchmarks da análise de pagamento (Sugestão de Ação)
+
+Uso:
+    python benchmark_sugestao.py [num_boletos]
+"""
+import itertools
+import os
+import subprocess
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from financial_tools_simple import TAXA_CAPITAL_GIRO, analisar_pagamento_boletos
+from fluxo_caixa import agendar_pagamentos, recebiveis_por_dia
+from precificacao import precificar_boletos, priorizar_pagamento
+from risco_recebiveis import simular_risco_recebiveis
+from selecao_pagamento import MODO_GULOSO, selecionar_pagamentos
+from simulacao import simular_cenarios
+
+
+def gerar_boletos(num_boletos: int, seed: int = 42) -> list:
+    """Gera boletos vencidos sintéticos (id, valor, multa, data_vencimento)"""
+    rng = np.random.default_rng(seed)
+    inicio = date(2025, 1, 1)
+    dias = rng.integers(0, 270, size=num_boletos).tolist()
+    valores = np.round(rng.uniform(50, 20000, size=num_boletos), 2).tolist()
+    multas = rng.choice([0.015, 0.02, 0.025], size=num_boletos).tolist()
+    return [
+        {
+            "id": f"BOL{i:07d}",
+            "valor": valor,
+            "multa": multa,
+            "data_vencimento": (inicio + timedelta(days=dia)).isoformat(),
+        }
+        for i, (valor, multa, dia) in enumerate(zip(valores, multas, dias))
+    ]
+
+
+def medir(func, repeticoes: int = 5) -> float:
+    """Retorna o melhor tempo (em ms) entre as repetições"""
+    return min(timeit.repeat(func, number=1, repeat=repeticoes)) * 1000
+
+
+def imprimir_resultado(nome: str, tempo_antes: float, tempo_depois: float):
+    print(f"{nome:<28} antes: {tempo_antes:9.3f} ms   depois: {tempo_depois:9.3f} ms   "
+          f"speedup: {tempo_antes / tempo_depois:7.1f}x")
+
+
+def _precificar_loop(boletos: list, referencia: str) -> list:
+    """Precificação boleto a boleto com strptime (implementação anterior do adaptador)"""
+    resultado = []
+    for boleto in boletos:
+        data_venc = datetime.strptime(boleto['data_vencimento'], '%Y-%m-%d')
+        data_ref = datetime.strptime(referencia, '%Y-%m-%d')
+        dias_atraso = (data_ref - data_venc).days
+        juros = boleto['valor'] * boleto.get('multa', 0.02) * dias_atraso
+        juros_diario = juros / boleto['valor'] if juros > 0 and boleto['valor'] > 0 else 0.002
+        resultado.append((dias_atraso, juros, juros_diario))
+    return resultado
+
+
+def _priorizar_loop(boletos: list, saldo: float) -> list:
+    """Ordenação + seleção gulosa com dicts (implementação anterior do ChatbotManager)"""
+    ordenados = sorted(boletos, key=lambda x: x['valor'] * x['juros_diario'], reverse=True)
+    pagar = []
+    for boleto in ordenados:
+        if saldo >= boleto['valor']:
+            saldo -= boleto['valor']
+            pagar.append(boleto['id'])
+    return pagar
+
+
+def benchmark_precificacao(num_boletos: int):
+    """Compara a precificação em laço com a vetorizada"""
+    print(f"\n💲 Precificação de boletos vencidos ({num_boletos:,} boletos)")
+    boletos = gerar_boletos(num_boletos)
+    referencia = "2025-10-01"
+
+    def vetorizada():
+        return precificar_boletos(
+            [b['valor'] for b in boletos],
+            [b['data_vencimento'] for b in boletos],
+            referencia,
+            multas=[b['multa'] for b in boletos]
+        )
+
+    precos = vetorizada()
+    assert list(zip(precos['dias_atraso'].tolist(), precos['juros'].tolist(), precos['juros_diario'].tolist())) == \
+        _precificar_loop(boletos, referencia)
+
+    imprimir_resultado("precificar_boletos", medir(lambda: _precificar_loop(boletos, referencia)), medir(vetorizada))
+
+
+def benchmark_priorizacao(num_boletos: int):
+    """Compara a priorização do pagamento parcial com dicts e com arrays"""
+    print(f"\n📋 Priorização do pagamento parcial ({num_boletos:,} boletos)")
+    boletos = gerar_boletos(num_boletos)
+    for boleto in boletos:
+        boleto['juros_diario'] = boleto['multa']
+    saldo = sum(b['valor'] for b in boletos) / 3
+
+    valores = np.array([b['valor'] for b in boletos])
+    juros_diario = np.array([b['juros_diario'] for b in boletos])
+
+    ordem, pagar, _ = priorizar_pagamento(valores, juros_diario, saldo)
+    assert [boletos[i]['id'] for i in ordem[pagar].tolist()] == _priorizar_loop(boletos, saldo)
+
+    imprimir_resultado(
+        "priorizar_pagamento",
+        medir(lambda: _priorizar_loop(boletos, saldo)),
+        medir(lambda: priorizar_pagamento(valores, juros_diario, saldo)),
+    )
+
+
+def benchmark_selecao(tamanhos=(10, 100, 1_000, 10_000)):
+    """Compara a seleção gulosa com a ótima (tempo e juros evitados por dia)"""
+    print("\n🎒 Seleção de pagamentos: guloso × ótimo (saldo = 1/3 da dívida)")
+    for num_boletos in tamanhos:
+        boletos = gerar_boletos(num_boletos)
+        valores = np.array([b['valor'] for b in boletos])
+        juros_diario = np.array([b['multa'] for b in boletos])
+        saldo = valores.sum() / 3
+
+        guloso = selecionar_pagamentos(valores, juros_diario, saldo, modo=MODO_GULOSO)
+        otimo = selecionar_pagamentos(valores, juros_diario, saldo)
+        assert otimo['valor_pago'] <= saldo and otimo['juros_evitados'] >= guloso['juros_evitados']
+
+        tempo_guloso = medir(lambda: selecionar_pagamentos(valores, juros_diario, saldo, modo=MODO_GULOSO), 3)
+        tempo_otimo = medir(lambda: selecionar_pagamentos(valores, juros_diario, saldo), 3)
+        print(f"{num_boletos:>7,} boletos   guloso: {tempo_guloso:8.2f} ms  R$ {guloso['juros_evitados']:12,.2f}/dia   "
+              f"ótimo: {tempo_otimo:8.2f} ms  R$ {otimo['juros_evitados']:12,.2f}/dia  ({otimo['metodo']})")
+
+
+def _cronograma_exato(boletos: list, saldo: float, recebiveis: list, inicio: date, horizonte_dias: int,
+                      taxa_financiamento: float = TAXA_CAPITAL_GIRO) -> float:
+    """
+    Custo mínimo exato do cronograma (capital de giro sem limite), para poucos boletos.
+
+    Programação dinâmica dia a dia sobre (boletos resolvidos, boletos pagos com
+    caixa): em cada dia, cada boleto vencido e em aberto espera, é pago com
+    caixa (se o caixa acumulado comporta) ou é financiado.
+    """
+    n = len(boletos)
+    caixa = (saldo + np.cumsum(recebiveis_por_dia(recebiveis, inicio, horizonte_dias)) + 0.005).tolist()
+    valores = [b['valor'] for b in boletos]
+    custo_diario = [b['valor'] * b['juros_diario'] for b in boletos]
+    vencimentos = [max((date.fromisoformat(b['data_vencimento']) - inicio).days, 0) for b in boletos]
+
+    estados = {(0, 0): 0.0}  # (resolvidos, pagos com caixa) -> menor custo
+    for dia in range(horizonte_dias + 1):
+        proximos = {}
+        for (resolvidos, com_caixa), custo in estados.items():
+            abertos = [i for i in range(n) if not resolvidos >> i & 1 and vencimentos[i] <= dia]
+            pago = sum(valores[i] for i in range(n) if com_caixa >> i & 1)
+            for decisoes in itertools.product((None, "caixa", "financiar"), repeat=len(abertos)):
+                r, c, k, p = resolvidos, com_caixa, custo, pago
+                for i, decisao in zip(abertos, decisoes):
+                    if decisao == "caixa":
+                        r, c, p = r | 1 << i, c | 1 << i, p + valores[i]
+                    elif decisao == "financiar":
+                        r, k = r | 1 << i, k + valores[i] * taxa_financiamento
+                if p > caixa[dia]:
+                    continue
+                k += sum(custo_diario[i] for i in abertos if not r >> i & 1)
+                if k < proximos.get((r, c), np.inf):
+                    proximos[(r, c)] = k
+        estados = proximos
+    return min(custo for (resolvidos, _), custo in estados.items() if resolvidos == (1 << n) - 1)
+
+
+def benchmark_cronograma_exato(instancias: int = 200, horizonte_dias: int = 20):
+    """Compara o cronograma com o ótimo exato em instâncias pequenas (2 a 5 boletos)"""
+    print(f"\n🎯 Cronograma vs ótimo exato ({instancias} instâncias, {horizonte_dias} dias)")
+    rng = np.random.default_rng(0)
+    inicio = date(2025, 10, 1)
+    distancias = []
+    for _ in range(instancias):
+        n = int(rng.integers(2, 6))
+        recebiveis = [{"data": (inicio + timedelta(days=int(dia))).isoformat(), "valor": float(valor)}
+                      for dia, valor in zip(rng.integers(0, horizonte_dias, 3), rng.uniform(100, 3000, 3))]
+        boletos = [
+            {"codigo": f"X{i}", "valor": float(valor), "juros_diario": float(juros),
+             "data_vencimento": (inicio + timedelta(days=int(dia))).isoformat()}
+            for i, (valor, juros, dia) in enumerate(zip(rng.uniform(100, 3000, n),
+                                                        rng.choice([0.002, 0.005, 0.01, 0.02], n),
+                                                        rng.integers(-5, horizonte_dias // 2, n)))
+        ]
+        saldo = float(rng.uniform(0, 2000))
+        exato = _cronograma_exato(boletos, saldo, recebiveis, inicio, horizonte_dias)
+        custo = agendar_pagamentos(boletos, saldo, recebiveis, inicio, horizonte_dias)['custo_total']
+        assert custo >= exato - 1e-6, "o cronograma não pode custar menos que o ótimo"
+        distancias.append((custo - exato) / exato if exato > 0 else 0.0)
+
+    distancias = np.array(distancias)
+    print(f"{'iguais ao ótimo':<28} {np.mean(distancias < 1e-9):9.1%}")
+    print(f"{'distância média / máxima':<28} {distancias.mean():9.1%} / {distancias.max():.1%}")
+
+
+def benchmark_cronograma(num_boletos: int = 500, num_recebiveis: int = 200, horizonte_dias: int = 90,
+                         tempo_maximo_ms: float = 100.0):
+    """Mede o cronograma dia a dia (boletos com vencimentos espalhados no horizonte)"""
+    print(f"\n📅 Cronograma de caixa ({num_boletos:,} boletos, {num_recebiveis:,} recebíveis, {horizonte_dias} dias)")
+    rng = np.random.default_rng(42)
+    inicio = date(2025, 10, 1)
+    recebiveis = [
+        {"data": (inicio + timedelta(days=dia)).isoformat(), "valor": valor}
+        for dia, valor in zip(rng.integers(0, horizonte_dias, num_recebiveis).tolist(),
+                              rng.uniform(100, 5000, num_recebiveis).tolist())
+    ]
+    boletos = [
+        {**boleto, "codigo": boleto["id"], "juros_diario": boleto["multa"] / 2,
+         "data_vencimento": (inicio + timedelta(days=int(dia))).isoformat()}
+        for boleto, dia in zip(gerar_boletos(num_boletos), rng.integers(-30, horizonte_dias, num_boletos))
+    ]
+
+    cronograma = agendar_pagamentos(boletos, 5000.0, recebiveis, inicio, horizonte_dias)
+    assert cronograma['fluxo_caixa'].min() >= 0
+
+    tempo = medir(lambda: agendar_pagamentos(boletos, 5000.0, recebiveis, inicio, horizonte_dias))
+    print(f"{'agendar_pagamentos':<28} {tempo:9.3f} ms   custo total: R$ {cronograma['custo_total']:,.2f}   "
+          f"saques: {len(cronograma['saques'])}")
+    assert tempo < tempo_maximo_ms, f"cronograma levou {tempo:.1f} ms (meta: {tempo_maximo_ms:.0f} ms)"
+
+
+def benchmark_simulacao(num_boletos: int = 200, num_saldos: int = 10, num_taxas: int = 3):
+    """Compara um analisar_pagamento_boletos por cenário com a simulação em lote"""
+    print(f"\n🧪 Simulação de cenários ({num_saldos} saldos × {num_taxas} giro × {num_taxas} adiantamento, "
+          f"{num_boletos} boletos)")
+    boletos = [
+        {"codigo": b["id"], "valor": b["valor"], "juros_diario": b["multa"] / 2}
+        for b in gerar_boletos(num_boletos)
+    ]
+    total = sum(b["valor"] for b in boletos)
+    # Valores em reais inteiros: a tabela da mochila é exata
+    for boleto in boletos:
+        boleto["valor"] = float(round(boleto["valor"]))
+    saldos = np.linspace(0, total, num_saldos).round()
+    taxas_giro = np.linspace(0.04, 0.12, num_taxas)
+    taxas_adiantamento = np.linspace(0.06, 0.18, num_taxas)
+
+    def cenario_a_cenario():
+        # Só há taxa fixa no relatório: cada cenário de taxa repete a análise do saldo
+        return [analisar_pagamento_boletos(saldo, boletos=boletos)
+                for saldo in saldos.tolist() for _ in range(num_taxas * num_taxas)]
+
+    tabela = simular_cenarios(saldos, taxas_giro, taxas_adiantamento, boletos=boletos)
+    assert len(tabela) == num_saldos * num_taxas * num_taxas
+
+    imprimir_resultado(
+        "simular_cenarios",
+        medir(cenario_a_cenario, 1),
+        medir(lambda: simular_cenarios(saldos, taxas_giro, taxas_adiantamento, boletos=boletos), 3),
+    )
+
+
+def benchmark_risco(caminhos: int = 100_000, num_boletos: int = 30, processos: int = 4):
+    """Mede a simulação de risco dos recebíveis em um processo e em um pool"""
+    print(f"\n🎲 Risco dos recebíveis ({caminhos:,} caminhos, {num_boletos} boletos)")
+    boletos = [
+        {"codigo": b["id"], "valor": b["valor"] / 10, "juros_diario": b["multa"] / 2}
+        for b in gerar_boletos(num_boletos)
+    ]
+
+    def simular(num_processos=None):
+        return simular_risco_recebiveis(boletos, 5000.0, data_referencia="2025-10-20", caminhos=caminhos,
+                                        semente=42, processos=num_processos)
+
+    assert simular() == simular(processos)
+    print(f"{'1 processo':<28} {medir(simular, 3):9.3f} ms")
+    print(f"{f'{processos} processos':<28} {medir(lambda: simular(processos), 3):9.3f} ms")
+
+
+def _tempo_importacao(codigo: str) -> tuple:
+    """Roda `codigo` em um interpretador novo; retorna (ms, crewai carregado?)"""
+    script = (
+        "import sys, time\n"
+        "inicio = time.perf_counter()\n"
+        f"{codigo}\n"
+        "print((time.perf_counter() - inicio) * 1000, 'crewai' in sys.modules)"
+    )
+    saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    return float(saida[0]), saida[1] == "True"
+
+
+def benchmark_importacao(repeticoes: int = 5):
+    """Tempo de importação (processo novo) do caminho simples e do serviço CrewAI"""
+    print("\n📦 Importação")
+    casos = [
+        ("financial_tools_simple", "import financial_tools_simple"),
+        ("crew (sem iniciar)", "import crew"),
+        ("análise simples", "from financial_tools_simple import analisar_pagamento_boletos\n"
+                            "analisar_pagamento_boletos(1000.0, boletos=[{'codigo': 'A', 'valor': 500.0, "
+                            "'juros_diario': 0.01}])"),
+    ]
+    try:
+        import crewai  # noqa: F401
+        casos.append(("crew + CrewAI iniciado", "import crew\ncrew.obter_servico_crewai().crew"))
+    except ImportError:
+        print("   (crewai não instalado: serviço CrewAI não medido)")
+    for nome, codigo in casos:
+        tempos = [_tempo_importacao(codigo) for _ in range(repeticoes)]
+        print(f"{nome:<28} {min(t for t, _ in tempos):9.3f} ms   crewai carregado: {tempos[0][1]}")
+
+
+if __name__ == "__main__":
+    num_boletos = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    benchmark_precificacao(num_boletos)
+    benchmark_priorizacao(num_boletos)
+    benchmark_selecao()
+    benchmark_cronograma()
+    benchmark_cronograma_exato()
+    benchmark_simulacao()
+    benchmark_risco()
+    benchmark_importacao()
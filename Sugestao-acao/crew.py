@@ -1,84 +1,139 @@
-import sys
-# Importa pysqlite3 e o coloca no lugar do sqlite3 padrão
-__import__('pysqlite3')
-sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
+"""
+Análise financeira com CrewAI (agente + tarefa configurados nos YAML)
+
+Importar este módulo é barato: crewai/langchain, a troca do sqlite3 pelo
+pysqlite3 e o .env só são carregados no primeiro uso do serviço, e Agent,
+Task e Crew são construídos uma única vez por processo.
 
+Uso:
+    python crew.py
+ou
+    from crew import obter_servico_crewai
+    resultado = obter_servico_crewai().executar()
+"""
 import os
-from dotenv import load_dotenv
-import yaml
-from crewai import Agent, Task, Crew, Process
+import sys
+from functools import lru_cache
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
 
-# Garante que as variáveis de ambiente (como a API Key) estão carregadas
-load_dotenv()
 
 # =================================================================
 # 1. FUNÇÃO PARA CARREGAR CONFIGURAÇÕES YAML
 # =================================================================
 def load_yaml_config(file_path):
     """Carrega o conteúdo de um arquivo YAML."""
+    import yaml
+
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo de configuração não encontrado: {file_path}")
     with open(file_path, 'r', encoding='utf-8') as f:
         return yaml.safe_load(f)
 
-# Carrega a classe da sua Custom Tool
-from financial_tools import FinancialAnalysisTool
 
-# Instancia a Tool
-financial_tool = FinancialAnalysisTool()
+@lru_cache(maxsize=1)
+def _importar_crewai():
+    """Importa o CrewAI (uma vez); retorna (Agent, Task, Crew, Process)"""
+    # Coloca o pysqlite3 no lugar do sqlite3 padrão (o do sistema pode ser antigo demais)
+    try:
+        __import__('pysqlite3')
+        sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
+    except ImportError:
+        pass
+
+    from dotenv import load_dotenv
+    from crewai import Agent, Task, Crew, Process
+
+    # Garante que as variáveis de ambiente (como a API Key) estão carregadas
+    load_dotenv()
+    return Agent, Task, Crew, Process
+
 
 # =================================================================
-# 2. CARREGAR E CONSTRUIR AGENTES E TAREFAS
+# 2. SERVIÇO: CONSTRÓI AGENTES, TAREFAS E CREW NO PRIMEIRO USO
 # =================================================================
+class ServicoCrewAI:
+    """Crew da análise financeira, construído sob demanda e reaproveitado"""
+
+    def __init__(self, agents_path: str = None, tasks_path: str = None):
+        self.agents_path = agents_path or os.path.join(DIRETORIO, 'agents.yaml')
+        self.tasks_path = tasks_path or os.path.join(DIRETORIO, 'tasks.yaml')
+        self._crew = None
+
+    @property
+    def iniciado(self) -> bool:
+        return self._crew is not None
+
+    @property
+    def crew(self):
+        if self._crew is None:
+            self._crew = self._construir()
+        return self._crew
+
+    def _construir(self):
+        Agent, Task, Crew, Process = _importar_crewai()
+        # Carrega a classe da Custom Tool (também depende do CrewAI)
+        from financial_tools import FinancialAnalysisTool
+
+        # Carrega as configurações dos arquivos YAML
+        agents_config = load_yaml_config(self.agents_path)
+        tasks_config = load_yaml_config(self.tasks_path)
+
+        # Acessa a configuração do agente (o nome do bloco no agents.yaml)
+        analyst_data = agents_config['financial_analyst']
+
+        # 2.1. CONSTRUIR O AGENTE MANUALMENTE (INJETANDO A TOOL)
+        financial_analyst = Agent(
+            # Traduz as chaves do YAML para os parâmetros do Agent
+            role=analyst_data['role'],
+            goal=analyst_data['goal'],
+            backstory=analyst_data['backstory'],
+            verbose=analyst_data.get('verbose', True),  # Usa valor do YAML ou True como padrão
+            allow_delegation=analyst_data.get('allow_delegation', False),
+
+            # INJETA A TOOL CUSTOMIZADA AQUI:
+            tools=[FinancialAnalysisTool()]
+        )
+
+        # Acessa a configuração da tarefa (o nome do bloco no tasks.yaml)
+        task_data = tasks_config['debt_analysis_task']
+
+        # 2.2. CONSTRUIR A TAREFA MANUALMENTE (CONECTANDO AO AGENTE)
+        debt_analysis_task = Task(
+            # Traduz as chaves do YAML para os parâmetros da Task
+            description=task_data['description'],
+            expected_output=task_data['expected_output'],
+
+            # CONECTA A TAREFA AO AGENTE CONSTRUÍDO ACIMA:
+            agent=financial_analyst
+        )
+
+        return Crew(
+            agents=[financial_analyst],  # Lista dos agentes construídos
+            tasks=[debt_analysis_task],  # Lista das tarefas construídas
+
+            process=Process.sequential,
+            verbose=True,
+        )
+
+    def executar(self, inputs: dict = None):
+        """Executa o crew (kickoff) e retorna o resultado"""
+        return self.crew.kickoff(inputs=inputs) if inputs else self.crew.kickoff()
+
+
+@lru_cache(maxsize=1)
+def obter_servico_crewai() -> ServicoCrewAI:
+    """Serviço único por processo"""
+    return ServicoCrewAI()
 
-# Carrega as configurações dos arquivos YAML
-agents_config = load_yaml_config('agents.yaml')
-tasks_config = load_yaml_config('tasks.yaml')
-
-# Acessa a configuração do agente (o nome do bloco no agents.yaml)
-analyst_data = agents_config['financial_analyst']
-
-# 2.1. CONSTRUIR O AGENTE MANUALMENTE (INJETANDO A TOOL)
-financial_analyst = Agent(
-    # Traduz as chaves do YAML para os parâmetros do Agent
-    role=analyst_data['role'],
-    goal=analyst_data['goal'],
-    backstory=analyst_data['backstory'],
-    verbose=analyst_data.get('verbose', True), # Usa valor do YAML ou True como padrão
-    allow_delegation=analyst_data.get('allow_delegation', False), 
-    
-    # INJETA SUA TOOL CUSTOMIZADA AQUI:
-    tools=[financial_tool] 
-)
-
-# Acessa a configuração da tarefa (o nome do bloco no tasks.yaml)
-task_data = tasks_config['debt_analysis_task']
-
-# 2.2. CONSTRUIR A TAREFA MANUALMENTE (CONECTANDO AO AGENTE)
-debt_analysis_task = Task(
-    # Traduz as chaves do YAML para os parâmetros da Task
-    description=task_data['description'],
-    expected_output=task_data['expected_output'],
-    
-    # CONECTA A TAREFA AO AGENTE CONSTRUÍDO ACIMA:
-    agent=financial_analyst
-)
 
 # =================================================================
 # 3. CRIAR E INICIAR O CREW
 # =================================================================
+if __name__ == "__main__":
+    print("\nIniciando a análise financeira com configurações YAML carregadas manualmente...")
+    result = obter_servico_crewai().executar()
 
-crew = Crew(
-    agents=[financial_analyst], # Lista dos agentes construídos
-    tasks=[debt_analysis_task], # Lista das tarefas construídas
-    
-    process=Process.sequential,
-    verbose=True,
-)
-
-print("\nIniciando a análise financeira com configurações YAML carregadas manualmente...")
-result = crew.kickoff()
-
-print("\n\n########################")
-print("RELATÓRIO FINANCEIRO FINAL:")
-print(result)
\ No newline at end of file
+    print("\n\n########################")
+    print("RELATÓRIO FINANCEIRO FINAL:")
+    print(result)
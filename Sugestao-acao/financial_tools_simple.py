@@ -3,6 +3,9 @@ Ferramenta de análise financeira simplificada (compatível com todas versões d
 """
 import json
 
+from financiamento import ProdutoFinanciamento, otimizar_financiamento
+from selecao_pagamento import MODO_SELECAO_PADRAO, selecionar_pagamentos
+
 # Definições de custos de financiamento
 TAXA_CAPITAL_GIRO = 0.08  # 8% total do valor financiado
 TAXA_ADIANTAMENTO = 0.15  # 15% total do valor financiado
@@ -17,65 +20,164 @@ RECEBIVEIS_FUTUROS = [
 ]
 
 
-def calcular_melhor_financiamento(valor: float) -> tuple:
-    """Calcula a melhor opção de financiamento considerando recebíveis futuros"""
-    custo_giro = valor * TAXA_CAPITAL_GIRO
-    
-    # Calcula recebíveis disponíveis para adiantamento
-    recebiveis_disponiveis = sum(r["valor"] for r in RECEBIVEIS_FUTUROS)
-    
-    if valor <= recebiveis_disponiveis:
-        custo_adiantamento = valor * TAXA_ADIANTAMENTO
-    else:
-        # Se precisar de mais que os recebíveis, combina estratégias
-        custo_adiantamento = recebiveis_disponiveis * TAXA_ADIANTAMENTO
-        valor_restante = valor - recebiveis_disponiveis
-        custo_adiantamento += valor_restante * TAXA_CAPITAL_GIRO
-    
-    if custo_giro <= custo_adiantamento:
-        return custo_giro, f"Capital de Giro ({TAXA_CAPITAL_GIRO*100:.0f}%)", custo_giro + valor
-    else:
-        return custo_adiantamento, f"Adiantamento de Recebíveis ({TAXA_ADIANTAMENTO*100:.0f}%)", custo_adiantamento + valor
+def produtos_financiamento(recebiveis: list = None) -> tuple:
+    """Produtos disponíveis: capital de giro e adiantamento limitado aos recebíveis futuros"""
+    recebiveis = RECEBIVEIS_FUTUROS if recebiveis is None else recebiveis
+    return (
+        ProdutoFinanciamento("Capital de Giro", TAXA_CAPITAL_GIRO),
+        ProdutoFinanciamento("Adiantamento de Recebíveis", TAXA_ADIANTAMENTO,
+                             limite=sum(r["valor"] for r in recebiveis)),
+    )
 
 
-def analisar_pagamento_boletos(saldo_atual: float, boletos_file_path: str) -> str:
+def calcular_melhor_financiamento(valor: float, produtos: tuple = None) -> tuple:
     """
-    Analisa boletos e retorna plano de pagamento otimizado
-    
-    Args:
-        saldo_atual: Saldo disponível em caixa
-        boletos_file_path: Caminho para arquivo JSON com boletos
-    
+    Calcula a melhor combinação de financiamento para o valor.
+
     Returns:
-        String com relatório detalhado
+        (custo, descrição dos produtos usados, total com custo)
     """
-    try:
-        # Carrega boletos
-        with open(boletos_file_path, 'r', encoding='utf-8') as f:
-            boletos = json.load(f)
-        
-        # Calcula custo de atraso e prioriza
-        for boleto in boletos:
-            boleto['custo_atraso_estimado'] = boleto['valor'] * boleto['juros_diario']
-        
-        # Ordena por custo de atraso (maior para menor)
-        boletos_ordenados = sorted(boletos, key=lambda x: x['custo_atraso_estimado'], reverse=True)
-        
-        # Separa boletos que podem ser pagos com saldo
-        saldo_restante = saldo_atual
-        boletos_pagar_saldo = []
-        boletos_financiar = []
-        
-        for boleto in boletos_ordenados:
-            if saldo_restante >= boleto['valor']:
-                saldo_restante -= boleto['valor']
-                boletos_pagar_saldo.append(boleto)
-            else:
-                boletos_financiar.append(boleto)
-        
-        # Calcula totais
-        total_a_financiar = sum(b['valor'] for b in boletos_financiar)
-        divida_a_cobrir = total_a_financiar - saldo_restante
+    financiamento = otimizar_financiamento(valor, produtos or produtos_financiamento())
+    return financiamento['custo_total'], financiamento['metodo'], financiamento['custo_total'] + valor
+
+
+def carregar_boletos(boletos_file_path: str) -> list:
+    """Lê a lista de boletos (formato CrewAI) de um arquivo JSON"""
+    with open(boletos_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+NOMES_ESTRATEGIAS_RISCO = {
+    "capital_giro": "Capital de Giro",
+    "adiantamento": "Adiantamento de Recebíveis",
+    "pagamento_parcial": "Pagamento Parcial",
+    "cronograma": "Cronograma de Caixa",
+}
+
+
+class PlanoPagamento:
+    """
+    Plano de pagamento calculado uma única vez.
+
+    Guarda os números do plano (boletos pagos com saldo, a financiar, déficit,
+    financiamento e, se pedido, o risco dos recebíveis); os formatos de saída
+    (texto, dict/JSON, compacto) só são montados quando pedidos e ficam
+    guardados no próprio objeto.
+    """
+
+    def __init__(self, saldo_atual: float, boletos_ordenados: list, pagar: list, saldo_restante: float,
+                 risco: dict = None):
+        self.saldo_atual = saldo_atual
+        self.boletos_ordenados = boletos_ordenados
+        self.pagar = pagar  # na ordem de boletos_ordenados
+        self.saldo_restante = saldo_restante
+        self.risco = risco
+
+        self.boletos_pagar_saldo = [b for b, pago in zip(boletos_ordenados, pagar) if pago]
+        self.boletos_financiar = [b for b, pago in zip(boletos_ordenados, pagar) if not pago]
+        self.total_dividas = sum(b['valor'] for b in boletos_ordenados)
+        self.total_a_financiar = sum(b['valor'] for b in self.boletos_financiar)
+        self.divida_a_cobrir = self.total_a_financiar - saldo_restante
+
+        self._texto = None
+        self._dict = None
+
+    @property
+    def precisa_financiar(self) -> bool:
+        return self.divida_a_cobrir > 0
+
+    @property
+    def financiamento(self) -> tuple:
+        """(custo, método, total) da melhor combinação para o déficit (em cache)"""
+        if not self.precisa_financiar:
+            return 0.0, "", 0.0
+        financiamento = self.otimizacao_financiamento()
+        return financiamento['custo_total'], financiamento['metodo'], financiamento['custo_total'] + self.divida_a_cobrir
+
+    def otimizacao_financiamento(self) -> dict:
+        """Combinação de produtos para o déficit, com as tranches (ver otimizar_financiamento; em cache)"""
+        return otimizar_financiamento(max(self.divida_a_cobrir, 0.0), produtos_financiamento())
+
+    def pagamento_parcial(self) -> dict:
+        """
+        Alternativa ao financiamento: pagar agora o que o plano paga com saldo e
+        deixar o restante para quando os recebíveis caírem (juros de 1 dia)
+        """
+        custo_juros = sum(b['custo_atraso_estimado'] for b in self.boletos_financiar)
+        return {
+            'boletos_pagar_agora': self.boletos_pagar_saldo,
+            'boletos_deixar_depois': self.boletos_financiar,
+            'valor_pagar_agora': sum(b['valor'] for b in self.boletos_pagar_saldo),
+            'valor_deixar_depois': self.total_a_financiar,
+            'custo_juros': custo_juros,
+            'economia': self.divida_a_cobrir * TAXA_CAPITAL_GIRO - custo_juros,
+            'saldo_restante': self.saldo_restante,
+        }
+
+    def custos_por_produto(self) -> dict:
+        """Custo de cobrir o déficit só com capital de giro ou só com adiantamento"""
+        deficit = max(self.divida_a_cobrir, 0.0)
+        return {
+            'capital_giro': deficit * TAXA_CAPITAL_GIRO,
+            'adiantamento': deficit * TAXA_ADIANTAMENTO,
+        }
+
+    def para_texto(self) -> str:
+        """Relatório completo (o mesmo de analisar_pagamento_boletos)"""
+        if self._texto is None:
+            self._texto = "\n".join(self._linhas_relatorio())
+        return self._texto
+
+    def para_dict(self) -> dict:
+        """Plano em estruturas simples (para JSON ou para outras telas)"""
+        if self._dict is None:
+            custo_fin, metodo_fin, total_fin = self.financiamento
+            self._dict = {
+                'saldo_atual': self.saldo_atual,
+                'total_boletos': len(self.boletos_ordenados),
+                'total_dividas': self.total_dividas,
+                'pagar_com_saldo': [b['codigo'] for b in self.boletos_pagar_saldo],
+                'financiar': [b['codigo'] for b in self.boletos_financiar],
+                'valor_pagar_com_saldo': sum(b['valor'] for b in self.boletos_pagar_saldo),
+                'valor_financiar': self.total_a_financiar,
+                'saldo_restante': self.saldo_restante,
+                'divida_a_cobrir': max(self.divida_a_cobrir, 0.0),
+                'financiamento': {'metodo': metodo_fin, 'custo': custo_fin, 'total': total_fin},
+                'custos_por_produto': self.custos_por_produto(),
+                'risco': self.risco,
+            }
+        return self._dict
+
+    def para_json(self) -> str:
+        return json.dumps(self.para_dict(), ensure_ascii=False)
+
+    def para_compacto(self) -> str:
+        """Resumo de uma linha"""
+        pagar = f"Pagar {len(self.boletos_pagar_saldo)} boletos com saldo (R$ {sum(b['valor'] for b in self.boletos_pagar_saldo):,.2f})"
+        if not self.precisa_financiar:
+            return f"{pagar}; saldo suficiente."
+        custo_fin, metodo_fin, _ = self.financiamento
+        return (f"{pagar}; financiar R$ {self.divida_a_cobrir:,.2f} via {metodo_fin} "
+                f"(custo R$ {custo_fin:,.2f}).")
+
+    def _linhas_risco(self) -> list:
+        caminhos = self.risco['caminhos']
+        linhas = ["", "-" * 60, f"🎲 RISCO DOS RECEBÍVEIS ({caminhos:,} cenários de atraso/inadimplência)", "-" * 60]
+        for chave, nome in NOMES_ESTRATEGIAS_RISCO.items():
+            linhas.append(f"   • {nome}: esperado R$ {self.risco[chave]['custo_esperado']:,.2f} | "
+                          f"pior 5% R$ {self.risco[chave]['cvar95']:,.2f}")
+        linhas.append(f"   ✅ Menor custo esperado: {NOMES_ESTRATEGIAS_RISCO[self.risco['melhor_estrategia']]}")
+        return linhas
+
+    def _linhas_relatorio(self) -> list:
+        boletos = self.boletos_ordenados
+        boletos_ordenados = self.boletos_ordenados
+        boletos_pagar_saldo = self.boletos_pagar_saldo
+        boletos_financiar = self.boletos_financiar
+        saldo_atual = self.saldo_atual
+        saldo_restante = self.saldo_restante
+        total_a_financiar = self.total_a_financiar
+        divida_a_cobrir = self.divida_a_cobrir
         
         # Monta relatório
         relatorio = []
@@ -85,7 +187,7 @@ def analisar_pagamento_boletos(saldo_atual: float, boletos_file_path: str) -> st
         relatorio.append("")
         relatorio.append(f"💰 SALDO DE CAIXA INICIAL: R$ {saldo_atual:,.2f}")
         relatorio.append(f"📋 TOTAL DE BOLETOS: {len(boletos)}")
-        relatorio.append(f"💵 VALOR TOTAL DAS DÍVIDAS: R$ {sum(b['valor'] for b in boletos):,.2f}")
+        relatorio.append(f"💵 VALOR TOTAL DAS DÍVIDAS: R$ {self.total_dividas:,.2f}")
         relatorio.append("")
         relatorio.append("-" * 60)
         
@@ -111,7 +213,7 @@ def analisar_pagamento_boletos(saldo_atual: float, boletos_file_path: str) -> st
             relatorio.append("")
             
             # Calcula melhor opção de financiamento
-            custo_fin, metodo_fin, total_fin = calcular_melhor_financiamento(divida_a_cobrir)
+            custo_fin, metodo_fin, total_fin = self.financiamento
             
             relatorio.append("-" * 60)
             relatorio.append("💡 SIMULAÇÃO DE FINANCIAMENTO")
@@ -155,13 +257,16 @@ def analisar_pagamento_boletos(saldo_atual: float, boletos_file_path: str) -> st
             # Lista boletos priorizados
             relatorio.append("📋 ORDEM DE PRIORIDADE (por custo de juros):")
             relatorio.append("")
-            for i, boleto in enumerate(boletos_ordenados[:5], 1):
-                status = "✅ Pagar com saldo" if boleto in boletos_pagar_saldo else "💳 Financiar"
+            for i, (boleto, pago) in enumerate(zip(boletos_ordenados[:5], self.pagar), 1):
+                status = "✅ Pagar com saldo" if pago else "💳 Financiar"
                 relatorio.append(f"   {i}. {boleto['codigo']} - R$ {boleto['valor']:,.2f} - {status}")
                 relatorio.append(f"      Custo de atraso diário: R$ {boleto['custo_atraso_estimado']:.2f}")
             
             if len(boletos_ordenados) > 5:
                 relatorio.append(f"   ... e mais {len(boletos_ordenados) - 5} boletos")
+            
+            if self.risco is not None:
+                relatorio.extend(self._linhas_risco())
         
         relatorio.append("")
         relatorio.append("=" * 60)
@@ -172,9 +277,76 @@ def analisar_pagamento_boletos(saldo_atual: float, boletos_file_path: str) -> st
         relatorio.append("✓ Financiar o mínimo necessário")
         relatorio.append("✓ Escolher a opção de financiamento mais barata")
         relatorio.append("=" * 60)
-        
-        return "\n".join(relatorio)
+        return relatorio
+
+
+def calcular_plano_pagamento(saldo_atual: float, boletos_file_path: str = None, boletos: list = None,
+                             modo_selecao: str = MODO_SELECAO_PADRAO, caminhos_risco: int = 0,
+                             data_referencia: str = None) -> PlanoPagamento:
+    """
+    Calcula o plano de pagamento (sem montar relatório)
+    
+    Args:
+        saldo_atual: Saldo disponível em caixa
+        boletos_file_path: Caminho para arquivo JSON com boletos (modo de compatibilidade)
+        boletos: Lista de boletos em memória ({"codigo", "valor", "juros_diario"});
+            tem prioridade sobre boletos_file_path
+        modo_selecao: "otimo" (maximiza os juros evitados com o saldo) ou
+            "guloso" (paga por ordem de custo enquanto couber)
+        caminhos_risco: se > 0, simula atrasos e inadimplência dos recebíveis
+            nesse número de caminhos e inclui o risco de cada estratégia
+        data_referencia: data da análise para a simulação de risco (padrão: hoje)
+    
+    Returns:
+        PlanoPagamento
+    """
+    # Carrega boletos (só lê arquivo se a lista não foi passada)
+    if boletos is None:
+        boletos = carregar_boletos(boletos_file_path)
+    
+    # Calcula custo de atraso e prioriza (em cópias, sem alterar a lista recebida)
+    boletos = [
+        {**boleto, 'custo_atraso_estimado': boleto['valor'] * boleto['juros_diario']}
+        for boleto in boletos
+    ]
+    
+    # Ordena por custo de atraso (maior para menor)
+    boletos_ordenados = sorted(boletos, key=lambda x: x['custo_atraso_estimado'], reverse=True)
+    
+    # Separa boletos que podem ser pagos com saldo
+    selecao = selecionar_pagamentos(
+        [b['valor'] for b in boletos_ordenados],
+        [b['juros_diario'] for b in boletos_ordenados],
+        saldo_atual,
+        modo=modo_selecao
+    )
+    
+    risco = None
+    if caminhos_risco > 0 and sum(b['valor'] for b in boletos) > saldo_atual:
+        # Import local: risco_recebiveis depende deste módulo
+        from risco_recebiveis import simular_risco_recebiveis
+        risco = simular_risco_recebiveis(boletos, saldo_atual, data_referencia=data_referencia,
+                                         caminhos=caminhos_risco)
+    
+    return PlanoPagamento(saldo_atual, boletos_ordenados, selecao['pagar'].tolist(), selecao['saldo_restante'],
+                          risco=risco)
+
+
+def analisar_pagamento_boletos(saldo_atual: float, boletos_file_path: str = None, boletos: list = None,
+                               modo_selecao: str = MODO_SELECAO_PADRAO, caminhos_risco: int = 0,
+                               data_referencia: str = None) -> str:
+    """
+    Analisa boletos e retorna plano de pagamento otimizado
+    
+    Mesmos argumentos de calcular_plano_pagamento.
+    
+    Returns:
+        String com relatório detalhado
+    """
+    try:
+        plano = calcular_plano_pagamento(saldo_atual, boletos_file_path, boletos, modo_selecao,
+                                         caminhos_risco, data_referencia)
+        return plano.para_texto()
         
     except Exception as e:
         return f"❌ ERRO na análise: {str(e)}"
-
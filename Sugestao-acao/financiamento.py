@@ -0,0 +1,111 @@
+"""
+Combinação ótima de produtos de financiamento
+
+Divide o déficit entre vários produtos (capital de giro, adiantamento de
+recebíveis, ...), cada um com taxa, limite, data de disponibilidade e tarifa
+fixa opcional, e devolve a combinação mais barata.
+
+Sem tarifas o problema é linear com uma única restrição, e preencher os
+produtos da menor para a maior taxa até cobrir o déficit é ótimo. Com
+tarifas, cada subconjunto de produtos é avaliado com o mesmo preenchimento
+(são poucos produtos). O resultado fica em cache por (déficit em centavos,
+produtos, data), então as várias telas do chatbot que perguntam pelo mesmo
+déficit não recalculam.
+"""
+from functools import lru_cache
+from itertools import combinations
+from typing import NamedTuple, Optional
+
+
+class ProdutoFinanciamento(NamedTuple):
+    """Produto de financiamento (imutável, para servir de chave do cache)"""
+    nome: str
+    taxa: float  # custo sobre o valor tomado
+    limite: Optional[float] = None  # None = sem limite
+    disponivel_em: Optional[str] = None  # 'YYYY-MM-DD'; None = disponível já
+    tarifa: float = 0.0  # custo fixo quando o produto é usado
+
+
+def _preencher(centavos: int, produtos: tuple) -> tuple:
+    """Toma dos produtos mais baratos primeiro; retorna (tranches, centavos descobertos)"""
+    tranches = []
+    restante = centavos
+    for produto in sorted(produtos, key=lambda p: p.taxa):
+        if restante <= 0:
+            break
+        limite = restante if produto.limite is None else min(restante, round(produto.limite * 100))
+        if limite > 0:
+            tranches.append((produto, limite))
+            restante -= limite
+    return tuple(tranches), restante
+
+
+def _custo(tranches: tuple) -> float:
+    return sum(centavos / 100 * produto.taxa + produto.tarifa for produto, centavos in tranches)
+
+
+@lru_cache(maxsize=1024)
+def _otimizar(centavos: int, produtos: tuple, data_necessaria: Optional[str]) -> tuple:
+    disponiveis = tuple(
+        p for p in produtos
+        if p.disponivel_em is None or data_necessaria is None or p.disponivel_em <= data_necessaria
+    )
+    melhor, descoberto = _preencher(centavos, disponiveis)
+    if descoberto > 0 or not any(p.tarifa for p in disponiveis):
+        return melhor, descoberto
+
+    # Tarifas fixas: pode compensar deixar algum produto de fora
+    melhor_custo = _custo(melhor)
+    for tamanho in range(1, len(disponiveis)):
+        for subconjunto in combinations(disponiveis, tamanho):
+            tranches, faltando = _preencher(centavos, subconjunto)
+            if faltando == 0 and _custo(tranches) < melhor_custo:
+                melhor, melhor_custo = tranches, _custo(tranches)
+    return melhor, 0
+
+
+def otimizar_financiamento(deficit: float, produtos: tuple, data_necessaria: str = None) -> dict:
+    """
+    Combinação mais barata de produtos para cobrir o déficit.
+
+    Args:
+        deficit: valor a financiar
+        produtos: tupla de ProdutoFinanciamento
+        data_necessaria: data em que o dinheiro é necessário ('YYYY-MM-DD');
+            produtos disponíveis só depois dela ficam de fora
+
+    Returns:
+        dict com tranches ({produto, taxa, valor, custo}), valor_financiado,
+        valor_descoberto, custo_total, total (financiado + custo) e metodo
+    """
+    centavos = max(round(deficit * 100), 0)
+    tranches, descoberto = _otimizar(centavos, tuple(produtos), data_necessaria)
+
+    detalhes = [
+        {
+            'produto': produto.nome,
+            'taxa': produto.taxa,
+            'valor': valor / 100,
+            'custo': valor / 100 * produto.taxa + produto.tarifa,
+        }
+        for produto, valor in tranches
+    ]
+    valor_financiado = sum(t['valor'] for t in detalhes)
+    custo_total = sum(t['custo'] for t in detalhes)
+    return {
+        'tranches': detalhes,
+        'valor_financiado': valor_financiado,
+        'valor_descoberto': descoberto / 100,
+        'custo_total': custo_total,
+        'total': valor_financiado + custo_total,
+        'metodo': " + ".join(f"{t['produto']} ({t['taxa'] * 100:.0f}%)" for t in detalhes),
+    }
+
+
+def info_cache_financiamento():
+    """Estatísticas do cache (hits, misses, tamanho)"""
+    return _otimizar.cache_info()
+
+
+def limpar_cache_financiamento():
+    _otimizar.cache_clear()
@@ -0,0 +1,292 @@
+"""
+Cronograma de pagamentos dia a dia com o fluxo de caixa
+
+Simula o caixa de cada dia do horizonte (saldo inicial + recebíveis na data
+em que caem - boletos pagos) e decide, para cada boleto, entre:
+- pagar com caixa no primeiro dia em que o caixa acumulado comporta o
+  boleto (juros diários pelos dias de espera além do vencimento), ou
+- pagar no vencimento com financiamento (capital de giro e, se ele tiver
+  limite, adiantamento dos recebíveis que o cronograma não usa), quando a
+  espera custa mais que o financiamento.
+
+São montadas três filas e fica o cronograma mais barato:
+- por vencimento: no mesmo vencimento, maior taxa diária primeiro, decidindo
+  esperar ou financiar boleto a boleto;
+- por prazo: esperar vale a pena por até taxa / juros_diario dias depois do
+  vencimento (o prazo do boleto). Na ordem dos prazos, quando o caixa
+  acumulado até o prazo não comporta todos os escolhidos, é financiado o de
+  maior taxa diária entre todos eles, não só o último da fila;
+- por prazo, financiando pelo valor: como a anterior, mas financia o menor
+  boleto que sozinho cobre o excesso (o custo do financiamento é
+  proporcional ao valor financiado).
+
+É uma heurística, não a solução exata: nunca fica pior que a fila por
+vencimento, e benchmark_sugestao.py mede a distância até o ótimo (programação
+dinâmica exata) em instâncias pequenas. O caixa acumulado por dia é um cumsum
+e o dia de cada pagamento sai de um searchsorted, então o custo é
+O(boletos × log boletos + boletos × log dias), mais O(boletos²) no pior caso
+da fila por valor.
+"""
+import bisect
+import heapq
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from financial_tools_simple import RECEBIVEIS_FUTUROS, TAXA_ADIANTAMENTO, TAXA_CAPITAL_GIRO
+
+HORIZONTE_PADRAO = 90  # dias
+
+ORIGEM_SALDO = "saldo"
+ORIGEM_CAPITAL_GIRO = "capital_giro"
+ORIGEM_ADIANTAMENTO = "adiantamento"
+ORIGEM_SEM_COBERTURA = "sem_cobertura"
+
+
+def para_data(valor) -> date:
+    """Data a partir de None (hoje), date, datetime ou texto 'AAAA-MM-DD'"""
+    if valor is None:
+        return date.today()
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return datetime.strptime(valor, '%Y-%m-%d').date()
+
+
+def recebiveis_por_dia(recebiveis: list, data_referencia: date, horizonte_dias: int) -> np.ndarray:
+    """
+    Valor dos recebíveis que caem em cada dia do horizonte. Recebíveis
+    anteriores à data de referência são ignorados (já fazem parte do saldo)
+    e os posteriores ao horizonte não entram.
+    """
+    entradas = np.zeros(horizonte_dias + 1)
+    if recebiveis:
+        dias = (np.array([r['data'] for r in recebiveis], dtype='datetime64[D]')
+                - np.datetime64(data_referencia, 'D')).astype(np.int64)
+        valores = np.array([r['valor'] for r in recebiveis], dtype=float)
+        no_horizonte = (dias >= 0) & (dias <= horizonte_dias)
+        np.add.at(entradas, dias[no_horizonte], valores[no_horizonte])
+    return entradas
+
+
+def _adiantar(entradas: np.ndarray, valor: float) -> np.ndarray:
+    """Entradas por dia depois de adiantar `valor` a partir dos recebíveis mais distantes"""
+    acumulado_do_fim = np.cumsum(entradas[::-1])[::-1]
+    removido = np.clip(valor - (acumulado_do_fim - entradas), 0, entradas)
+    return entradas - removido
+
+
+def agendar_pagamentos(boletos: list, saldo_atual: float, recebiveis: list = None, data_referencia=None,
+                       horizonte_dias: int = HORIZONTE_PADRAO, taxa_capital_giro: float = TAXA_CAPITAL_GIRO,
+                       taxa_adiantamento: float = TAXA_ADIANTAMENTO, limite_capital_giro: float = None) -> dict:
+    """
+    Monta o cronograma de pagamentos de menor custo (juros + financiamento)
+    entre as três filas descritas na docstring do módulo.
+
+    Args:
+        boletos: dicts com valor, juros_diario, codigo (ou id) e, opcionalmente,
+            data_vencimento (sem ela o boleto é tratado como vencido)
+        saldo_atual: caixa disponível hoje
+        recebiveis: entradas futuras {"data", "valor", ...} (padrão: RECEBIVEIS_FUTUROS)
+        data_referencia: dia 0 do cronograma (padrão: hoje)
+        horizonte_dias: quantos dias simular
+        taxa_capital_giro: custo do capital de giro sobre o valor financiado
+        taxa_adiantamento: custo do adiantamento sobre o valor adiantado
+        limite_capital_giro: teto do capital de giro (None = sem limite)
+
+    Returns:
+        dict com pagamentos (um por boleto, na ordem de pagamento, com o
+        índice do boleto na lista recebida), saques de
+        financiamento, fluxo_caixa (caixa ao fim de cada dia), custos e totais
+    """
+    referencia = para_data(data_referencia)
+    recebiveis = RECEBIVEIS_FUTUROS if recebiveis is None else recebiveis
+    entradas = recebiveis_por_dia(recebiveis, referencia, horizonte_dias)
+    caixa = saldo_atual + np.cumsum(entradas)
+
+    valores = np.array([b['valor'] for b in boletos], dtype=float)
+    juros_diario = np.array([b['juros_diario'] for b in boletos], dtype=float)
+    vencimentos = np.zeros(len(boletos), dtype=np.int64)
+    com_data = [i for i, b in enumerate(boletos) if b.get('data_vencimento')]
+    if com_data:
+        datas = np.array([boletos[i]['data_vencimento'] for i in com_data], dtype='datetime64[D]')
+        vencimentos[com_data] = np.maximum((datas - np.datetime64(referencia, 'D')).astype(np.int64), 0)
+
+    limiares = caixa + 0.005  # tolerância de meio centavo na comparação do caixa acumulado
+    parametros = (boletos, valores, juros_diario, vencimentos, entradas, caixa, limiares, referencia,
+                  horizonte_dias, taxa_capital_giro, taxa_adiantamento, limite_capital_giro)
+
+    # Fila por vencimento: no mesmo dia, maior taxa diária e, na mesma taxa,
+    # menor valor (aproveita o caixa de hoje em vez de esperar)
+    por_vencimento = _montar_cronograma(np.lexsort((valores, -juros_diario, vencimentos)), set(), *parametros)
+
+    # Fila por prazo, com os financiados escolhidos entre todos os boletos
+    prazos = _prazos(juros_diario, vencimentos, horizonte_dias, taxa_capital_giro)
+    ordem = np.lexsort((valores, -juros_diario, prazos))
+    financiar = _escolher_financiados(ordem, prazos, valores, juros_diario, vencimentos, limiares)
+    por_prazo = _montar_cronograma(ordem, financiar, *parametros)
+    financiar = _escolher_financiados_por_valor(ordem, prazos, valores, vencimentos, limiares)
+    por_valor = _montar_cronograma(ordem, financiar, *parametros)
+
+    return min(por_vencimento, por_prazo, por_valor, key=lambda cronograma: cronograma['custo_total'])
+
+
+def _prazos(juros_diario: np.ndarray, vencimentos: np.ndarray, horizonte_dias: int,
+            taxa_financiamento: float) -> np.ndarray:
+    """
+    Último dia em que esperar ainda custa até o financiamento (limitado ao
+    horizonte; vencimento depois do horizonte fica com prazo antes dele)
+    """
+    espera_maxima = np.floor(np.divide(taxa_financiamento, juros_diario, out=np.full(len(juros_diario), np.inf),
+                                       where=juros_diario > 0) + 1e-9)
+    return np.minimum(vencimentos + np.minimum(espera_maxima, horizonte_dias + 1), horizonte_dias).astype(np.int64)
+
+
+def _escolher_financiados(ordem: np.ndarray, prazos: np.ndarray, valores: np.ndarray, juros_diario: np.ndarray,
+                          vencimentos: np.ndarray, limiares: np.ndarray) -> set:
+    """
+    Boletos a financiar: na ordem dos prazos, o caixa acumulado até o prazo
+    de cada boleto precisa cobrir todos os escolhidos até ele; se não cobre,
+    financia os de maior taxa diária entre os escolhidos até caber.
+    """
+    financiar = set()
+    escolhidos = []  # heap: (-taxa diária, -valor, boleto)
+    reservado = 0.0
+    for i in ordem.tolist():
+        if prazos[i] < vencimentos[i]:
+            financiar.add(i)
+            continue
+        heapq.heappush(escolhidos, (-juros_diario[i], -valores[i], i))
+        reservado += valores[i]
+        while reservado > limiares[prazos[i]]:
+            _, _, j = heapq.heappop(escolhidos)
+            financiar.add(j)
+            reservado -= valores[j]
+    return financiar
+
+
+def _escolher_financiados_por_valor(ordem: np.ndarray, prazos: np.ndarray, valores: np.ndarray,
+                                   vencimentos: np.ndarray, limiares: np.ndarray) -> set:
+    """
+    Como _escolher_financiados, mas cobre o excesso financiando o menor boleto
+    que sozinho o resolve (ou o maior, se nenhum resolve)
+    """
+    financiar = set()
+    escolhidos = []  # ordenada: (valor, boleto)
+    reservado = 0.0
+    for i in ordem.tolist():
+        if prazos[i] < vencimentos[i]:
+            financiar.add(i)
+            continue
+        bisect.insort(escolhidos, (valores[i], i))
+        reservado += valores[i]
+        while reservado > limiares[prazos[i]]:
+            posicao = bisect.bisect_left(escolhidos, (reservado - limiares[prazos[i]], -1))
+            valor, j = escolhidos.pop(min(posicao, len(escolhidos) - 1))
+            financiar.add(j)
+            reservado -= valor
+    return financiar
+
+
+def _montar_cronograma(ordem: np.ndarray, financiar: set, boletos: list, valores: np.ndarray,
+                       juros_diario: np.ndarray, vencimentos: np.ndarray, entradas: np.ndarray, caixa: np.ndarray,
+                       limiares: np.ndarray, referencia: date, horizonte_dias: int, taxa_capital_giro: float,
+                       taxa_adiantamento: float, limite_capital_giro: float) -> dict:
+    """Cronograma pagando na ordem da fila; `financiar` vai direto para o financiamento"""
+    dias_pagamento = np.full(len(boletos), -1, dtype=np.int64)
+    financiados = []
+    pago_com_caixa = 0.0
+    giro_restante = np.inf if limite_capital_giro is None else limite_capital_giro
+
+    for i in ordem.tolist():
+        valor, vencimento = valores[i], int(vencimentos[i])
+        dia = max(int(np.searchsorted(limiares, pago_com_caixa + valor)), vencimento)
+        taxa_financiamento = taxa_capital_giro if giro_restante >= valor else taxa_adiantamento
+        custo_espera = valor * juros_diario[i] * (dia - vencimento)
+        if i in financiar or dia > horizonte_dias or custo_espera > valor * taxa_financiamento:
+            financiados.append(i)
+            giro_restante -= min(valor, giro_restante)
+        else:
+            dias_pagamento[i] = dia
+            pago_com_caixa += valor
+
+    # Caixa ao fim de cada dia pagando só com caixa
+    com_caixa = dias_pagamento >= 0
+    saidas = np.zeros(horizonte_dias + 1)
+    np.add.at(saidas, dias_pagamento[com_caixa], valores[com_caixa])
+    fluxo_caixa = caixa - np.cumsum(saidas)
+
+    # Fontes do financiamento (sacado no vencimento do boleto): capital de giro
+    # até o limite, depois adiantamento dos recebíveis mais distantes, desde
+    # que o caixa de nenhum dia fique negativo sem eles
+    origens = {}
+    giro_restante = np.inf if limite_capital_giro is None else limite_capital_giro
+    recebiveis_depois = entradas.sum() - np.cumsum(entradas)
+    adiantavel = max(0.0, min(float(entradas.sum()), float((fluxo_caixa + recebiveis_depois).min())))
+    for i in financiados:
+        valor = valores[i]
+        if valor <= giro_restante:
+            origens[i], giro_restante = ORIGEM_CAPITAL_GIRO, giro_restante - valor
+        elif valor <= adiantavel:
+            origens[i], adiantavel = ORIGEM_ADIANTAMENTO, adiantavel - valor
+        else:
+            origens[i] = ORIGEM_SEM_COBERTURA
+        dias_pagamento[i] = vencimentos[i]
+
+    pagamentos = []
+    custo_juros = 0.0
+    totais = {ORIGEM_CAPITAL_GIRO: 0.0, ORIGEM_ADIANTAMENTO: 0.0, ORIGEM_SEM_COBERTURA: 0.0}
+    for i in sorted(ordem.tolist(), key=lambda i: dias_pagamento[i]):
+        origem = origens.get(i, ORIGEM_SALDO)
+        dia = int(dias_pagamento[i])
+        if origem == ORIGEM_SEM_COBERTURA:
+            # Fica em aberto até o fim do horizonte
+            juros = valores[i] * juros_diario[i] * max(horizonte_dias - int(vencimentos[i]), 0)
+            dia = None
+        else:
+            juros = valores[i] * juros_diario[i] * (dia - int(vencimentos[i]))
+        if origem != ORIGEM_SALDO:
+            totais[origem] += valores[i]
+        custo_juros += juros
+        boleto = boletos[i]
+        pagamentos.append({
+            'codigo': boleto.get('codigo', boleto.get('id')),
+            'indice': i,
+            'valor': float(valores[i]),
+            'dia': dia,
+            'data': (referencia + timedelta(days=dia)).isoformat() if dia is not None else None,
+            'origem': origem,
+            'juros': float(juros),
+        })
+
+    # Recebíveis adiantados deixam de entrar no caixa nos seus dias
+    if totais[ORIGEM_ADIANTAMENTO] > 0:
+        fluxo_caixa = fluxo_caixa - np.cumsum(entradas - _adiantar(entradas, totais[ORIGEM_ADIANTAMENTO]))
+
+    # Saques de financiamento agrupados por dia e linha
+    taxas = {ORIGEM_CAPITAL_GIRO: taxa_capital_giro, ORIGEM_ADIANTAMENTO: taxa_adiantamento}
+    por_dia = {}
+    for pagamento in pagamentos:
+        if pagamento['origem'] in taxas:
+            chave = (pagamento['dia'], pagamento['origem'])
+            por_dia[chave] = por_dia.get(chave, 0.0) + pagamento['valor']
+    saques = [
+        {'dia': dia, 'data': (referencia + timedelta(days=dia)).isoformat(), 'linha': linha,
+         'valor': valor, 'custo': valor * taxas[linha]}
+        for (dia, linha), valor in sorted(por_dia.items())
+    ]
+    custo_financiamento = sum(s['custo'] for s in saques)
+
+    return {
+        'pagamentos': pagamentos,
+        'saques': saques,
+        'fluxo_caixa': fluxo_caixa,
+        'data_referencia': referencia.isoformat(),
+        'custo_juros': custo_juros,
+        'custo_financiamento': custo_financiamento,
+        'custo_total': custo_juros + custo_financiamento,
+        'valor_capital_giro': totais[ORIGEM_CAPITAL_GIRO],
+        'valor_adiantamento': totais[ORIGEM_ADIANTAMENTO],
+        'valor_sem_cobertura': totais[ORIGEM_SEM_COBERTURA],
+    }
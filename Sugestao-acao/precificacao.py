@@ -0,0 +1,102 @@
+"""
+Precificação vetorizada de boletos
+
+Calcula dias de atraso, juros acumulados e taxa de juros diária de todos os
+boletos em aberto de uma empresa de uma só vez (arrays NumPy), no lugar de
+um datetime.strptime e uma conta em Python por boleto.
+"""
+import numpy as np
+
+TAXA_DIARIA_PADRAO = 0.002  # 0.2% ao dia quando o boleto não tem juros calculado
+MULTA_PADRAO = 0.02  # multa diária usada quando o boleto não informa a sua
+
+
+def datas_para_dias(datas) -> np.ndarray:
+    """
+    Converte datas para datetime64[D].
+
+    Aceita strings 'YYYY-MM-DD', datetime.date, datetime64 ou inteiros com
+    dias desde 1970-01-01 (como Boleto.vencimento_dia).
+    """
+    return np.asarray(datas).astype("datetime64[D]")
+
+
+def dias_de_atraso(vencimentos, data_referencia) -> np.ndarray:
+    """Dias entre o vencimento e a data de referência (negativo se ainda não venceu)"""
+    referencia = np.datetime64(data_referencia, "D")
+    return (referencia - datas_para_dias(vencimentos)).astype(np.int64)
+
+
+def juros_acumulados(valores, multas, dias_atraso) -> np.ndarray:
+    """Juros acumulados (valor × multa × dias); zero para boletos não vencidos"""
+    valores = np.asarray(valores, dtype=float)
+    multas = np.asarray(multas, dtype=float)
+    dias_atraso = np.asarray(dias_atraso)
+    return np.where(dias_atraso > 0, valores * multas * dias_atraso, 0.0)
+
+
+def taxa_juros_diaria(valores, juros) -> np.ndarray:
+    """
+    Taxa diária estimada de cada boleto: juros / valor quando há juros
+    calculado e valor positivo, senão TAXA_DIARIA_PADRAO.
+    """
+    valores = np.asarray(valores, dtype=float)
+    juros = np.asarray(juros, dtype=float)
+    usa_juros = (juros > 0) & (valores > 0)
+    return np.where(usa_juros, juros / np.where(usa_juros, valores, 1.0), TAXA_DIARIA_PADRAO)
+
+
+def multas_ou_padrao(multas) -> np.ndarray:
+    """Array de multas com MULTA_PADRAO no lugar das ausentes (None)"""
+    return np.array([MULTA_PADRAO if multa is None else multa for multa in multas], dtype=float)
+
+
+def precificar_boletos(valores, vencimentos, data_referencia, multas=None) -> dict:
+    """
+    Precifica todos os boletos em um único passo.
+
+    Args:
+        valores: valores dos boletos
+        vencimentos: datas de vencimento (ver datas_para_dias)
+        data_referencia: data usada para contar o atraso
+        multas: multa diária de cada boleto (None usa MULTA_PADRAO)
+
+    Returns:
+        dict de arrays: dias_atraso, juros (acumulados) e juros_diario
+    """
+    valores = np.asarray(valores, dtype=float)
+    multas = np.full(len(valores), MULTA_PADRAO) if multas is None else multas_ou_padrao(multas)
+
+    dias = dias_de_atraso(vencimentos, data_referencia)
+    juros = juros_acumulados(valores, multas, dias)
+    return {
+        "dias_atraso": dias,
+        "juros": juros,
+        "juros_diario": taxa_juros_diaria(valores, juros),
+    }
+
+
+def priorizar_pagamento(valores, juros_diario, saldo_disponivel: float) -> tuple:
+    """
+    Ordena os boletos pelo custo diário de atraso (valor × juros diário, maior
+    primeiro) e marca os que cabem no saldo, na ordem.
+
+    Returns:
+        (ordem, pagar, saldo_restante): índices na ordem de prioridade, máscara
+        (na mesma ordem) dos boletos pagos com o saldo e o saldo que sobra
+    """
+    valores = np.asarray(valores, dtype=float)
+    custo_diario = valores * np.asarray(juros_diario, dtype=float)
+
+    # Estável: empates mantêm a ordem original, como sorted(..., reverse=True)
+    ordem = np.argsort(-custo_diario, kind="stable")
+
+    # O saldo é consumido em sequência (um boleto que não cabe não impede os seguintes)
+    pagar = np.zeros(len(valores), dtype=bool)
+    saldo_restante = saldo_disponivel
+    for posicao, valor in enumerate(valores[ordem].tolist()):
+        if saldo_restante >= valor:
+            saldo_restante -= valor
+            pagar[posicao] = True
+
+    return ordem, pagar, saldo_restante
@@ -0,0 +1,199 @@
+"""
+Risco dos recebíveis no plano de pagamento (Monte Carlo)
+
+Os recebíveis futuros atrasam ou não são pagos. Este módulo sorteia milhares
+de caminhos (atraso em dias ~ Poisson e inadimplência ~ Bernoulli, por origem
+do recebível) e calcula o custo de cada estratégia em cada caminho:
+
+- capital_giro: financia o déficit hoje (não depende dos recebíveis)
+- adiantamento: adianta os recebíveis (com regresso: o que não é pago volta
+  como dívida e é coberto com capital de giro) e completa com giro
+- pagamento_parcial: paga com o saldo os boletos escolhidos por
+  selecionar_pagamentos e deixa os demais na fila, pagos (com juros diários)
+  quando o caixa acumulado com os recebíveis que de fato chegaram comporta
+- cronograma: financia o que agendar_pagamentos manda financiar e paga o
+  resto com caixa na ordem do cronograma, conforme os recebíveis chegam
+
+Boleto que não é coberto até o fim do horizonte acumula juros até lá e é
+financiado com capital de giro. Os caminhos são processados em blocos
+vetorizados (NumPy); com processos > 1 os blocos vão para um
+ProcessPoolExecutor. Cada bloco tem a sua semente derivada da semente
+principal, então o resultado não depende do número de processos.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from financial_tools_simple import RECEBIVEIS_FUTUROS, TAXA_ADIANTAMENTO, TAXA_CAPITAL_GIRO
+from fluxo_caixa import ORIGEM_SALDO, agendar_pagamentos, para_data
+from selecao_pagamento import selecionar_pagamentos
+
+CAMINHOS_PADRAO = 10_000
+TAMANHO_BLOCO = 10_000  # caminhos por bloco vetorizado
+HORIZONTE_PADRAO = 90  # dias
+
+# (probabilidade de não pagamento, atraso médio em dias) por origem do recebível
+RISCO_POR_ORIGEM = {
+    "Vendas à vista": (0.01, 0.5),
+    "Cartão de crédito": (0.005, 1.0),
+    "PIX": (0.0, 0.0),
+    "Boleto bancário": (0.08, 4.0),
+    "Vendas parceladas": (0.05, 3.0),
+}
+RISCO_PADRAO = (0.05, 3.0)
+
+ESTRATEGIAS = ("capital_giro", "adiantamento", "pagamento_parcial", "cronograma")
+
+
+def _custo_fila(valores, custo_diario, dias_chegada, valores_chegada, caixa_inicial, horizonte, taxa_giro):
+    """
+    Custo, em cada caminho, de pagar a fila de boletos (na ordem) à medida que
+    o caixa acumulado cobre cada um.
+
+    dias_chegada/valores_chegada: (caminhos × recebíveis), com valor zero para
+    os que não chegam dentro do horizonte.
+    """
+    caminhos = len(dias_chegada)
+    if len(valores) == 0:
+        return np.zeros(caminhos)
+
+    # Recebíveis em ordem de chegada em cada caminho, com o caixa de hoje na frente
+    ordem = np.argsort(dias_chegada, axis=1, kind="stable")
+    dias = np.concatenate([np.zeros((caminhos, 1), dtype=np.int64),
+                           np.take_along_axis(dias_chegada, ordem, axis=1)], axis=1)
+    caixa = caixa_inicial + np.concatenate([np.zeros((caminhos, 1)),
+                                            np.cumsum(np.take_along_axis(valores_chegada, ordem, axis=1), axis=1)],
+                                           axis=1)
+
+    # Primeiro ponto em que o caixa acumulado cobre cada boleto da fila
+    limiares = np.cumsum(valores) - 0.005
+    posicao = np.zeros((caminhos, len(valores)), dtype=np.int64)
+    for k in range(caixa.shape[1]):
+        posicao += caixa[:, k, None] < limiares[None, :]
+    coberto = posicao < caixa.shape[1]
+    dia = np.take_along_axis(dias, np.minimum(posicao, caixa.shape[1] - 1), axis=1)
+
+    custo = np.where(coberto, dia * custo_diario, horizonte * custo_diario + valores * taxa_giro)
+    return custo.sum(axis=1)
+
+
+def _simular_bloco(parametros) -> np.ndarray:
+    """Custos (estratégias × caminhos) de um bloco de caminhos"""
+    (semente, caminhos, dias_base, valores_recebiveis, inadimplencia, atraso_medio,
+     horizonte, taxa_giro, taxa_adiantamento, deficit, filas) = parametros
+    rng = np.random.default_rng(semente)
+    k = len(valores_recebiveis)
+
+    dias = dias_base + rng.poisson(atraso_medio, size=(caminhos, k))
+    pago = rng.random((caminhos, k)) >= inadimplencia
+    chega = pago & (dias <= horizonte)
+    valores_chegada = np.where(chega, valores_recebiveis, 0.0)
+    dias_chegada = np.where(chega, dias, horizonte + 1)
+
+    custos = np.empty((len(ESTRATEGIAS), caminhos))
+    custos[0] = deficit * taxa_giro
+
+    # Adiantamento com regresso: parte não paga do adiantado volta como dívida
+    total_recebiveis = valores_recebiveis.sum()
+    adiantado = min(deficit, total_recebiveis)
+    nao_pago = np.where(pago, 0.0, valores_recebiveis).sum(axis=1)
+    proporcao = nao_pago / total_recebiveis if total_recebiveis > 0 else np.zeros(caminhos)
+    custos[1] = (adiantado * taxa_adiantamento + (deficit - adiantado) * taxa_giro
+                 + adiantado * proporcao * taxa_giro)
+
+    for linha, (valores, custo_diario, caixa_inicial, custo_fixo) in enumerate(filas, start=2):
+        custos[linha] = custo_fixo + _custo_fila(valores, custo_diario, dias_chegada, valores_chegada,
+                                                 caixa_inicial, horizonte, taxa_giro)
+    return custos
+
+
+def _estatisticas(custos: np.ndarray) -> dict:
+    ordenados = np.sort(custos)
+    cauda = ordenados[int(np.floor(0.95 * len(ordenados))):]
+    return {
+        'custo_esperado': float(custos.mean()),
+        'desvio': float(custos.std()),
+        'p95': float(np.percentile(custos, 95)),
+        'cvar95': float(cauda.mean()),  # média dos 5% piores caminhos
+        'minimo': float(ordenados[0]),
+        'maximo': float(ordenados[-1]),
+    }
+
+
+def simular_risco_recebiveis(boletos: list, saldo_atual: float, recebiveis: list = None, data_referencia=None,
+                             caminhos: int = CAMINHOS_PADRAO, horizonte_dias: int = HORIZONTE_PADRAO,
+                             taxa_capital_giro: float = TAXA_CAPITAL_GIRO,
+                             taxa_adiantamento: float = TAXA_ADIANTAMENTO, risco: dict = None,
+                             semente: int = None, processos: int = None,
+                             tamanho_bloco: int = TAMANHO_BLOCO) -> dict:
+    """
+    Custo esperado e de cauda de cada estratégia com recebíveis incertos.
+
+    Args:
+        boletos: dicts com valor, juros_diario e codigo (ou id), todos a pagar hoje
+        saldo_atual: caixa disponível hoje
+        recebiveis: {"data", "valor", "origem"} (padrão: RECEBIVEIS_FUTUROS)
+        data_referencia: dia 0 da simulação (padrão: hoje)
+        caminhos: número de caminhos sorteados
+        horizonte_dias: até quando esperar os recebíveis
+        taxa_capital_giro / taxa_adiantamento: custos dos financiamentos
+        risco: {origem: (probabilidade de não pagamento, atraso médio)}; origens
+            ausentes usam RISCO_PADRAO
+        semente: semente do sorteio (None = aleatória)
+        processos: > 1 distribui os blocos em um pool de processos
+        tamanho_bloco: caminhos por bloco vetorizado
+
+    Returns:
+        dict {estratégia: {custo_esperado, desvio, p95, cvar95, minimo, maximo}}
+        mais 'caminhos' e 'melhor_estrategia' (menor custo esperado)
+    """
+    referencia = para_data(data_referencia)
+    recebiveis = RECEBIVEIS_FUTUROS if recebiveis is None else recebiveis
+    risco = {**RISCO_POR_ORIGEM, **(risco or {})}
+
+    # Recebíveis já vencidos na data de referência fazem parte do saldo
+    dias_base = np.array([(para_data(r['data']) - referencia).days for r in recebiveis], dtype=np.int64)
+    futuros = dias_base >= 0
+    dias_base = dias_base[futuros]
+    valores_recebiveis = np.array([r['valor'] for r in recebiveis], dtype=float)[futuros]
+    parametros_risco = np.array([risco.get(r.get('origem'), RISCO_PADRAO) for r in recebiveis],
+                                dtype=float).reshape(-1, 2)[futuros]
+    inadimplencia, atraso_medio = parametros_risco[:, 0], parametros_risco[:, 1]
+
+    valores = np.array([b['valor'] for b in boletos], dtype=float)
+    juros_diario = np.array([b['juros_diario'] for b in boletos], dtype=float)
+    custo_diario = valores * juros_diario
+    deficit = max(valores.sum() - saldo_atual, 0.0)
+
+    # Pagamento parcial: o saldo paga a seleção; o resto espera, maior taxa primeiro
+    selecao = selecionar_pagamentos(valores, juros_diario, saldo_atual)
+    fila = np.flatnonzero(~selecao['pagar'])
+    fila = fila[np.argsort(-juros_diario[fila], kind="stable")]
+    fila_parcial = (valores[fila], custo_diario[fila], selecao['saldo_restante'], 0.0)
+
+    # Cronograma: financiados têm custo fixo; os pagos com caixa esperam na ordem planejada
+    plano = agendar_pagamentos(boletos, saldo_atual, recebiveis, referencia, horizonte_dias,
+                               taxa_capital_giro, taxa_adiantamento)
+    com_caixa = np.array([p['indice'] for p in plano['pagamentos'] if p['origem'] == ORIGEM_SALDO],
+                         dtype=np.int64)
+    fila_cronograma = (valores[com_caixa], custo_diario[com_caixa], saldo_atual, plano['custo_financiamento'])
+
+    # Blocos com sementes independentes (mesmo resultado com ou sem pool)
+    tamanhos = [min(tamanho_bloco, caminhos - inicio) for inicio in range(0, caminhos, tamanho_bloco)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    blocos = [
+        (sementes[i], tamanho, dias_base, valores_recebiveis, inadimplencia, atraso_medio, horizonte_dias,
+         taxa_capital_giro, taxa_adiantamento, deficit, (fila_parcial, fila_cronograma))
+        for i, tamanho in enumerate(tamanhos)
+    ]
+    if processos and processos > 1 and len(blocos) > 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resultados = list(pool.map(_simular_bloco, blocos))
+    else:
+        resultados = [_simular_bloco(bloco) for bloco in blocos]
+    custos = np.concatenate(resultados, axis=1)
+
+    relatorio = {nome: _estatisticas(custos[i]) for i, nome in enumerate(ESTRATEGIAS)}
+    relatorio['caminhos'] = caminhos
+    relatorio['melhor_estrategia'] = min(ESTRATEGIAS, key=lambda nome: relatorio[nome]['custo_esperado'])
+    return relatorio
@@ -0,0 +1,306 @@
+"""
+Seleção dos boletos a pagar com o saldo disponível
+
+Dois modos:
+- "guloso": ordena pelo custo diário de atraso (valor × juros diário) e paga
+  enquanto couber no saldo (comportamento original).
+- "otimo": mochila 0/1 em centavos que maximiza os juros evitados (soma do
+  custo diário dos boletos pagos) sem ultrapassar o saldo. A programação
+  dinâmica é exata enquanto (boletos × saldo em centavos) cabe em
+  LIMITE_CELULAS (após dividir pelo MDC dos valores). Acima disso (saldo alto
+  em centavos) tenta a mochila esparsa, também exata, que guarda só as
+  combinações não dominadas (peso, juros evitados) e serve bem para poucos
+  boletos; se ela passar de LIMITE_ESTADOS, os valores são escalados
+  (arredondados para cima, sempre viável) e o que sobra do saldo é
+  completado de forma gulosa. Se o tempo limite estourar, usa a melhor
+  solução obtida até ali. O resultado nunca é pior que o guloso.
+"""
+import math
+import time
+
+import numpy as np
+
+from precificacao import priorizar_pagamento
+
+MODO_GULOSO = "guloso"
+MODO_OTIMO = "otimo"
+MODO_SELECAO_PADRAO = MODO_OTIMO
+
+TEMPO_LIMITE_PADRAO = 0.5  # segundos
+LIMITE_CELULAS = 20_000_000  # boletos × capacidade da tabela (1 bit por célula)
+LIMITE_ESTADOS = 200_000  # combinações não dominadas por etapa da mochila esparsa
+
+
+def _para_centavos(valores) -> np.ndarray:
+    return np.rint(np.asarray(valores, dtype=float) * 100).astype(np.int64)
+
+
+def _resultado(pagar, valores, custo_diario, saldo_disponivel, metodo, exato):
+    valor_pago = float(valores[pagar].sum())
+    return {
+        "pagar": pagar,
+        "valor_pago": valor_pago,
+        "juros_evitados": float(custo_diario[pagar].sum()),
+        "saldo_restante": saldo_disponivel - valor_pago,
+        "metodo": metodo,
+        "exato": exato,
+    }
+
+
+def _selecao_gulosa(valores, juros_diario, saldo_disponivel) -> np.ndarray:
+    """Máscara (na ordem original) dos boletos pagos pela regra gulosa"""
+    ordem, pagar_ordenado, _ = priorizar_pagamento(valores, juros_diario, saldo_disponivel)
+    pagar = np.zeros(len(valores), dtype=bool)
+    pagar[ordem[pagar_ordenado]] = True
+    return pagar
+
+
+def _mochila(pesos, ganhos, capacidade, prazo):
+    """
+    Mochila 0/1 por programação dinâmica sobre a capacidade.
+
+    Os itens devem vir na ordem de preferência: se o prazo estourar, a tabela
+    fica restrita aos itens já processados. Retorna (escolhas, completo), onde
+    escolhas tem uma linha de bits por item (pegar o item com capacidade c?)
+    e serve para reconstruir a solução de qualquer capacidade até a total.
+    """
+    melhor = np.zeros(capacidade + 1)
+    escolhas = []
+    completo = True
+
+    for peso, ganho in zip(pesos.tolist(), ganhos.tolist()):
+        if time.perf_counter() > prazo:
+            completo = False
+            break
+        pegar = np.zeros(capacidade + 1, dtype=bool)
+        if peso <= capacidade:
+            candidato = melhor[:capacidade + 1 - peso] + ganho
+            np.greater(candidato, melhor[peso:], out=pegar[peso:])
+            np.maximum(melhor[peso:], candidato, out=melhor[peso:])
+        escolhas.append(np.packbits(pegar))
+    return escolhas, completo
+
+
+def _reconstruir(escolhas, pesos, capacidade) -> np.ndarray:
+    """Itens escolhidos pela tabela para a capacidade dada (de trás para frente)"""
+    escolhidos = np.zeros(len(pesos), dtype=bool)
+    c = capacidade
+    for i in range(len(escolhas) - 1, -1, -1):
+        if (escolhas[i][c >> 3] >> (7 - (c & 7))) & 1:
+            escolhidos[i] = True
+            c -= int(pesos[i])
+    return escolhidos
+
+
+def _mochila_esparsa(pesos, ganhos, capacidade, prazo, limite_estados=LIMITE_ESTADOS):
+    """
+    Mochila 0/1 exata sobre as combinações não dominadas.
+
+    Cada estado é um par (peso, ganho); um estado com mais peso e ganho menor
+    ou igual a outro nunca é melhor, para nenhuma capacidade, e é descartado.
+    Com poucos itens o número de estados fica pequeno mesmo quando a
+    capacidade (saldo em centavos) é grande. Retorna (pesos dos estados
+    finais, histórico para reconstrução), ou None se o prazo estourar ou os
+    estados passarem de limite_estados.
+    """
+    estado_peso = np.zeros(1, dtype=np.int64)
+    estado_ganho = np.zeros(1)
+    historico = []
+
+    for peso, ganho in zip(pesos.tolist(), ganhos.tolist()):
+        if time.perf_counter() > prazo:
+            return None
+        cabe = np.flatnonzero(estado_peso + peso <= capacidade)
+        novo_peso = np.concatenate([estado_peso, estado_peso[cabe] + peso])
+        novo_ganho = np.concatenate([estado_ganho, estado_ganho[cabe] + ganho])
+        origem = np.concatenate([np.arange(len(estado_peso)), cabe])
+        pegou = np.arange(len(novo_peso)) >= len(estado_peso)
+
+        # Por peso crescente, fica só quem ganha mais que todos os mais leves
+        ordem = np.lexsort((-novo_ganho, novo_peso))
+        ganho_ordenado = novo_ganho[ordem]
+        melhor_anterior = np.maximum.accumulate(np.concatenate([[-np.inf], ganho_ordenado[:-1]]))
+        manter = ordem[ganho_ordenado > melhor_anterior]
+        if len(manter) > limite_estados:
+            return None
+
+        historico.append((origem[manter], pegou[manter]))
+        estado_peso, estado_ganho = novo_peso[manter], novo_ganho[manter]
+    return estado_peso, historico
+
+
+def _reconstruir_esparsa(estado_peso, historico, capacidade) -> np.ndarray:
+    """Itens do melhor estado com peso até a capacidade (o ganho cresce com o peso)"""
+    escolhidos = np.zeros(len(historico), dtype=bool)
+    k = int(np.searchsorted(estado_peso, capacidade, side="right")) - 1
+    for i in range(len(historico) - 1, -1, -1):
+        origem, pegou = historico[i]
+        escolhidos[i] = pegou[k]
+        k = int(origem[k])
+    return escolhidos
+
+
+def _centavos_do_saldo(saldo_disponivel: float) -> int:
+    return int(math.floor(saldo_disponivel * 100 + 1e-6)) if saldo_disponivel > 0 else 0
+
+
+class _TabelaMochila:
+    """
+    Tabela da mochila montada para a maior capacidade; resolve qualquer
+    saldo menor sem refazer a programação dinâmica. Quando a tabela completa
+    não cabe em limite_celulas, usa a mochila esparsa (se ela couber) ou a
+    tabela com valores escalados.
+    """
+
+    def __init__(self, centavos, juros_diario, custo_diario, capacidade, tempo_limite, limite_celulas):
+        self.centavos = centavos
+        self.custo_diario = custo_diario
+
+        # Só entram na mochila boletos que cabem sozinhos e evitam algum juros
+        candidatos = np.flatnonzero((centavos <= capacidade) & (custo_diario > 0))
+        # Melhor razão juros/valor primeiro (se o prazo estourar, ficam os mais vantajosos)
+        self.candidatos = candidatos[np.argsort(-juros_diario[candidatos], kind="stable")]
+
+        # Divide pelo MDC dos valores (ex: todos em reais inteiros) sem perder exatidão
+        self.mdc = max(int(np.gcd.reduce(centavos[self.candidatos])) if len(self.candidatos) else 1, 1)
+        pesos = centavos[self.candidatos] // self.mdc
+        self.soma_pesos = int(pesos.sum())
+        capacidade_tabela = min(capacidade // self.mdc, self.soma_pesos)
+
+        self.escala = max(1, math.ceil(len(self.candidatos) * (capacidade_tabela + 1) / limite_celulas))
+        prazo = time.perf_counter() + tempo_limite
+
+        self.esparsa = None
+        if self.escala > 1:
+            self.esparsa = _mochila_esparsa(pesos, custo_diario[self.candidatos], capacidade_tabela, prazo)
+        if self.esparsa is not None:
+            self.exato = True
+            return
+
+        self.pesos = -(-pesos // self.escala)  # arredonda para cima: solução sempre viável
+        self.escolhas, self.completo = _mochila(self.pesos, custo_diario[self.candidatos],
+                                                self._capacidade_tabela(capacidade), prazo)
+        self.exato = self.completo and self.escala == 1
+
+    def _capacidade_tabela(self, capacidade: int) -> int:
+        return min(capacidade // self.mdc, self.soma_pesos) // self.escala
+
+    def resolver(self, capacidade: int, guloso: np.ndarray) -> tuple:
+        """(pagar, metodo) para uma capacidade até a da tabela"""
+        centavos, candidatos = self.centavos, self.candidatos
+        if self.esparsa is not None:
+            escolhidos = _reconstruir_esparsa(*self.esparsa, min(capacidade // self.mdc, self.soma_pesos))
+            pagar = np.zeros(len(centavos), dtype=bool)
+            pagar[candidatos[escolhidos]] = True
+            return pagar, "mochila_esparsa"
+
+        escolhidos = _reconstruir(self.escolhas, self.pesos, self._capacidade_tabela(capacidade))
+
+        pagar = np.zeros(len(centavos), dtype=bool)
+        pagar[candidatos[escolhidos]] = True
+
+        # Completa os centavos que sobraram (arredondamento da escala ou prazo estourado)
+        sobra = capacidade - int(centavos[pagar].sum())
+        for i in candidatos[~escolhidos].tolist():
+            if centavos[i] <= sobra:
+                pagar[i] = True
+                sobra -= int(centavos[i])
+
+        metodo = "mochila" if self.exato else "mochila_aproximada"
+        if not self.exato:
+            # Aproximação: fica com a melhor entre ela, o guloso original e o guloso por taxa
+            por_taxa = np.zeros(len(centavos), dtype=bool)
+            sobra = capacidade
+            for i in candidatos.tolist():
+                if centavos[i] <= sobra:
+                    por_taxa[i] = True
+                    sobra -= int(centavos[i])
+            for alternativa, nome in ((guloso, MODO_GULOSO), (por_taxa, "guloso_por_taxa")):
+                if self.custo_diario[alternativa].sum() > self.custo_diario[pagar].sum():
+                    pagar, metodo = alternativa, nome
+        return pagar, metodo
+
+
+def selecionar_pagamentos(valores, juros_diario, saldo_disponivel: float, modo: str = MODO_SELECAO_PADRAO,
+                          tempo_limite: float = TEMPO_LIMITE_PADRAO, limite_celulas: int = LIMITE_CELULAS) -> dict:
+    """
+    Escolhe os boletos a pagar com o saldo.
+
+    Args:
+        valores: valor de cada boleto
+        juros_diario: taxa de juros diária de cada boleto
+        saldo_disponivel: saldo em caixa
+        modo: "otimo" (mochila) ou "guloso"
+        tempo_limite: tempo máximo (segundos) da otimização
+        limite_celulas: tamanho máximo da tabela antes de escalar os valores
+
+    Returns:
+        dict com pagar (máscara na ordem original), valor_pago,
+        juros_evitados, saldo_restante, metodo e exato
+    """
+    valores = np.asarray(valores, dtype=float)
+    juros_diario = np.asarray(juros_diario, dtype=float)
+    custo_diario = valores * juros_diario
+
+    if modo not in (MODO_GULOSO, MODO_OTIMO):
+        raise ValueError(f"Modo de seleção '{modo}' não reconhecido.")
+
+    guloso = _selecao_gulosa(valores, juros_diario, saldo_disponivel)
+    if modo == MODO_GULOSO:
+        return _resultado(guloso, valores, custo_diario, saldo_disponivel, MODO_GULOSO, False)
+
+    centavos = _para_centavos(valores)
+    capacidade = _centavos_do_saldo(saldo_disponivel)
+
+    # Tudo cabe no saldo: pagar tudo é ótimo
+    if centavos.sum() <= capacidade:
+        return _resultado(np.ones(len(valores), dtype=bool), valores, custo_diario, saldo_disponivel, "todos", True)
+
+    tabela = _TabelaMochila(centavos, juros_diario, custo_diario, capacidade, tempo_limite, limite_celulas)
+    pagar, metodo = tabela.resolver(capacidade, guloso)
+    return _resultado(pagar, valores, custo_diario, saldo_disponivel, metodo, tabela.exato)
+
+
+def selecionar_pagamentos_lote(valores, juros_diario, saldos, modo: str = MODO_SELECAO_PADRAO,
+                               tempo_limite: float = TEMPO_LIMITE_PADRAO,
+                               limite_celulas: int = LIMITE_CELULAS) -> np.ndarray:
+    """
+    Seleção para vários saldos de uma vez.
+
+    O guloso percorre os boletos uma vez, decidindo todos os saldos em cada
+    passo; o ótimo monta uma única tabela da mochila (para o maior saldo) e
+    reconstrói a solução de cada saldo a partir dela.
+
+    Returns:
+        matriz booleana (saldos × boletos) com os boletos pagos em cada saldo
+    """
+    valores = np.asarray(valores, dtype=float)
+    juros_diario = np.asarray(juros_diario, dtype=float)
+    saldos = np.asarray(saldos, dtype=float)
+    custo_diario = valores * juros_diario
+
+    if modo not in (MODO_GULOSO, MODO_OTIMO):
+        raise ValueError(f"Modo de seleção '{modo}' não reconhecido.")
+
+    # Guloso vetorizado nos saldos (mesma ordem e mesmas subtrações de priorizar_pagamento)
+    ordem = np.argsort(-custo_diario, kind="stable")
+    gulosos = np.zeros((len(saldos), len(valores)), dtype=bool)
+    restante = saldos.copy()
+    for i, valor in zip(ordem.tolist(), valores[ordem].tolist()):
+        cabe = restante >= valor
+        gulosos[:, i] = cabe
+        restante = np.where(cabe, restante - valor, restante)
+    if modo == MODO_GULOSO or len(saldos) == 0:
+        return gulosos
+
+    centavos = _para_centavos(valores)
+    capacidades = [_centavos_do_saldo(saldo) for saldo in saldos.tolist()]
+    # Saldos que comportam tudo pagam tudo; os demais usam a mesma tabela
+    parciais = [k for k, capacidade in enumerate(capacidades) if capacidade < centavos.sum()]
+    pagar = np.ones_like(gulosos)
+    if parciais:
+        tabela = _TabelaMochila(centavos, juros_diario, custo_diario, max(capacidades[k] for k in parciais),
+                                tempo_limite, limite_celulas)
+        for k in parciais:
+            pagar[k], _ = tabela.resolver(capacidades[k], gulosos[k])
+    return pagar
@@ -0,0 +1,102 @@
+"""
+Simulação de cenários (what-if) do plano de pagamento
+
+Avalia de uma vez uma grade de cenários saldo × taxa de capital de giro ×
+taxa de adiantamento, com as mesmas regras de analisar_pagamento_boletos,
+e devolve uma tabela (array estruturado NumPy, uma linha por cenário) em
+vez de relatórios formatados.
+
+- A seleção dos boletos pagos só depende do saldo: é feita uma vez por
+  saldo distinto (selecionar_pagamentos_lote, que no modo ótimo reaproveita
+  a mesma tabela da mochila para todos os saldos). Quando a tabela é exata
+  o resultado é o mesmo de selecionar_pagamentos; quando precisa de escala,
+  a escala é a do maior saldo e a escolha pode diferir da chamada
+  individual, sem nunca ficar abaixo do guloso.
+- O déficit a financiar (total dos boletos - saldo) não depende da seleção,
+  então o financiamento de todos os cenários é calculado em arrays:
+  adiantamento (limitado aos recebíveis) só entra quando é mais barato que
+  o giro, como em calcular_melhor_financiamento.
+"""
+import numpy as np
+
+from financial_tools_simple import (RECEBIVEIS_FUTUROS, TAXA_ADIANTAMENTO, TAXA_CAPITAL_GIRO,
+                                    carregar_boletos)
+from selecao_pagamento import MODO_SELECAO_PADRAO, selecionar_pagamentos_lote
+
+DTYPE_CENARIO = np.dtype([
+    ('saldo', 'f8'),
+    ('taxa_giro', 'f8'),
+    ('taxa_adiantamento', 'f8'),
+    ('boletos_pagos', 'i4'),
+    ('valor_pago', 'f8'),
+    ('saldo_restante', 'f8'),
+    ('juros_evitados', 'f8'),  # custo diário de atraso dos boletos pagos
+    ('custo_atraso_restante', 'f8'),  # custo diário de atraso dos boletos a financiar
+    ('deficit', 'f8'),
+    ('valor_giro', 'f8'),
+    ('valor_adiantamento', 'f8'),
+    ('custo_financiamento', 'f8'),
+])
+
+
+def simular_cenarios(saldos, taxas_giro=(TAXA_CAPITAL_GIRO,), taxas_adiantamento=(TAXA_ADIANTAMENTO,),
+                     boletos: list = None, boletos_file_path: str = None, recebiveis: list = None,
+                     modo_selecao: str = MODO_SELECAO_PADRAO) -> np.ndarray:
+    """
+    Avalia o plano de pagamento em todos os cenários da grade.
+
+    Args:
+        saldos: saldos de caixa a simular
+        taxas_giro: custos do capital de giro a simular
+        taxas_adiantamento: custos do adiantamento de recebíveis a simular
+        boletos: lista de boletos ({"codigo", "valor", "juros_diario"})
+        boletos_file_path: arquivo JSON com os boletos (se a lista não for passada)
+        recebiveis: recebíveis que limitam o adiantamento (padrão: RECEBIVEIS_FUTUROS)
+        modo_selecao: "otimo" ou "guloso" (como em analisar_pagamento_boletos)
+
+    Returns:
+        array estruturado (DTYPE_CENARIO) com len(saldos) × len(taxas_giro) ×
+        len(taxas_adiantamento) linhas, na ordem saldo, giro, adiantamento
+    """
+    if boletos is None:
+        boletos = carregar_boletos(boletos_file_path)
+    recebiveis = RECEBIVEIS_FUTUROS if recebiveis is None else recebiveis
+    limite_adiantamento = sum(r["valor"] for r in recebiveis)
+
+    valores = np.array([b['valor'] for b in boletos], dtype=float)
+    juros_diario = np.array([b['juros_diario'] for b in boletos], dtype=float)
+    custo_diario = valores * juros_diario
+
+    # Seleção: uma por saldo distinto
+    saldos_unicos, por_saldo = np.unique(np.asarray(saldos, dtype=float), return_inverse=True)
+    pagar = selecionar_pagamentos_lote(valores, juros_diario, saldos_unicos, modo=modo_selecao)
+    valor_pago = pagar @ valores
+    juros_evitados = pagar @ custo_diario
+
+    # Grade completa (saldo × giro × adiantamento)
+    indice_saldo, giro, adiantamento = (
+        eixo.ravel() for eixo in np.meshgrid(por_saldo, np.asarray(taxas_giro, dtype=float),
+                                             np.asarray(taxas_adiantamento, dtype=float), indexing='ij')
+    )
+    saldo = saldos_unicos[indice_saldo]
+
+    # Financiamento: déficit em centavos, produtos do mais barato ao mais caro
+    deficit = np.maximum(np.round((valores.sum() - saldo) * 100) / 100, 0.0)
+    adiantamento_primeiro = adiantamento < giro
+    valor_adiantamento = np.where(adiantamento_primeiro, np.minimum(deficit, limite_adiantamento), 0.0)
+    valor_giro = deficit - valor_adiantamento
+
+    tabela = np.zeros(len(saldo), dtype=DTYPE_CENARIO)
+    tabela['saldo'] = saldo
+    tabela['taxa_giro'] = giro
+    tabela['taxa_adiantamento'] = adiantamento
+    tabela['boletos_pagos'] = pagar.sum(axis=1)[indice_saldo]
+    tabela['valor_pago'] = valor_pago[indice_saldo]
+    tabela['saldo_restante'] = saldo - tabela['valor_pago']
+    tabela['juros_evitados'] = juros_evitados[indice_saldo]
+    tabela['custo_atraso_restante'] = custo_diario.sum() - tabela['juros_evitados']
+    tabela['deficit'] = deficit
+    tabela['valor_giro'] = valor_giro
+    tabela['valor_adiantamento'] = valor_adiantamento
+    tabela['custo_financiamento'] = valor_giro * giro + valor_adiantamento * adiantamento
+    return tabela
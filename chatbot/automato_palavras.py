@@ -0,0 +1,116 @@
+"""
+Autômato de palavras-chave (Aho-Corasick) para a classificação de intenções
+
+Compila várias tabelas {nome: [palavras-chave]} em um único autômato e, em
+uma passada pela mensagem, devolve a pontuação de cada tabela (quantas de
+suas palavras-chave aparecem, contando repetições na lista como no
+`sum(1 for kw in lista if kw in mensagem)` original).
+
+As ocorrências respeitam os limites de palavra: "oi" não casa dentro de
+"dois" nem "sim" dentro de "simulação". O limite só é exigido nas pontas da
+palavra-chave que são letras ou dígitos ("sim," casa em "sim, pode"), e o
+plural com "s" conta como a mesma palavra ("mostrar boleto" casa em
+"mostrar boletos").
+"""
+from collections import deque
+
+
+def _e_palavra(caractere: str) -> bool:
+    return caractere.isalnum() or caractere == '_'
+
+
+def _fim_de_palavra(texto: str, posicao: int, tamanho: int) -> bool:
+    """A palavra termina em `posicao` (aceita o plural: "boleto" casa em "boletos")"""
+    if posicao < tamanho and texto[posicao] == 's':
+        posicao += 1
+    return posicao >= tamanho or not _e_palavra(texto[posicao])
+
+
+class AutomatoPalavrasChave:
+    """Aho-Corasick sobre as palavras-chave de várias tabelas"""
+
+    def __init__(self, tabelas: dict):
+        # Cada palavra-chave distinta vira um padrão; o padrão guarda o peso em cada tabela
+        self.tabelas = tuple(tabelas)
+        indice_padrao = {}
+        self._padroes = []
+        self._pesos = []
+        for tabela, palavras in tabelas.items():
+            for palavra in palavras:
+                if palavra not in indice_padrao:
+                    indice_padrao[palavra] = len(self._padroes)
+                    self._padroes.append(palavra)
+                    self._pesos.append({})
+                pesos = self._pesos[indice_padrao[palavra]]
+                pesos[tabela] = pesos.get(tabela, 0) + 1
+
+        # Limites de palavra exigidos em cada ponta do padrão
+        self._limite_inicio = [_e_palavra(p[0]) for p in self._padroes]
+        self._limite_fim = [_e_palavra(p[-1]) for p in self._padroes]
+
+        self._construir()
+
+    def _construir(self):
+        """Trie + links de falha (BFS); as saídas já incluem as dos sufixos"""
+        transicoes = [{}]
+        saidas = [[]]
+        for id_padrao, padrao in enumerate(self._padroes):
+            estado = 0
+            for caractere in padrao:
+                proximo = transicoes[estado].get(caractere)
+                if proximo is None:
+                    proximo = len(transicoes)
+                    transicoes[estado][caractere] = proximo
+                    transicoes.append({})
+                    saidas.append([])
+                estado = proximo
+            saidas[estado].append(id_padrao)
+
+        falha = [0] * len(transicoes)
+        fila = deque(transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in transicoes[estado].items():
+                fila.append(proximo)
+                recuo = falha[estado]
+                while recuo and caractere not in transicoes[recuo]:
+                    recuo = falha[recuo]
+                falha[proximo] = transicoes[recuo].get(caractere, 0)
+                saidas[proximo] = saidas[proximo] + saidas[falha[proximo]]
+
+        self._transicoes = transicoes
+        self._falha = falha
+        self._saidas = [tuple(s) for s in saidas]
+
+    def _ids_encontrados(self, texto: str) -> set:
+        transicoes, falha, saidas = self._transicoes, self._falha, self._saidas
+        padroes, limite_inicio, limite_fim = self._padroes, self._limite_inicio, self._limite_fim
+        tamanho = len(texto)
+        encontrados = set()
+        estado = 0
+        for fim, caractere in enumerate(texto):
+            while estado and caractere not in transicoes[estado]:
+                estado = falha[estado]
+            estado = transicoes[estado].get(caractere, 0)
+            for id_padrao in saidas[estado]:
+                if id_padrao in encontrados:
+                    continue
+                inicio = fim - len(padroes[id_padrao]) + 1
+                if limite_inicio[id_padrao] and inicio > 0 and _e_palavra(texto[inicio - 1]):
+                    continue
+                if limite_fim[id_padrao] and not _fim_de_palavra(texto, fim + 1, tamanho):
+                    continue
+                encontrados.add(id_padrao)
+        return encontrados
+
+    def encontrar(self, texto: str) -> set:
+        """Palavras-chave presentes no texto, respeitando limites de palavra"""
+        return {self._padroes[i] for i in self._ids_encontrados(texto)}
+
+    def pontuar(self, texto: str) -> dict:
+        """{tabela: pontuação} das tabelas com alguma palavra-chave no texto"""
+        pontuacao = {}
+        for id_padrao in self._ids_encontrados(texto):
+            for tabela, peso in self._pesos[id_padrao].items():
+                pontuacao[tabela] = pontuacao.get(tabela, 0) + peso
+        return pontuacao
@@ -0,0 +1,157 @@
+"""
+Benchmarks do chatbot (classificação de intenções)
+
+Uso:
+    python benchmark_chatbot.py [repeticoes]
+"""
+import re
+import sys
+import timeit
+
+from extracao_entidades import extrair_entidades
+from modelo_intencoes import ModeloIntencoes
+from nlp_intent import IntentClassifier, info_cache_intencoes, limpar_cache_intencoes
+from normalizacao import normalizar
+
+MENSAGENS = [
+    "oi", "bom dia!", "quero ver os pagamentos de hoje", "o que vence hoje?", "consultar data",
+    "visualizar boletos dos próximos 15 dias", "boletos vencidos", "tenho contas atrasadas?",
+    "quero pagar todos", "sim", "gostaria de seguir sua sugestão", "aceito essa proposta",
+    "quero saber mais", "me forneça mais detalhe sobre esses boletos", "opções de financiamento",
+    "mais detalhes dessa negociação", "qual valor desses dias destaque", "voltar", "não entendi",
+    "sim, pode pagar", "listar boletos", "obrigado", "pode executar", "cancelar",
+]
+CONTEXTOS = [None, 'menu_principal', 'opcoes_visao_dia', 'confirmacao_pagamento', 'opcoes_visao_intervalo']
+
+
+def _classificar_por_substring(mensagem: str, contexto: str) -> tuple:
+    """Referência: (intenção, confiança) com `in` sobre cada lista, como antes do autômato"""
+    listas = IntentClassifier.TABELAS
+    mensagem = normalizar(mensagem)
+    if any(saudacao in mensagem for saudacao in listas['saudacao']):
+        return 'saudacao', 1.0
+    if contexto == 'opcoes_visao_dia':
+        for lista, intencao in (('pedidos_financiamento', 'ver_opcoes_financiamento'),
+                                ('pedidos_info', 'ver_detalhes'), ('confirmacoes', 'pagar')):
+            if any(palavra in mensagem for palavra in listas[lista]):
+                return intencao, 1.0
+    if contexto == 'confirmacao_pagamento':
+        for lista, intencao in (('confirmacoes_sim', 'pagar'), ('confirmacoes_nao', 'voltar')):
+            if any(palavra in mensagem for palavra in listas[lista]):
+                return intencao, 1.0
+    melhor_intencao, melhor_score = 'desconhecida', 0
+    for intencao in IntentClassifier.INTENCOES:
+        score = sum(1 for kw in listas[intencao] if kw in mensagem)
+        if score > melhor_score:
+            melhor_intencao, melhor_score = intencao, score
+    return melhor_intencao, min(melhor_score / 2, 1.0)
+
+
+MENSAGENS_ENTIDADES = [
+    "boletos dos próximos 15 dias", "quero ver 3 semanas próximas", "ver período de 2025-10-19 até 2025-10-30",
+    "detalhes do Boleto_12", "e o BOL001?", "quais boletos vencem hoje?", "próximos 2 meses",
+]
+
+
+def _extrair_por_padroes(mensagem: str) -> tuple:
+    """Referência: uma lista de padrões por entidade, testados um a um, como antes"""
+    periodo = None
+    for padrao in [r'próximos?\s+(\d+)\s+dias?', r'próximas?\s+(\d+)\s+semanas?', r'próximos?\s+(\d+)\s+meses?',
+                   r'(\d+)\s+dias?\s+próximos?', r'(\d+)\s+semanas?\s+próximas?', r'(\d+)\s+meses?\s+próximos?']:
+        match = re.search(padrao, mensagem.lower())
+        if match:
+            periodo = int(match.group(1))
+            break
+    datas = re.findall(r'\d{4}-\d{2}-\d{2}', mensagem)
+    codigo = None
+    for padrao in [r'BOLETO[_\s]*(\d+)', r'BOL[_\s]*(\d+)', r'\bBOL(\d{3,})\b']:
+        match = re.search(padrao, mensagem.upper())
+        if match:
+            codigo = match.group(1)
+            break
+    return periodo, datas, codigo, re.findall(r'\d+', mensagem)
+
+
+def benchmark_palavras_chave(repeticoes: int = 200):
+    """Compara as buscas por substring com uma passada do autômato"""
+    casos = [(m, c) for m in MENSAGENS for c in CONTEXTOS]
+    print(f"\n🔤 Palavras-chave ({len(casos)} mensagens × contexto, {repeticoes} repetições)")
+
+    def substring():
+        for mensagem, contexto in casos:
+            _classificar_por_substring(mensagem, contexto)
+
+    def automato():
+        for mensagem, _ in casos:
+            IntentClassifier.AUTOMATO.pontuar(normalizar(mensagem))
+
+    antes = min(timeit.repeat(substring, number=repeticoes, repeat=5)) / (repeticoes * len(casos)) * 1e6
+    depois = min(timeit.repeat(automato, number=repeticoes, repeat=5)) / (repeticoes * len(casos)) * 1e6
+    print(f"{'por mensagem':<28} antes: {antes:9.3f} µs   depois: {depois:9.3f} µs   "
+          f"speedup: {antes / depois:7.1f}x")
+
+
+def benchmark_modelo_local(repeticoes: int = 200):
+    """Treino e predição do modelo local (o que deixa de ir para a LLM)"""
+    exemplos = IntentClassifier.exemplos_treino()
+    print(f"\n🧠 Modelo local de intenções ({len(exemplos)} frases de treino)")
+    treino = min(timeit.repeat(lambda: ModeloIntencoes.treinar(exemplos), number=1, repeat=3)) * 1000
+    modelo = ModeloIntencoes.treinar(exemplos)
+
+    def prever():
+        for mensagem in MENSAGENS:
+            modelo.prever(mensagem)
+
+    predicao = min(timeit.repeat(prever, number=repeticoes, repeat=5)) / (repeticoes * len(MENSAGENS)) * 1e6
+    print(f"{'treino':<28} {treino:9.3f} ms")
+    print(f"{'predição por mensagem':<28} {predicao:9.3f} µs")
+
+
+def benchmark_extracao_entidades(repeticoes: int = 200):
+    """Padrões testados um a um vs. a expressão única com grupos nomeados (sem o lru_cache)"""
+    print(f"\n📅 Extração de entidades ({len(MENSAGENS_ENTIDADES)} mensagens)")
+    extrair = extrair_entidades.__wrapped__
+
+    def por_padroes():
+        for mensagem in MENSAGENS_ENTIDADES:
+            _extrair_por_padroes(mensagem)
+
+    def expressao_unica():
+        for mensagem in MENSAGENS_ENTIDADES:
+            extrair(mensagem)
+
+    antes = min(timeit.repeat(por_padroes, number=repeticoes, repeat=5)) / (repeticoes * len(MENSAGENS_ENTIDADES)) * 1e6
+    depois = min(timeit.repeat(expressao_unica, number=repeticoes, repeat=5)) / (repeticoes * len(MENSAGENS_ENTIDADES)) * 1e6
+    print(f"{'por mensagem':<28} antes: {antes:9.3f} µs   depois: {depois:9.3f} µs   "
+          f"speedup: {antes / depois:7.1f}x")
+
+
+def benchmark_cache_intencoes(repeticoes: int = 200):
+    """classificar_intencao com o cache vazio a cada mensagem vs. com o cache aquecido"""
+    casos = [(m, c) for m in MENSAGENS for c in CONTEXTOS]
+    print(f"\n🗃️ Cache de intenções ({len(casos)} mensagens × contexto)")
+    classificador = IntentClassifier()
+
+    def sem_cache():
+        for mensagem, contexto in casos:
+            limpar_cache_intencoes()
+            classificador.classificar_intencao(mensagem, contexto)
+
+    def com_cache():
+        for mensagem, contexto in casos:
+            classificador.classificar_intencao(mensagem, contexto)
+
+    antes = min(timeit.repeat(sem_cache, number=repeticoes, repeat=3)) / (repeticoes * len(casos)) * 1e6
+    limpar_cache_intencoes()
+    depois = min(timeit.repeat(com_cache, number=repeticoes, repeat=3)) / (repeticoes * len(casos)) * 1e6
+    print(f"{'por mensagem':<28} antes: {antes:9.3f} µs   depois: {depois:9.3f} µs   "
+          f"speedup: {antes / depois:7.1f}x")
+    print(f"{'':<28} {info_cache_intencoes()}")
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    benchmark_palavras_chave(repeticoes)
+    benchmark_modelo_local(repeticoes)
+    benchmark_extracao_entidades(repeticoes)
+    benchmark_cache_intencoes(repeticoes)
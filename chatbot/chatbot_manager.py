@@ -13,8 +13,14 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Sugestao-acao'))
 
 from dda_crew_adapter import DDACrewAdapter
 from nlp_intent import IntentClassifier
+from extracao_entidades import Periodo, extrair_entidades
+from normalizacao import normalizar
 from conversational_agent import ConversationalAgent
+from fluxo_caixa import agendar_pagamentos
+from financial_tools_simple import RECEBIVEIS_FUTUROS, TAXA_ADIANTAMENTO, TAXA_CAPITAL_GIRO
 
+# Palavras (normalizadas, sem acento) que levam às opções de financiamento
+PALAVRAS_FINANCIAMENTO = ('opcoes', 'financiamento', 'financiar', 'capital', 'adiantamento')
 
 class EstadoChat(Enum):
     """Estados possíveis da conversa"""
@@ -175,7 +181,7 @@ class ChatbotManager:
             return self._mostrar_ajuda()
         
         # Fallback específico para opções de financiamento
-        elif any(palavra in mensagem.lower() for palavra in ['opções', 'financiamento', 'opcoes', 'financiar', 'capital', 'adiantamento']):
+        elif any(palavra in normalizar(mensagem) for palavra in PALAVRAS_FINANCIAMENTO):
             # Verifica se há boletos no contexto para mostrar opções de financiamento
             boletos_dict = self.contexto.get('boletos_dict', {})
             boletos_vencidos = self.contexto.get('boletos_vencidos', [])
@@ -228,7 +234,7 @@ Ou use o menu abaixo:
             self.estado = EstadoChat.AGUARDANDO_DATA
             return "📅 Por favor, digite a data no formato AAAA-MM-DD (ex: 2025-10-20):"
         
-        elif "3" in mensagem or "período" in mensagem or "intervalo" in mensagem:
+        elif "3" in mensagem or "periodo" in normalizar(mensagem) or "intervalo" in mensagem:
             self.estado = EstadoChat.AGUARDANDO_INTERVALO
             return "📅 Digite o intervalo de datas no formato: AAAA-MM-DD até AAAA-MM-DD\n(ex: 2025-10-19 até 2025-10-30)"
         
@@ -244,7 +250,9 @@ Ou use o menu abaixo:
             if dia is None:
                 dia = datetime.now().strftime('%Y-%m-%d')
             
-            overview, boletos_dict = self.adapter.obter_visao_dia(dia)
+            # Visão do dia + vencidos em uma única consulta ao DDA (reaproveitada pelo plano)
+            visao = self.adapter.obter_visao_dia_completa(dia)
+            overview, boletos_dict, boletos_vencidos = visao
             
             # Filtra boletos já pagos (verifica tanto o código quanto possíveis variações)
             boletos_dict_filtrados = {}
@@ -254,8 +262,7 @@ Ou use o menu abaixo:
                     boletos_dict_filtrados[codigo] = dados
             boletos_dict = boletos_dict_filtrados
             
-            # Obtém boletos vencidos (sempre usa data ATUAL, não a data consultada)
-            boletos_vencidos = self.adapter.obter_boletos_atrasados()
+            # Boletos vencidos sempre usam a data ATUAL, não a data consultada
             boletos_vencidos = [b for b in boletos_vencidos if b['id'] not in self.boletos_pagos]
             
             # RECALCULA o overview após filtrar boletos pagos
@@ -274,18 +281,10 @@ Ou use o menu abaixo:
             
             # EXECUTA A ANÁLISE FINANCEIRA (passa lista de boletos pagos)
             analise_ia = ""
+            plano = None
             try:
-                overview_ia, boletos_crewai, temp_path = self.adapter.preparar_para_sugestao_acao(dia, boletos_pagos=self.boletos_pagos)
-                from crew_integration import executar_analise_financeira
-                
-                analise_ia = executar_analise_financeira(
-                    saldo_atual=self.saldo_atual,
-                    boletos_file_path=temp_path
-                )
-                
-                import os
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+                plano = self._obter_plano(dia, visao)
+                analise_ia = plano.para_texto()
             except Exception as e:
                 analise_ia = f"Análise financeira indisponível no momento."
             
@@ -306,59 +305,24 @@ Ou use o menu abaixo:
             total_boletos = overview.get('total_boletos_no_dia', 0) + overview.get('total_boletos_vencidos', 0)
             total_valor = overview.get('valor_total_no_dia', 0) + overview.get('valor_total_vencidos', 0)
             
+            sugestao = ""
             if total_boletos > 0:
                 if self.saldo_atual >= total_valor:
                     # Saldo suficiente - sugere pagamento direto
                     sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nComo seu saldo é suficiente, recomendo pagar todos os boletos agora para evitar juros. Deseja executar o pagamento?"
-                else:
-                    # Saldo insuficiente - calcula e apresenta a melhor opção diretamente
-                    deficit = total_valor - self.saldo_atual
-                    
-                    # Importa função de cálculo
-                    import sys
-                    sys.path.append('/home/blomes/projects/Pagamento - BTG/Sugestao-acao')
-                    from financial_tools_simple import calcular_melhor_financiamento
-                    
-                    # Calcula opções
-                    custo_giro = deficit * 0.08  # 8%
-                    custo_adiantamento = deficit * 0.15  # 15%
-                    
-                    # Calcula estratégia de pagamento parcial
-                    boletos_dict = self.contexto.get('boletos_dict', {})
-                    boletos_vencidos = self.contexto.get('boletos_vencidos', [])
-                    
-                    # Combina todos os boletos com juros
-                    todos_boletos = []
-                    for codigo, dados in boletos_dict.items():
-                        todos_boletos.append({
-                            'id': codigo,
-                            'valor': dados['valor'],
-                            'juros_diario': 0.01,  # 1% ao dia para boletos do dia
-                            'beneficiario': dados.get('beneficiario', 'Não informado'),
-                            'tipo': 'do_dia'
-                        })
-                    
-                    for bol in boletos_vencidos:
-                        todos_boletos.append({
-                            'id': bol['id'],
-                            'valor': bol['valor'],
-                            'juros_diario': 0.01,  # 1% ao dia para boletos vencidos
-                            'beneficiario': bol.get('beneficiario', 'Não informado'),
-                            'tipo': 'vencido'
-                        })
+                elif plano is not None:
+                    # Saldo insuficiente - apresenta a melhor opção do plano diretamente
+                    deficit = plano.divida_a_cobrir
                     
-                    # Calcula estratégia de pagamento parcial
-                    estrategia_parcial = self._calcular_pagamento_parcial(todos_boletos, self.saldo_atual)
+                    # Opções de financiamento e pagamento parcial, todas do mesmo plano
+                    custo_giro, custo_adiantamento = self._custos_financiamento(plano)
+                    financiamento = plano.otimizacao_financiamento()
+                    estrategia_parcial = plano.pagamento_parcial()
                     
                     # Determina melhor opção - SEMPRE considera pagamento parcial se custo for menor
                     custo_pagamento_parcial = estrategia_parcial['custo_juros']
                     
-                    if custo_pagamento_parcial < custo_giro and custo_pagamento_parcial < custo_adiantamento:
-                        melhor_opcao = ('PAGAMENTO PARCIAL', custo_pagamento_parcial)
-                    elif custo_giro < custo_adiantamento:
-                        melhor_opcao = ('CAPITAL DE GIRO', custo_giro)
-                    else:
-                        melhor_opcao = ('ADIANTAMENTO DE RECEBÍVEIS', custo_adiantamento)
+                    melhor_opcao = self._escolher_opcao(custo_pagamento_parcial, custo_giro, custo_adiantamento, financiamento)
                     
                     # Armazena estratégia parcial se for a melhor opção
                     if melhor_opcao[0] == 'PAGAMENTO PARCIAL':
@@ -368,15 +332,22 @@ Ou use o menu abaixo:
                     
                     # Gera sugestão específica baseada na melhor opção
                     if melhor_opcao[0] == 'CAPITAL DE GIRO':
-                        sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nRecomendo usar Capital de Giro a 8% para cobrir o déficit de R$ {deficit:,.2f}. Custo total: R$ {custo_giro:,.2f}. Deseja executar esta estratégia?"
+                        sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nRecomendo usar Capital de Giro a {TAXA_CAPITAL_GIRO:.0%} para cobrir o déficit de R$ {deficit:,.2f}. Custo total: R$ {custo_giro:,.2f}. Deseja executar esta estratégia?"
                     elif melhor_opcao[0] == 'ADIANTAMENTO DE RECEBÍVEIS':
-                        sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nRecomendo Adiantamento de Recebíveis a 15% para cobrir o déficit de R$ {deficit:,.2f}. Custo total: R$ {custo_adiantamento:,.2f}. Deseja executar esta estratégia?"
+                        sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nRecomendo Adiantamento de Recebíveis a {TAXA_ADIANTAMENTO:.0%} para cobrir o déficit de R$ {deficit:,.2f}. Custo total: R$ {custo_adiantamento:,.2f}. Deseja executar esta estratégia?"
+                    elif melhor_opcao[0] == 'FINANCIAMENTO COMBINADO':
+                        sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nRecomendo combinar {financiamento['metodo']} para cobrir o déficit de R$ {deficit:,.2f}. Custo total: R$ {financiamento['custo_total']:,.2f}. Deseja executar esta estratégia?"
                     else:  # PAGAMENTO PARCIAL
                         # SEMPRE armazena estratégia parcial quando recomendada
                         self._estrategia_parcial_atual = estrategia_parcial
                         sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nRecomendo Pagamento Parcial Inteligente: pagar R$ {estrategia_parcial['valor_pagar_agora']:,.2f} agora e deixar R$ {estrategia_parcial['valor_deixar_depois']:,.2f} para amanhã. Custo de juros: apenas R$ {estrategia_parcial['custo_juros']:,.2f}. Deseja executar esta estratégia?"
                     
                     sugestao += f"\n\nSe quiser ver todas as opções detalhadas, digite 'ver opções de financiamento'."
+                else:
+                    # Plano indisponível: nenhuma estratégia parcial anterior pode ser executada
+                    self._estrategia_parcial_atual = None
+                    deficit = total_valor - self.saldo_atual
+                    sugestao = f"\n\nSUGESTÃO DO QUITADOR:\nNão foi possível calcular o plano de pagamento agora. Como referência, cobrir o déficit de R$ {deficit:,.2f} com Capital de Giro a {TAXA_CAPITAL_GIRO:.0%} custaria R$ {deficit * TAXA_CAPITAL_GIRO:,.2f}. Tente novamente em instantes para ver a melhor estratégia."
                 
                 resposta += sugestao
             
@@ -438,7 +409,7 @@ Ou use o menu abaixo:
                 return self._voltar_menu_principal()
             
             # Fallback específico para opções de financiamento
-            elif any(palavra in mensagem.lower() for palavra in ['opções', 'financiamento', 'opcoes', 'financiar', 'capital', 'adiantamento']):
+            elif any(palavra in normalizar(mensagem) for palavra in PALAVRAS_FINANCIAMENTO):
                 return self._mostrar_opcoes_financiamento()
             
             else:
@@ -533,29 +504,15 @@ Beneficiários:
             if hasattr(self, '_estrategia_parcial_atual') and self._estrategia_parcial_atual:
                 return self._executar_pagamento_parcial()
             
-            deficit = valor_total - self.saldo_atual
-            
-            # Calcula custo do financiamento usando a análise da IA
+            # Calcula custo do financiamento a partir do plano de pagamento
             try:
                 dia = self.contexto.get('data_atual', datetime.now().strftime('%Y-%m-%d'))
-                overview_ia, boletos_crewai, temp_path = self.adapter.preparar_para_sugestao_acao(dia, boletos_pagos=self.boletos_pagos)
-                from crew_integration import executar_analise_financeira
+                plano = self._obter_plano(dia)
+                deficit = plano.divida_a_cobrir
                 
-                analise_ia = executar_analise_financeira(
-                    saldo_atual=self.saldo_atual,
-                    boletos_file_path=temp_path
-                )
-                
-                import os
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                
-                # Extrai custo do financiamento da análise (simulação)
-                # Em uma implementação real, isso viria da análise da IA
-                import sys
-                sys.path.append('/home/blomes/projects/Pagamento - BTG/Sugestao-acao')
-                from financial_tools_simple import calcular_melhor_financiamento
-                custo_financiamento, metodo, total_com_juros = calcular_melhor_financiamento(deficit)
+                # Melhor combinação de produtos (a mesma do relatório e das outras telas)
+                financiamento = plano.otimizacao_financiamento()
+                custo_financiamento, metodo = financiamento['custo_total'], financiamento['metodo']
                 
                 # Executa o financiamento
                 self.saldo_atual += deficit  # Adiciona o valor financiado
@@ -597,53 +554,28 @@ Todos os boletos foram quitados com sucesso! Posso ajudar com mais alguma coisa?
         try:
             overview = self.contexto.get('overview', {})
             valor_total = overview.get('valor_total_no_dia', 0) + overview.get('valor_total_vencidos', 0)
-            deficit = valor_total - self.saldo_atual
+            plano = self._obter_plano(self.contexto.get('data_atual'))
+            deficit = plano.divida_a_cobrir
             
             if deficit <= 0:
                 return "✅ Seu saldo é suficiente para pagar todos os boletos sem necessidade de financiamento!"
             
-            # Importa função de cálculo
-            import sys
-            sys.path.append('/home/blomes/projects/Pagamento - BTG/Sugestao-acao')
-            from financial_tools_simple import calcular_melhor_financiamento, RECEBIVEIS_FUTUROS
-            
-            # Calcula opções
-            custo_giro = deficit * 0.08  # 8%
-            custo_adiantamento = deficit * 0.15  # 15%
+            # Calcula opções (todas a partir do mesmo plano de pagamento)
+            custo_giro, custo_adiantamento = self._custos_financiamento(plano)
+            financiamento = plano.otimizacao_financiamento()
             
             # Calcula recebíveis disponíveis
             total_recebiveis = sum(r["valor"] for r in RECEBIVEIS_FUTUROS)
             
             # NOVA OPÇÃO 3: Pagamento parcial inteligente
-            boletos_dict = self.contexto.get('boletos_dict', {})
-            boletos_vencidos = self.contexto.get('boletos_vencidos', [])
-            
-            # Combina todos os boletos com juros
-            todos_boletos = []
-            for codigo, dados in boletos_dict.items():
-                todos_boletos.append({
-                    'id': codigo,
-                    'valor': dados['valor'],
-                    'juros_diario': 0.01,  # 1% ao dia para boletos do dia
-                    'beneficiario': dados.get('beneficiario', 'Não informado'),
-                    'tipo': 'do_dia'
-                })
-            
-            for bol in boletos_vencidos:
-                todos_boletos.append({
-                    'id': bol['id'],
-                    'valor': bol['valor'],
-                    'juros_diario': 0.01,  # 1% ao dia para boletos vencidos
-                    'beneficiario': bol.get('beneficiario', 'Não informado'),
-                    'tipo': 'vencido'
-                })
-            
-            # Calcula estratégia de pagamento parcial
-            estrategia_parcial = self._calcular_pagamento_parcial(todos_boletos, self.saldo_atual)
+            estrategia_parcial = plano.pagamento_parcial()
             
             # Armazena estratégia parcial para uso posterior
             self._estrategia_parcial_atual = estrategia_parcial
             
+            # Cronograma dia a dia com a data real de cada recebível
+            cronograma = self._calcular_cronograma_caixa(plano.boletos_ordenados, self.saldo_atual)
+            
             resposta = f"""ANÁLISE COMPARATIVA DE FINANCIAMENTO
 
 Situação Atual:
@@ -652,14 +584,14 @@ Situação Atual:
 • Déficit a cobrir: R$ {deficit:,.2f}
 
 OPÇÃO 1: CAPITAL DE GIRO
-• Taxa: 8% ao mês
+• Taxa: {TAXA_CAPITAL_GIRO:.0%} ao mês
 • Custo do financiamento: R$ {custo_giro:,.2f}
 • Total a pagar: R$ {deficit + custo_giro:,.2f}
 • Processo: Aprovação rápida (até 2h)
 • Garantias: Sem necessidade de garantias específicas
 
 OPÇÃO 2: ADIANTAMENTO DE RECEBÍVEIS
-• Taxa: 15% ao mês
+• Taxa: {TAXA_ADIANTAMENTO:.0%} ao mês
 • Custo do financiamento: R$ {custo_adiantamento:,.2f}
 • Total a pagar: R$ {deficit + custo_adiantamento:,.2f}
 • Recebíveis disponíveis: R$ {total_recebiveis:,.2f}
@@ -674,12 +606,26 @@ OPÇÃO 3: PAGAMENTO PARCIAL INTELIGENTE
 • Processo: Imediato (sem aprovação)
 • Garantias: Recebíveis futuros cobrem déficit
 
-RECEBÍVEIS FUTUROS DISPONÍVEIS:
+OPÇÃO 4: CRONOGRAMA DE CAIXA (DIA A DIA)
+• Juros pelos dias de espera: R$ {cronograma['custo_juros']:,.2f}
+• Financiamento: R$ {cronograma['valor_capital_giro'] + cronograma['valor_adiantamento']:,.2f} (custo R$ {cronograma['custo_financiamento']:,.2f})
+• Custo total: R$ {cronograma['custo_total']:,.2f}
+• Processo: Cada boleto é pago no dia em que o caixa (saldo + recebíveis) comporta
+
+MELHOR COMBINAÇÃO DE PRODUTOS:
 """
             
+            for tranche in financiamento['tranches']:
+                resposta += f"• {tranche['produto']}: R$ {tranche['valor']:,.2f} (custo R$ {tranche['custo']:,.2f})\n"
+            resposta += f"• Custo total: R$ {financiamento['custo_total']:,.2f}\n"
+            
+            resposta += "\nRECEBÍVEIS FUTUROS DISPONÍVEIS:\n"
             for rec in RECEBIVEIS_FUTUROS:
                 resposta += f"• {rec['data']}: R$ {rec['valor']:,.2f} ({rec['origem']})\n"
             
+            resposta += "\nCRONOGRAMA DE PAGAMENTOS:\n"
+            resposta += self._formatar_cronograma(cronograma)
+            
             # Adiciona detalhes dos boletos por estratégia
             resposta += f"""
 
@@ -700,6 +646,8 @@ PAGAMENTO PARCIAL - Boletos que seriam pagos agora:
                 ('ADIANTAMENTO DE RECEBÍVEIS', custo_adiantamento),
                 ('PAGAMENTO PARCIAL', estrategia_parcial['custo_juros'])
             ]
+            if len(financiamento['tranches']) > 1:
+                opcoes.append(('FINANCIAMENTO COMBINADO', financiamento['custo_total']))
             
             melhor_opcao = min(opcoes, key=lambda x: x[1])
             
@@ -859,60 +807,21 @@ Posso ajudar com mais alguma coisa sobre este período?"""
     def _calcular_intervalo_automatico(self, mensagem: str) -> str:
         """Calcula intervalo automaticamente baseado na mensagem do usuário"""
         try:
-            import re
-            from datetime import datetime, timedelta
-            
-            # Extrai número de dias da mensagem
-            mensagem_lower = mensagem.lower()
-            
-            # Padrões para detectar "próximos X dias/semanas/meses"
-            padroes = [
-                r'próximos?\s+(\d+)\s+dias?',
-                r'próximas?\s+(\d+)\s+semanas?',
-                r'próximos?\s+(\d+)\s+meses?',
-                r'(\d+)\s+dias?\s+próximos?',
-                r'(\d+)\s+semanas?\s+próximas?',
-                r'(\d+)\s+meses?\s+próximos?'
-            ]
-            
-            numero = None
-            tipo_periodo = 'dias'
-            
-            for padrao in padroes:
-                match = re.search(padrao, mensagem_lower)
-                if match:
-                    numero = int(match.group(1))
-                    if 'semanas' in padrao:
-                        tipo_periodo = 'semanas'
-                    elif 'meses' in padrao:
-                        tipo_periodo = 'meses'
-                    break
+            # "próximos X dias/semanas/meses" ou "X dias próximos"
+            entidades = extrair_entidades(mensagem)
+            periodo = entidades.periodo
             
-            if numero is None:
+            if periodo is None:
                 # Fallback: procura qualquer número na mensagem
-                numeros = re.findall(r'\d+', mensagem)
-                if numeros:
-                    numero = int(numeros[0])
-                else:
+                if not entidades.numeros:
                     return "❌ Não consegui identificar quantos dias você quer consultar. Tente: 'próximos 20 dias'"
+                periodo = Periodo(entidades.numeros[0], 'dias')
             
-            # Calcula datas
             hoje = datetime.now().date()
-            
-            if tipo_periodo == 'dias':
-                data_fim = hoje + timedelta(days=numero)
-            elif tipo_periodo == 'semanas':
-                data_fim = hoje + timedelta(weeks=numero)
-            elif tipo_periodo == 'meses':
-                # Aproximação: 1 mês = 30 dias
-                data_fim = hoje + timedelta(days=numero * 30)
-            
-            # Formata as datas
-            data_inicio_str = hoje.strftime('%Y-%m-%d')
-            data_fim_str = data_fim.strftime('%Y-%m-%d')
+            data_fim = periodo.data_fim(hoje)
             
             # Processa o intervalo calculado
-            return self._processar_intervalo(f"{data_inicio_str} até {data_fim_str}")
+            return self._processar_intervalo(f"{hoje.strftime('%Y-%m-%d')} até {data_fim.strftime('%Y-%m-%d')}")
             
         except Exception as e:
             return f"❌ Erro ao calcular intervalo automático: {str(e)}"
@@ -935,56 +844,72 @@ Posso ajudar com mais alguma coisa sobre este período?"""
         else:
             return "Posso ajudar com valores dos dias em destaque ou outras informações sobre o período. Como posso te auxiliar?"
     
-    def _calcular_pagamento_parcial(self, todos_boletos: list, saldo_disponivel: float) -> dict:
-        """Calcula estratégia de pagamento parcial inteligente"""
-        try:
-            # Ordena boletos por custo-benefício (maior valor com menor juros primeiro)
-            boletos_ordenados = sorted(todos_boletos, key=lambda x: x['valor'] * x['juros_diario'], reverse=True)
-            
-            # Simula pagamento com saldo disponível
-            boletos_pagar_agora = []
-            boletos_deixar_depois = []
-            saldo_restante = saldo_disponivel
-            
-            for boleto in boletos_ordenados:
-                if saldo_restante >= boleto['valor']:
-                    boletos_pagar_agora.append(boleto)
-                    saldo_restante -= boleto['valor']
-                else:
-                    boletos_deixar_depois.append(boleto)
-            
-            # Calcula custos
-            valor_pagar_agora = sum(b['valor'] for b in boletos_pagar_agora)
-            valor_deixar_depois = sum(b['valor'] for b in boletos_deixar_depois)
-            
-            # Custo de juros por 1 dia (simulando que recebíveis caem amanhã)
-            custo_juros = sum(b['valor'] * b['juros_diario'] for b in boletos_deixar_depois)
-            
-            # Calcula economia comparada ao financiamento total
-            deficit_total = valor_pagar_agora + valor_deixar_depois - saldo_disponivel
-            custo_financiamento_total = deficit_total * 0.08  # Capital de giro
-            economia = custo_financiamento_total - custo_juros
-            
-            return {
-                'boletos_pagar_agora': boletos_pagar_agora,
-                'boletos_deixar_depois': boletos_deixar_depois,
-                'valor_pagar_agora': valor_pagar_agora,
-                'valor_deixar_depois': valor_deixar_depois,
-                'custo_juros': custo_juros,
-                'economia': economia,
-                'saldo_restante': saldo_restante
-            }
-            
-        except Exception as e:
-            return {
-                'boletos_pagar_agora': [],
-                'boletos_deixar_depois': todos_boletos,
-                'valor_pagar_agora': 0,
-                'valor_deixar_depois': sum(b['valor'] for b in todos_boletos),
-                'custo_juros': 0,
-                'economia': 0,
-                'saldo_restante': saldo_disponivel
-            }
+    def _obter_plano(self, dia: str = None, visao: tuple = None):
+        """
+        Plano de pagamento do dia (PlanoPagamento), calculado uma vez e guardado
+        na sessão enquanto dia, data de hoje (juros dos vencidos), versão do
+        DDA, saldo e boletos pagos não mudam
+        
+        visao: resultado de obter_visao_dia_completa(dia), quando já consultado
+        """
+        if dia is None:
+            dia = datetime.now().strftime('%Y-%m-%d')
+        chave = (dia, datetime.now().strftime('%Y-%m-%d'), self.adapter.versao_dda(),
+                 self.saldo_atual, frozenset(self.boletos_pagos))
+        anterior = self.contexto.get('plano')
+        if anterior is not None and anterior[0] == chave:
+            return anterior[1]
+        
+        from crew_integration import calcular_plano_financeiro
+        overview, boletos_crewai, temp_path = self.adapter.preparar_para_sugestao_acao(
+            dia, boletos_pagos=self.boletos_pagos, visao=visao)
+        plano = calcular_plano_financeiro(self.saldo_atual, boletos=boletos_crewai)
+        self.contexto['plano'] = (chave, plano)
+        return plano
+    
+    def _custos_financiamento(self, plano) -> tuple:
+        """Custo de cobrir o déficit do plano só com capital de giro e só com adiantamento"""
+        custos = plano.custos_por_produto()
+        return custos['capital_giro'], custos['adiantamento']
+    
+    def _escolher_opcao(self, custo_parcial: float, custo_giro: float, custo_adiantamento: float, financiamento: dict) -> tuple:
+        """Opção mais barata entre pagamento parcial, giro, adiantamento e a combinação de produtos"""
+        if custo_parcial < custo_giro and custo_parcial < custo_adiantamento and custo_parcial < financiamento['custo_total']:
+            return ('PAGAMENTO PARCIAL', custo_parcial)
+        if len(financiamento['tranches']) > 1 and financiamento['custo_total'] < min(custo_giro, custo_adiantamento):
+            return ('FINANCIAMENTO COMBINADO', financiamento['custo_total'])
+        if custo_giro < custo_adiantamento:
+            return ('CAPITAL DE GIRO', custo_giro)
+        return ('ADIANTAMENTO DE RECEBÍVEIS', custo_adiantamento)
+    
+    def _calcular_cronograma_caixa(self, todos_boletos: list, saldo_disponivel: float) -> dict:
+        """Cronograma de pagamentos dia a dia a partir da data consultada"""
+        data_referencia = self.contexto.get('data_atual') or datetime.now().strftime('%Y-%m-%d')
+        cronograma = agendar_pagamentos(todos_boletos, saldo_disponivel, data_referencia=data_referencia)
+        self.contexto['cronograma'] = cronograma
+        return cronograma
+    
+    def _formatar_cronograma(self, cronograma: dict, max_dias: int = 5) -> str:
+        """Lista os pagamentos do cronograma agrupados por data"""
+        origens = {'saldo': 'caixa', 'capital_giro': 'capital de giro', 'adiantamento': 'adiantamento'}
+        por_data = {}
+        sem_cobertura = []
+        for pagamento in cronograma['pagamentos']:
+            if pagamento['data'] is None:
+                sem_cobertura.append(pagamento)
+            else:
+                por_data.setdefault(pagamento['data'], []).append(pagamento)
+        
+        texto = ""
+        for data in sorted(por_data)[:max_dias]:
+            pagamentos = por_data[data]
+            detalhes = ", ".join(f"{p['codigo']} ({origens[p['origem']]})" for p in pagamentos)
+            texto += f"• {data}: R$ {sum(p['valor'] for p in pagamentos):,.2f} - {detalhes}\n"
+        if len(por_data) > max_dias:
+            texto += f"• ... e mais {len(por_data) - max_dias} datas\n"
+        if sem_cobertura:
+            texto += f"• Sem cobertura no horizonte: R$ {sum(p['valor'] for p in sem_cobertura):,.2f}\n"
+        return texto
     
     def _executar_pagamento_parcial(self) -> str:
         """Executa pagamento parcial baseado na estratégia calculada"""
@@ -1043,44 +968,19 @@ Posso ajudar com mais alguma coisa?"""
     def _gerar_estrategias_financiamento(self, valor_total: float, boletos_dict: dict, boletos_vencidos: list) -> str:
         """Gera estratégias de financiamento quando saldo é insuficiente"""
         try:
-            deficit = valor_total - self.saldo_atual
+            dia = self.contexto.get('data_atual', datetime.now().strftime('%Y-%m-%d'))
+            plano = self._obter_plano(dia)
+            deficit = plano.divida_a_cobrir
             
-            # Calcula estratégias de financiamento usando a mesma lógica da visão do dia
-            custo_giro = deficit * 0.08  # 8%
-            custo_adiantamento = deficit * 0.15  # 15%
-            
-            # Calcula estratégia de pagamento parcial
-            todos_boletos = []
-            for codigo, dados in boletos_dict.items():
-                todos_boletos.append({
-                    'id': codigo,
-                    'valor': dados['valor'],
-                    'juros_diario': 0.01,  # 1% ao dia para boletos do dia
-                    'beneficiario': dados.get('beneficiario', 'Não informado'),
-                    'tipo': 'do_dia'
-                })
-            
-            for bol in boletos_vencidos:
-                todos_boletos.append({
-                    'id': bol['id'],
-                    'valor': bol['valor'],
-                    'juros_diario': 0.01,  # 1% ao dia para boletos vencidos
-                    'beneficiario': bol.get('beneficiario', 'Não informado'),
-                    'tipo': 'vencido'
-                })
-            
-            # Calcula estratégia de pagamento parcial
-            estrategia_parcial = self._calcular_pagamento_parcial(todos_boletos, self.saldo_atual)
+            # Calcula estratégias de financiamento a partir do mesmo plano da visão do dia
+            custo_giro, custo_adiantamento = self._custos_financiamento(plano)
+            financiamento = plano.otimizacao_financiamento()
+            estrategia_parcial = plano.pagamento_parcial()
             
             # Determina melhor opção - SEMPRE considera pagamento parcial se custo for menor
             custo_pagamento_parcial = estrategia_parcial['custo_juros']
             
-            if custo_pagamento_parcial < custo_giro and custo_pagamento_parcial < custo_adiantamento:
-                melhor_opcao = ('PAGAMENTO PARCIAL', custo_pagamento_parcial)
-            elif custo_giro < custo_adiantamento:
-                melhor_opcao = ('CAPITAL DE GIRO', custo_giro)
-            else:
-                melhor_opcao = ('ADIANTAMENTO DE RECEBÍVEIS', custo_adiantamento)
+            melhor_opcao = self._escolher_opcao(custo_pagamento_parcial, custo_giro, custo_adiantamento, financiamento)
             
             # Armazena estratégia parcial se for a melhor opção
             if melhor_opcao[0] == 'PAGAMENTO PARCIAL':
@@ -1089,22 +989,7 @@ Posso ajudar com mais alguma coisa?"""
                 self._estrategia_parcial_atual = None
             
             # Executa análise financeira para obter estratégias
-            analise_ia = ""
-            try:
-                dia = self.contexto.get('data_atual', datetime.now().strftime('%Y-%m-%d'))
-                overview_ia, boletos_crewai, temp_path = self.adapter.preparar_para_sugestao_acao(dia, boletos_pagos=self.boletos_pagos)
-                from crew_integration import executar_analise_financeira
-                
-                analise_ia = executar_analise_financeira(
-                    saldo_atual=self.saldo_atual,
-                    boletos_file_path=temp_path
-                )
-                
-                import os
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-            except Exception as e:
-                analise_ia = f"Análise financeira indisponível: {str(e)}"
+            analise_ia = plano.para_texto()
             
             # Lista os beneficiários para contexto
             lista_beneficiarios = []
@@ -1152,28 +1037,16 @@ Seja NATURAL, DIRETO e CONVINCENTE. NÃO use muitos emojis."""
     
     def _extrair_codigo_boleto(self, mensagem: str) -> str:
         """Extrai código de boleto da mensagem (ex: Boleto_1, BOL001)"""
-        import re
-        msg_upper = mensagem.upper()
-        
-        # Padrões: Boleto_X, BOLX, BOL_X, BOLXXX
-        padroes = [
-            r'BOLETO[_\s]*(\d+)',  # Boleto_1, Boleto 1
-            r'BOL[_\s]*(\d+)',      # BOL_001, BOL 001
-            r'\bBOL(\d{3,})\b'      # BOL001
-        ]
-        
-        for padrao in padroes:
-            match = re.search(padrao, msg_upper)
-            if match:
-                # Verifica nos boletos do dia
-                for codigo in self.contexto.get('boletos_dict', {}).keys():
-                    if match.group(0) in codigo.upper() or match.group(1) in codigo:
-                        return codigo
-                
-                # Verifica nos boletos vencidos
-                for bol in self.contexto.get('boletos_vencidos', []):
-                    if match.group(0) in bol['id'].upper() or match.group(1) in bol['id']:
-                        return bol['id']
+        for trecho, numero in extrair_entidades(mensagem).codigos_boleto:
+            # Verifica nos boletos do dia
+            for codigo in self.contexto.get('boletos_dict', {}).keys():
+                if trecho in codigo.upper() or numero in codigo:
+                    return codigo
+            
+            # Verifica nos boletos vencidos
+            for bol in self.contexto.get('boletos_vencidos', []):
+                if trecho in bol['id'].upper() or numero in bol['id']:
+                    return bol['id']
         
         return None
     
@@ -1308,25 +1181,11 @@ Seja NATURAL e DIRETO."""
         try:
             resposta = "🤖 CONSULTANDO INTELIGÊNCIA ARTIFICIAL...\n\n"
             
-            # Prepara dados para o CrewAI
-            overview, boletos_crewai, temp_path = self.adapter.preparar_para_sugestao_acao(
-                self.contexto.get('data_atual')
-            )
-            
-            # Importa e executa o CrewAI
-            from crew_integration import executar_analise_financeira
-            
-            resultado_ia = executar_analise_financeira(
-                saldo_atual=self.saldo_atual,
-                boletos_file_path=temp_path
-            )
+            # Reaproveita o plano já calculado para o dia (se houver)
+            resultado_ia = self._obter_plano(self.contexto.get('data_atual')).para_texto()
             
             resposta += f"📊 ANÁLISE DA IA:\n\n{resultado_ia}\n\n"
             
-            # Remove arquivo temporário
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            
             self.estado = EstadoChat.MENU_PRINCIPAL
             resposta += self._menu_principal_texto()
             return resposta
@@ -1338,8 +1197,7 @@ Seja NATURAL e DIRETO."""
         """Processa consulta de intervalo de datas com resposta conversacional"""
         try:
             # Tenta extrair datas (formato: "2025-10-19 até 2025-10-30")
-            partes = mensagem.replace("até", " ").replace("ate", " ").split()
-            datas = [p for p in partes if len(p) == 10 and p.count('-') == 2]
+            datas = extrair_entidades(mensagem).datas
             
             if len(datas) < 2:
                 return "Por favor, me diga o intervalo de datas que deseja consultar."
@@ -1,5 +1,8 @@
 """
 Integração com análise financeira simplificada (sem dependência do CrewAI complexo)
+
+O caminho simples nunca importa crewai/langchain; o CrewAI só é carregado se
+executar_analise_crewai for chamada (serviço único, construído no primeiro uso).
 """
 import sys
 import os
@@ -8,13 +11,14 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Sugestao-acao'))
 
 
-def executar_analise_financeira(saldo_atual: float, boletos_file_path: str) -> str:
+def executar_analise_financeira(saldo_atual: float, boletos_file_path: str = None, boletos: list = None) -> str:
     """
     Executa a análise financeira
     
     Args:
         saldo_atual: Saldo de caixa disponível
-        boletos_file_path: Caminho para o arquivo JSON com os boletos
+        boletos_file_path: Caminho para o arquivo JSON com os boletos (modo de compatibilidade)
+        boletos: Lista de boletos em memória (formato CrewAI), sem passar por arquivo
     
     Returns:
         String com o relatório da análise
@@ -23,9 +27,33 @@ def executar_analise_financeira(saldo_atual: float, boletos_file_path: str) -> s
         # Usa a versão simplificada da análise
         from financial_tools_simple import analisar_pagamento_boletos
         
-        resultado = analisar_pagamento_boletos(saldo_atual, boletos_file_path)
+        resultado = analisar_pagamento_boletos(saldo_atual, boletos_file_path, boletos=boletos)
         return resultado
         
     except Exception as e:
-        return f"❌ Erro ao executar análise: {str(e)}\n\nVerifique se o arquivo de boletos existe e está no formato correto."
+        return f"❌ Erro ao executar análise: {str(e)}\n\nVerifique se os boletos foram informados e estão no formato correto."
+
+
+def calcular_plano_financeiro(saldo_atual: float, boletos_file_path: str = None, boletos: list = None):
+    """
+    Calcula o plano de pagamento estruturado (PlanoPagamento), sem montar o relatório
+    
+    O texto de executar_analise_financeira é plano.para_texto(); quem guarda o
+    plano pode pedir outros formatos (para_dict, para_json, para_compacto) sem
+    recalcular. Erros são propagados para quem chama.
+    """
+    from financial_tools_simple import calcular_plano_pagamento
+    
+    return calcular_plano_pagamento(saldo_atual, boletos_file_path, boletos=boletos)
+
 
+def executar_analise_crewai(inputs: dict = None):
+    """
+    Executa a análise com o agente CrewAI (Sugestao-acao/crew.py)
+    
+    O CrewAI é importado e o crew construído na primeira chamada; as seguintes
+    reaproveitam o mesmo serviço.
+    """
+    from crew import obter_servico_crewai
+    
+    return obter_servico_crewai().executar(inputs)
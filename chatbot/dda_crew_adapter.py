@@ -4,13 +4,15 @@ Adaptador para integrar a saída do DDA com a entrada do CrewAI
 import json
 import sys
 import os
+import tempfile
 from datetime import datetime, timedelta
 
 # Adiciona os diretórios ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'DDA'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Sugestao-acao'))
 
-from queries_dda import sistema_boletos
+from queries_dda import sistema_boletos, sistema_boletos_batch, versao_dataset
+from precificacao import precificar_boletos, taxa_juros_diaria
 
 
 class DDACrewAdapter:
@@ -18,9 +20,14 @@ class DDACrewAdapter:
     
     def __init__(self, cnpj: str, dda_json_path: str = None):
         self.cnpj = cnpj
-        if dda_json_path:
-            # Atualiza o caminho no queries_dda se necessário
-            pass
+        self.dda_json_path = dda_json_path
+    
+    def _parametros_dda(self) -> dict:
+        """Parâmetros comuns às consultas do DDA"""
+        parametros = {"cnpj": self.cnpj}
+        if self.dda_json_path:
+            parametros["dda_json_path"] = self.dda_json_path
+        return parametros
     
     def calcular_juros_acumulado(self, valor: float, multa_percentual: float, dias_atraso: int) -> float:
         """Calcula juros acumulados de um boleto vencido"""
@@ -46,40 +53,43 @@ class DDACrewAdapter:
             {
                 "codigo": "B001",
                 "valor": float,
-                "juros_diario": float
+                "juros_diario": float,
+                "id": "B001",               # id no DDA (ou o próprio código)
+                "beneficiario": str
             }
         ]
+        
+        data_referencia é mantido por compatibilidade: o juros diário depende
+        apenas do valor e dos juros já calculados de cada boleto.
         """
-        if data_referencia is None:
-            data_referencia = datetime.now().strftime('%Y-%m-%d')
-        
-        boletos_crewai = []
-        
-        for codigo, dados in boletos_dict.items():
-            # Calcula dias de atraso se houver
-            data_venc = datetime.strptime(dados['data_vencimento'], '%Y-%m-%d')
-            data_ref = datetime.strptime(data_referencia, '%Y-%m-%d')
-            dias_atraso = (data_ref - data_venc).days
-            
-            # Estima juros diário baseado no valor (pode ser ajustado)
-            juros_diario = 0.002  # 0.2% ao dia como padrão
-            if dados.get('juros', 0) > 0:
-                # Se já tem juros calculado, usa como base
-                juros_diario = dados['juros'] / dados['valor'] if dados['valor'] > 0 else 0.002
-            
-            boleto_crew = {
+        valores = [dados['valor'] for dados in boletos_dict.values()]
+        
+        # Juros diário de todos os boletos de uma vez: juros / valor quando já há
+        # juros calculado, senão 0.2% ao dia como padrão
+        juros_diario = taxa_juros_diaria(valores, [dados.get('juros', 0) for dados in boletos_dict.values()])
+        
+        return [
+            {
                 "codigo": codigo,
-                "valor": dados['valor'],
-                "juros_diario": juros_diario
+                "valor": valor,
+                "juros_diario": taxa,
+                "id": dados.get('id', codigo),
+                "beneficiario": dados.get('beneficiario', 'Não informado')
             }
-            boletos_crewai.append(boleto_crew)
-        
-        return boletos_crewai
+            for (codigo, dados), valor, taxa in zip(boletos_dict.items(), valores, juros_diario.tolist())
+        ]
     
     def salvar_boletos_temporarios(self, boletos_crewai: list, output_path: str = None) -> str:
-        """Salva os boletos no formato CrewAI em um arquivo temporário"""
+        """
+        Salva os boletos no formato CrewAI em um arquivo temporário
+        
+        Só é necessário para consumidores que ainda leem arquivo; a análise
+        financeira recebe a lista diretamente. Sem output_path, cada chamada
+        usa um arquivo com nome único (sessões concorrentes não se sobrescrevem).
+        """
         if output_path is None:
-            output_path = os.path.join(os.path.dirname(__file__), 'temp_boletos.json')
+            fd, output_path = tempfile.mkstemp(prefix='temp_boletos_', suffix='.json')
+            os.close(fd)
         
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(boletos_crewai, f, indent=4, ensure_ascii=False)
@@ -96,28 +106,43 @@ class DDACrewAdapter:
         
         overview, boletos_dict = sistema_boletos(
             "overview_dia",
-            cnpj=self.cnpj,
-            dia=dia
+            dia=dia,
+            **self._parametros_dda()
         )
         
         return overview, boletos_dict
     
+    def obter_visao_dia_completa(self, dia: str = None):
+        """
+        Obtém a visão do dia e os boletos atrasados em uma única consulta ao DDA
+        Retorna: (overview, boletos_dict, boletos_atrasados)
+        """
+        if dia is None:
+            dia = datetime.now().strftime('%Y-%m-%d')
+        
+        (overview, boletos_dict), atrasados = sistema_boletos_batch(
+            [{"acao": "overview_dia", "dia": dia}, "atrasados"],
+            **self._parametros_dda()
+        )
+        
+        return overview, boletos_dict, atrasados
+    
     def obter_detalhe_boleto(self, id_boleto: str, campos: list = None):
         """Obtém detalhes de um boleto específico"""
         return sistema_boletos(
             "detalhe_boleto",
-            cnpj=self.cnpj,
             id_boleto=id_boleto,
-            campos=campos
+            campos=campos,
+            **self._parametros_dda()
         )
     
     def obter_dash_intervalo(self, data_inicio: str, data_fim: str):
         """Obtém dashboard de intervalo de tempo"""
         return sistema_boletos(
             "dash_intervalo",
-            cnpj=self.cnpj,
             data_inicio=data_inicio,
-            data_fim=data_fim
+            data_fim=data_fim,
+            **self._parametros_dda()
         )
     
     def obter_boletos_atrasados(self, referencia: str = None):
@@ -127,16 +152,28 @@ class DDACrewAdapter:
         
         return sistema_boletos(
             "atrasados",
-            cnpj=self.cnpj,
-            referencia=referencia
+            referencia=referencia,
+            **self._parametros_dda()
         )
     
-    def preparar_para_sugestao_acao(self, dia: str = None, boletos_pagos: list = None) -> tuple:
+    def versao_dda(self):
+        """Versão atual do dataset do DDA (muda com ingest/compactar, ver versao_dataset)"""
+        return versao_dataset(self.dda_json_path or 'dda.json')
+    
+    def preparar_para_sugestao_acao(self, dia: str = None, boletos_pagos: list = None,
+                                    salvar_arquivo: bool = False, visao: tuple = None) -> tuple:
         """
         Prepara dados do DDA para enviar ao CrewAI
         Inclui TODOS os boletos que precisam ser pagos (do dia + vencidos)
         Filtra boletos já pagos
         Retorna: (overview, boletos_crewai_list, temp_file_path)
+        
+        temp_file_path só é gerado com salvar_arquivo=True (compatibilidade com
+        quem ainda lê os boletos de arquivo); caso contrário é None e a lista
+        deve ser passada diretamente para a análise financeira.
+        
+        visao é o resultado de obter_visao_dia_completa(dia), para quem já
+        consultou o DDA e não quer repetir a consulta.
         """
         if dia is None:
             dia = datetime.now().strftime('%Y-%m-%d')
@@ -144,14 +181,15 @@ class DDACrewAdapter:
         if boletos_pagos is None:
             boletos_pagos = []
         
-        # Obtém overview do dia (que já inclui info de vencidos)
-        overview, boletos_dict_dia = self.obter_visao_dia(dia)
+        # Obtém overview do dia e TODOS os boletos vencidos (sempre usa data ATUAL)
+        # em uma única consulta ao DDA
+        if visao is None:
+            visao = self.obter_visao_dia_completa(dia)
+        overview, boletos_dict_dia, boletos_vencidos = visao
         
         # Filtra boletos do dia já pagos
         boletos_dict_dia = {k: v for k, v in boletos_dict_dia.items() if k not in boletos_pagos}
         
-        # Obtém TODOS os boletos vencidos também (sempre usa data ATUAL)
-        boletos_vencidos = self.obter_boletos_atrasados()
         boletos_vencidos = [b for b in boletos_vencidos if b['id'] not in boletos_pagos]
         
         # Combina boletos do dia + vencidos
@@ -161,27 +199,34 @@ class DDACrewAdapter:
         todos_boletos.update(boletos_dict_dia)
         
         # Adiciona boletos vencidos (se não estiverem duplicados)
+        novos_vencidos = {}
         for boleto_vencido in boletos_vencidos:
             codigo = f"Boleto_{boleto_vencido['id']}"
             if codigo not in todos_boletos:
-                # Calcula juros acumulados para boletos vencidos (sempre usa data ATUAL)
-                data_venc = datetime.strptime(boleto_vencido['data_vencimento'], '%Y-%m-%d')
-                data_atual = datetime.now()  # Usa data atual, não a consultada
-                dias_atraso = (data_atual - data_venc).days
-                
-                juros = boleto_vencido['valor'] * boleto_vencido.get('multa', 0.02) * dias_atraso
-                
-                todos_boletos[codigo] = {
-                    'empresa': boleto_vencido['cnpj'],
-                    'beneficiario': boleto_vencido.get('beneficiario', 'Não informado'),
-                    'valor': boleto_vencido['valor'],
-                    'juros': juros,
-                    'data_vencimento': boleto_vencido['data_vencimento']
-                }
+                novos_vencidos.setdefault(codigo, boleto_vencido)
+        
+        # Juros acumulados de todos os vencidos em um único passo (sempre usa data ATUAL,
+        # não a consultada)
+        precos = precificar_boletos(
+            [boleto['valor'] for boleto in novos_vencidos.values()],
+            [boleto['data_vencimento'] for boleto in novos_vencidos.values()],
+            datetime.now().date(),
+            multas=[boleto.get('multa') for boleto in novos_vencidos.values()]
+        )
+        
+        for (codigo, boleto_vencido), juros in zip(novos_vencidos.items(), precos['juros'].tolist()):
+            todos_boletos[codigo] = {
+                'id': boleto_vencido['id'],
+                'empresa': boleto_vencido['cnpj'],
+                'beneficiario': boleto_vencido.get('beneficiario', 'Não informado'),
+                'valor': boleto_vencido['valor'],
+                'juros': juros,
+                'data_vencimento': boleto_vencido['data_vencimento']
+            }
         
         # Converte TODOS os boletos para formato CrewAI
         boletos_crewai = self.converter_boletos_para_crewai(todos_boletos, dia)
-        temp_path = self.salvar_boletos_temporarios(boletos_crewai)
+        temp_path = self.salvar_boletos_temporarios(boletos_crewai) if salvar_arquivo else None
         
         return overview, boletos_crewai, temp_path
 
@@ -0,0 +1,86 @@
+"""
+Extração de entidades das mensagens (períodos, datas e códigos de boleto)
+
+Todos os padrões ficam em uma única expressão regular, compilada uma vez, com
+uma alternativa nomeada por entidade; uma varredura (finditer) devolve tudo o
+que a mensagem traz:
+
+    >>> extrair_entidades("boleto_3 e os próximos 2 meses a partir de 2025-10-20")
+    Entidades(periodo=Periodo(quantidade=2, unidade='meses'), datas=('2025-10-20',),
+              codigos_boleto=(('BOLETO_3', '3'),), numeros=())
+
+Usada pelo IntentClassifier (parâmetros da intenção) e pelo ChatbotManager
+(intervalos automáticos, intervalos digitados e códigos de boleto).
+"""
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+_PROXIMOS = r'pr[oó]xim[oa]s?'
+_UNIDADE = r'dias?|semanas?|m[eê]s(?:es)?'
+
+# A ordem das alternativas importa: datas antes de números soltos
+PADRAO_ENTIDADES = re.compile(rf'''
+      (?<!\d)(?P<data>\d{{4}}-\d{{2}}-\d{{2}})(?!\d)
+    | {_PROXIMOS}\s+(?P<quantidade>\d+)\s+(?P<unidade>{_UNIDADE})\b
+    | (?P<quantidade_antes>\d+)\s+(?P<unidade_antes>{_UNIDADE})\s+{_PROXIMOS}\b
+    | (?P<boleto>bol(?:eto)?[_\s]*(?P<numero_boleto>\d+))
+    | (?P<numero>\d+)
+''', re.IGNORECASE | re.VERBOSE)
+
+UNIDADES = {'d': 'dias', 's': 'semanas', 'm': 'meses'}
+
+
+class Periodo(NamedTuple):
+    """Período relativo a hoje ("próximos 15 dias")"""
+    quantidade: int
+    unidade: str  # 'dias', 'semanas' ou 'meses'
+
+    def data_fim(self, hoje: date) -> date:
+        if self.unidade == 'semanas':
+            return hoje + timedelta(weeks=self.quantidade)
+        if self.unidade == 'meses':
+            # Aproximação: 1 mês = 30 dias
+            return hoje + timedelta(days=self.quantidade * 30)
+        return hoje + timedelta(days=self.quantidade)
+
+
+class Entidades(NamedTuple):
+    periodo: Optional[Periodo]  # o primeiro período da mensagem
+    datas: tuple                # 'AAAA-MM-DD', na ordem da mensagem
+    codigos_boleto: tuple       # (trecho em maiúsculas, número), ex.: ('BOL_001', '001')
+    numeros: tuple              # números fora de datas, períodos e códigos
+
+    def parametros(self, hoje: Optional[date] = None) -> dict:
+        """Parâmetros da intenção: data e data_fim (período relativo e/ou datas)"""
+        parametros = {}
+        if self.periodo is not None:
+            hoje = hoje or datetime.now().date()
+            parametros['data'] = hoje.strftime('%Y-%m-%d')
+            parametros['data_fim'] = self.periodo.data_fim(hoje).strftime('%Y-%m-%d')
+        if self.datas:
+            parametros['data'] = self.datas[0]
+            if len(self.datas) > 1:
+                parametros['data_fim'] = self.datas[1]
+        return parametros
+
+
+@lru_cache(maxsize=1024)
+def extrair_entidades(mensagem: str) -> Entidades:
+    """Todas as entidades da mensagem em uma varredura"""
+    periodo = None
+    datas, codigos, numeros = [], [], []
+    for match in PADRAO_ENTIDADES.finditer(mensagem):
+        grupos = match.groupdict()
+        if grupos['data']:
+            datas.append(grupos['data'])
+        elif grupos['boleto']:
+            codigos.append((grupos['boleto'].upper(), grupos['numero_boleto']))
+        elif grupos['numero']:
+            numeros.append(int(grupos['numero']))
+        elif periodo is None:
+            quantidade = grupos['quantidade'] or grupos['quantidade_antes']
+            unidade = grupos['unidade'] or grupos['unidade_antes']
+            periodo = Periodo(int(quantidade), UNIDADES[unidade[0].lower()])
+    return Entidades(periodo, tuple(datas), tuple(codigos), tuple(numeros))
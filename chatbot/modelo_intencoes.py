@@ -0,0 +1,159 @@
+"""
+Modelo local de intenções (n-gramas de caracteres + regressão logística)
+
+Classifica a mensagem sem chamar a LLM: TF-IDF sobre n-gramas de caracteres
+(robusto a erros de digitação e variações de flexão) e uma regressão
+logística multinomial treinada com NumPy. A confiança é a probabilidade da
+classe vencedora multiplicada pela fração da mensagem coberta pelo
+vocabulário do modelo, então mensagens fora do domínio ficam com confiança
+baixa e seguem para a LLM.
+
+Treino offline (INTENCOES + frases registradas em JSONL):
+    python modelo_intencoes.py [frases.jsonl ...]
+grava modelo_intencoes.npz, que o IntentClassifier carrega se existir (sem
+ele, o modelo é treinado na primeira classificação, em dezenas de milissegundos).
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+from normalizacao import normalizar
+
+ARQUIVO_MODELO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelo_intencoes.npz')
+NGRAMAS = (2, 3, 4)
+LIMIAR_CONFIANCA = 0.6  # abaixo disso a mensagem vai para a LLM
+
+
+def _ngramas(texto: str) -> list:
+    """n-gramas de caracteres de cada palavra normalizada (com espaço nas bordas)"""
+    ngramas = []
+    for palavra in normalizar(texto).split():
+        palavra = f" {palavra} "
+        for n in NGRAMAS:
+            ngramas.extend(palavra[i:i + n] for i in range(len(palavra) - n + 1))
+    return ngramas
+
+
+def carregar_frases(caminho: str) -> list:
+    """Frases registradas ({"mensagem", "intencao"} por linha) como (mensagem, intenção)"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return [(registro['mensagem'], registro['intencao'])
+                for registro in map(json.loads, filter(str.strip, f))]
+
+
+class ModeloIntencoes:
+    """TF-IDF de n-gramas de caracteres + regressão logística multinomial"""
+
+    def __init__(self, vocabulario: dict, idf: np.ndarray, pesos: np.ndarray, vies: np.ndarray,
+                 intencoes: tuple):
+        self.vocabulario = vocabulario
+        self.idf = idf
+        self.pesos = pesos  # (n-gramas × intenções)
+        self.vies = vies
+        self.intencoes = tuple(intencoes)
+
+    def _vetor(self, texto: str) -> tuple:
+        """(índices, valores TF-IDF normalizados, fração dos n-gramas conhecidos)"""
+        ngramas = _ngramas(texto)
+        contagem = {}
+        for ngrama in ngramas:
+            indice = self.vocabulario.get(ngrama)
+            if indice is not None:
+                contagem[indice] = contagem.get(indice, 0) + 1
+        if not contagem:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), 0.0
+        indices = np.fromiter(contagem, dtype=np.int64, count=len(contagem))
+        valores = (1 + np.log(np.fromiter(contagem.values(), dtype=float, count=len(contagem)))) * self.idf[indices]
+        return indices, valores / np.linalg.norm(valores), sum(contagem.values()) / len(ngramas)
+
+    def _softmax(self, indices: np.ndarray, valores: np.ndarray) -> np.ndarray:
+        logits = valores @ self.pesos[indices] + self.vies
+        exp = np.exp(logits - logits.max())
+        return exp / exp.sum()
+
+    def probabilidades(self, texto: str) -> np.ndarray:
+        """Probabilidade de cada intenção (na ordem de self.intencoes)"""
+        indices, valores, _ = self._vetor(texto)
+        return self._softmax(indices, valores)
+
+    def prever(self, texto: str) -> tuple:
+        """(intenção, confiança); confiança 0 quando nada da mensagem é conhecido"""
+        indices, valores, cobertura = self._vetor(texto)
+        if cobertura == 0:
+            return 'desconhecida', 0.0
+        probabilidades = self._softmax(indices, valores)
+        melhor = int(probabilidades.argmax())
+        return self.intencoes[melhor], float(probabilidades[melhor] * cobertura)
+
+    @classmethod
+    def treinar(cls, exemplos: list, epocas: int = 400, taxa: float = 5.0,
+                regularizacao: float = 1e-4) -> 'ModeloIntencoes':
+        """
+        Treina com gradiente descendente (lote inteiro; os exemplos são poucos).
+
+        Args:
+            exemplos: lista de (mensagem, intenção)
+        """
+        intencoes = tuple(dict.fromkeys(intencao for _, intencao in exemplos))
+        classe = {intencao: i for i, intencao in enumerate(intencoes)}
+
+        vocabulario = {}
+        documentos = []
+        for mensagem, _ in exemplos:
+            documento = {}
+            for ngrama in _ngramas(mensagem):
+                indice = vocabulario.setdefault(ngrama, len(vocabulario))
+                documento[indice] = documento.get(indice, 0) + 1
+            documentos.append(documento)
+
+        # TF-IDF (tf sublinear, idf suavizado) com linhas normalizadas
+        X = np.zeros((len(exemplos), len(vocabulario)))
+        for linha, documento in enumerate(documentos):
+            X[linha, list(documento)] = 1 + np.log(list(documento.values()))
+        idf = np.log((1 + len(exemplos)) / (1 + (X > 0).sum(axis=0))) + 1
+        X *= idf
+        X /= np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+
+        Y = np.zeros((len(exemplos), len(intencoes)))
+        Y[np.arange(len(exemplos)), [classe[intencao] for _, intencao in exemplos]] = 1
+
+        # Partindo de zero, os pesos ficam sempre no espaço das linhas de X
+        # (pesos = X.T @ coeficientes): o gradiente é calculado com a matriz
+        # exemplos × exemplos X @ X.T, bem menor que a de n-gramas
+        nucleo = X @ X.T
+        coeficientes = np.zeros((len(exemplos), len(intencoes)))
+        vies = np.zeros(len(intencoes))
+        for _ in range(epocas):
+            logits = nucleo @ coeficientes + vies
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            erro = (exp / exp.sum(axis=1, keepdims=True) - Y) / len(exemplos)
+            coeficientes -= taxa * (erro + regularizacao * coeficientes)
+            vies -= taxa * erro.sum(axis=0)
+        return cls(vocabulario, idf, X.T @ coeficientes, vies, intencoes)
+
+    def salvar(self, caminho: str = ARQUIVO_MODELO):
+        ngramas = sorted(self.vocabulario, key=self.vocabulario.get)
+        np.savez_compressed(caminho, ngramas=np.array(ngramas), idf=self.idf, pesos=self.pesos,
+                            vies=self.vies, intencoes=np.array(self.intencoes))
+
+    @classmethod
+    def carregar(cls, caminho: str = ARQUIVO_MODELO) -> 'ModeloIntencoes':
+        with np.load(caminho) as dados:
+            vocabulario = {str(ngrama): i for i, ngrama in enumerate(dados['ngramas'])}
+            return cls(vocabulario, dados['idf'], dados['pesos'], dados['vies'],
+                       tuple(str(i) for i in dados['intencoes']))
+
+
+if __name__ == "__main__":
+    from nlp_intent import IntentClassifier
+
+    exemplos = IntentClassifier.exemplos_treino()
+    for caminho in sys.argv[1:]:
+        exemplos += carregar_frases(caminho)
+    modelo = ModeloIntencoes.treinar(exemplos)
+    modelo.salvar()
+    acertos = sum(modelo.prever(mensagem)[0] == intencao for mensagem, intencao in exemplos)
+    print(f"Modelo treinado com {len(exemplos)} frases ({acertos / len(exemplos):.0%} de acerto no treino) "
+          f"-> {ARQUIVO_MODELO}")
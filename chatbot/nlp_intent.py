@@ -1,10 +1,21 @@
 """
 Módulo de Processamento de Linguagem Natural para entender intenções do usuário
 """
+import json
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
 from dotenv import load_dotenv
 
+from automato_palavras import AutomatoPalavrasChave
+from extracao_entidades import extrair_entidades
+from normalizacao import CorretorOrtografico, normalizar, normalizar_termos
+from modelo_intencoes import ARQUIVO_MODELO, LIMIAR_CONFIANCA, ModeloIntencoes
+
 load_dotenv()
 
 # Tenta usar OpenAI para entendimento de intenção
@@ -16,15 +27,73 @@ except:
     OPENAI_AVAILABLE = False
 
 
+class InfoCacheIntencoes(NamedTuple):
+    hits: int
+    misses: int
+    expirados: int
+    maxsize: int
+    currsize: int
+
+
+def _copiar_resultado(resultado: dict) -> dict:
+    """Cópia independente do resultado (quem recebe pode alterar os parâmetros)"""
+    return {**resultado, 'parametros': dict(resultado.get('parametros') or {})}
+
+
+class CacheIntencoes:
+    """
+    Cache LRU com validade (TTL) das classificações, compartilhado entre as
+    sessões e entre threads. Chave: (mensagem normalizada, contexto, modo).
+    """
+    
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0, relogio=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._relogio = relogio
+        self._itens = OrderedDict()  # chave -> (instante de gravação, resultado)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.expirados = 0
+    
+    def obter(self, chave):
+        """Cópia do resultado guardado ou None"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and self._relogio() - item[0] > self.ttl:
+                del self._itens[chave]
+                self.expirados += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+        return _copiar_resultado(item[1])
+    
+    def guardar(self, chave, resultado: dict):
+        with self._lock:
+            self._itens[chave] = (self._relogio(), _copiar_resultado(resultado))
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maxsize:
+                self._itens.popitem(last=False)
+    
+    def info(self) -> InfoCacheIntencoes:
+        with self._lock:
+            return InfoCacheIntencoes(self.hits, self.misses, self.expirados, self.maxsize, len(self._itens))
+    
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self.hits = self.misses = self.expirados = 0
+
+
 class IntentClassifier:
     """Classifica a intenção do usuário usando IA ou pattern matching"""
     
     INTENCOES = {
         'saudacao': [
-            'oi', 'olá', 'ola', 'bom dia', 'boa tarde', 'boa noite', 'hey', 'hi',
+            'oi', 'olá', 'bom dia', 'boa tarde', 'boa noite', 'hey', 'hi',
             'hello', 'e aí', 'eai', 'salve', 'fala', 'tudo bem', 'td bem',
-            'como vai', 'como está', 'tudo certo', 'beleza', 'eae', 'oie',
-            'bom dia', 'boa tarde', 'boa noite', 'bom dia!', 'boa tarde!', 'boa noite!'
+            'como vai', 'como está', 'tudo certo', 'beleza', 'eae', 'oie'
         ],
         'ver_pagamentos_hoje': [
             'pagamentos de hoje', 'boletos hoje', 'ver hoje', 'pagamento hoje',
@@ -54,7 +123,7 @@ class IntentClassifier:
             'aceito sua sugestão', 'aceito a sugestão', 'concordo com a sugestão',
             'vamos com sua sugestão', 'vamos com a sugestão', 'fazer sua sugestão',
             'fazer a sugestão', 'aplicar sua sugestão', 'aplicar a sugestão',
-            'implementar sua sugestão', 'implementar a sugestão', 'seguir recomendação',
+            'implementar sua sugestão', 'implementar a sugestão',
             'aceito recomendação', 'concordo com recomendação', 'vamos com recomendação',
             'fazer recomendação', 'aplicar recomendação', 'implementar recomendação',
             'quero seguir', 'vou seguir', 'pode seguir', 'pode executar',
@@ -74,7 +143,7 @@ class IntentClassifier:
             'outra opção', 'mais opções', 'outras alternativas', 'mais detalhes dessa negociação',
             'detalhes da negociação', 'negociação', 'opções de negociação',
             'como funciona', 'explicar opções', 'ver como funciona',
-            'me de opções de financiamento', 'me dê opções de financiamento',
+            'me dê opções de financiamento',
             'quero opções de financiamento', 'preciso de opções de financiamento',
             'mostre opções de financiamento', 'opções de financiamento por favor'
         ],
@@ -93,8 +162,74 @@ class IntentClassifier:
         ]
     }
     
+    # Listas usadas só em contextos específicos da conversa
+    PADROES_CONTEXTO = {
+        # opcoes_visao_dia: pedido de opções de financiamento
+        'pedidos_financiamento': [
+            'mais detalhes dessa negociação', 'detalhes da negociação',
+            'negociação', 'opções de negociação', 'outras opções',
+            'opções de financiamento', 'como funciona', 'explicar opções'
+        ],
+        # opcoes_visao_dia: pedido de informação sobre boletos
+        'pedidos_info': [
+            'saber mais', 'mais informações', 'informações', 'detalhes',
+            'mostrar', 'listar', 'ver boletos', 'quais boletos'
+        ],
+        # opcoes_visao_dia: confirmação de pagamento
+        'confirmacoes': [
+            'sim', 'yes', 'confirmo', 'confirmar', 'pode pagar',
+            'executar pagamento', 'pagar agora', 'efetuar pagamento'
+        ],
+        # confirmacao_pagamento: sim / não
+        'confirmacoes_sim': [
+            'sim', 'confirmo', 'ok', 'pode', 'pagar', 'executar', 'confirmar',
+            'aceito', 'aceito essa proposta', 'executar proposta', 'executar estratégia',
+            'pagar assim', 'aceito proposta', 'aceito estratégia', 'quero executar',
+            'prosseguir', 'continuar'
+        ],
+        'confirmacoes_nao': ['não', 'cancelar', 'voltar', 'negativo'],
+    }
+    
+    # Intenção de cada lista de contexto (para o treino do modelo local)
+    INTENCAO_PADROES_CONTEXTO = {
+        'pedidos_financiamento': 'ver_opcoes_financiamento',
+        'pedidos_info': 'ver_detalhes',
+        'confirmacoes': 'pagar',
+        'confirmacoes_sim': 'pagar',
+        'confirmacoes_nao': 'voltar',
+    }
+    
+    # As listas acima só precisam de uma grafia: acentos, pontuação e maiúsculas
+    # são removidos das listas e das mensagens (normalizar)
+    TABELAS = {nome: normalizar_termos(termos) for nome, termos in {**INTENCOES, **PADROES_CONTEXTO}.items()}
+    
+    # Todas as listas compiladas uma vez: uma passada pela mensagem pontua todas
+    AUTOMATO = AutomatoPalavrasChave(TABELAS)
+    
+    # Correção de erros de digitação contra as palavras das listas
+    CORRETOR = CorretorOrtografico(palavra for termos in TABELAS.values() for termo in termos
+                                   for palavra in termo.split())
+    corrigir_digitacao = True
+    
+    # Intenções que o modelo local só decide sozinho com palavra-chave que confirme
+    INTENCOES_SENSIVEIS = {'pagar'}
+    
+    # Com alguma destas palavras, intenção sensível nunca é decidida localmente
+    NEGACOES = frozenset({'nao', 'negativo', 'cancelar'})
+    
+    # Classificações já feitas (todas as sessões usam o mesmo cache)
+    CACHE = CacheIntencoes()
+    
     def __init__(self):
         self.use_openai = OPENAI_AVAILABLE and os.getenv('OPENAI_API_KEY')
+        # Frases classificadas pela LLM, para treinar o modelo local (python modelo_intencoes.py arquivo)
+        self.arquivo_frases = os.getenv('INTENT_LOG_PATH')
+    
+    @classmethod
+    def exemplos_treino(cls) -> list:
+        """(frase normalizada, intenção) de INTENCOES e das listas de contexto"""
+        return [(frase, cls.INTENCAO_PADROES_CONTEXTO.get(tabela, tabela))
+                for tabela, frases in cls.TABELAS.items() for frase in frases]
     
     def classificar_intencao(self, mensagem: str, contexto: str = None) -> dict:
         """
@@ -107,21 +242,85 @@ class IntentClassifier:
         Returns:
             dict com 'intencao', 'confianca' e 'parametros'
         """
-        mensagem_lower = mensagem.lower().strip()
+        mensagem_lower = " ".join(mensagem.lower().split())
         
         # Se for apenas um número, mapeia para contexto
         if mensagem_lower.isdigit():
             return self._processar_numero(mensagem_lower, contexto)
         
-        # Tenta usar OpenAI se disponível
+        # Mensagens com números (datas) ficam como digitadas: a normalização tira os hífens
+        texto = mensagem_lower if any(c.isdigit() for c in mensagem_lower) else normalizar(mensagem_lower)
+        chave = (texto, contexto, bool(self.use_openai))
+        resultado = self.CACHE.obter(chave)
+        if resultado is None:
+            resultado, confiavel = self._classificar(mensagem, mensagem_lower, contexto)
+            # Não guarda o fallback depois de erro da LLM, parâmetros relativos
+            # a hoje ("próximos 10 dias") nem mensagens não reconhecidas
+            if confiavel and not resultado.get('parametros') and resultado.get('intencao') != 'desconhecida':
+                self.CACHE.guardar(chave, resultado)
+        return resultado
+    
+    def _classificar(self, mensagem: str, mensagem_lower: str, contexto: str) -> tuple:
+        """(resultado, confiável): só resultados confiáveis vão para o cache"""
+        # Tenta usar OpenAI se disponível, só quando a classificação local não é confiável
         if self.use_openai:
+            local = self._classificar_localmente(mensagem_lower, contexto)
+            if local['confianca'] >= LIMIAR_CONFIANCA:
+                return local, True
             try:
-                return self._classificar_com_openai(mensagem, contexto)
+                resultado = self._classificar_com_openai(mensagem, contexto)
+                self._registrar_frase(mensagem_lower, resultado)
+                return resultado, True
             except:
-                pass  # Fallback para pattern matching
+                # Fallback para pattern matching; a próxima mensagem tenta a LLM de novo
+                return self._classificar_com_patterns(mensagem_lower, contexto), False
         
-        # Fallback: Pattern matching simples
-        return self._classificar_com_patterns(mensagem_lower, contexto)
+        # Sem LLM: Pattern matching simples
+        return self._classificar_com_patterns(mensagem_lower, contexto), True
+    
+    def _classificar_localmente(self, mensagem: str, contexto: str) -> dict:
+        """
+        Palavras-chave + modelo local (n-gramas de caracteres). A confiança é a
+        do modelo quando os dois concordam (ou não há palavra-chave) e zero
+        quando discordam, para a mensagem seguir para a LLM.
+        
+        Os atalhos de contexto (sim/não) não valem aqui: "não aceito essa
+        proposta" casa com "aceito" e a negação só é entendida pela LLM. Pelo
+        mesmo motivo, pagamento em mensagem com negação também vai para a LLM.
+        """
+        resultado = self._classificar_com_patterns(mensagem, None)
+        intencao, confianca = resultado['intencao'], resultado['confianca']
+        
+        if confianca < 1.0:
+            intencao, confianca = obter_modelo_intencoes().prever(mensagem)
+            if resultado['intencao'] == 'desconhecida':
+                if intencao in self.INTENCOES_SENSIVEIS:
+                    confianca = 0.0
+            elif resultado['intencao'] != intencao:
+                confianca = 0.0
+            else:
+                confianca = max(confianca, resultado['confianca'])
+        
+        if intencao in self.INTENCOES_SENSIVEIS and self.NEGACOES.intersection(normalizar(mensagem).split()):
+            confianca = 0.0
+        
+        return {
+            'intencao': intencao,
+            'confianca': confianca,
+            'parametros': resultado['parametros']
+        }
+    
+    def _registrar_frase(self, mensagem: str, resultado: dict):
+        """Guarda a frase classificada pela LLM (JSONL) para o treino offline do modelo local"""
+        if not self.arquivo_frases or resultado.get('intencao') in (None, 'desconhecida'):
+            return
+        with open(self.arquivo_frases, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'mensagem': mensagem, 'intencao': resultado['intencao']}, ensure_ascii=False) + "\n")
+    
+    def texto_para_palavras_chave(self, mensagem: str) -> str:
+        """Mensagem normalizada e, se ativado, com erros de digitação corrigidos"""
+        texto = normalizar(mensagem)
+        return self.CORRETOR.corrigir(texto) if self.corrigir_digitacao else texto
     
     def _processar_numero(self, numero: str, contexto: str) -> dict:
         """Processa entrada numérica baseada no contexto"""
@@ -152,9 +351,11 @@ class IntentClassifier:
         melhor_intencao = 'desconhecida'
         melhor_score = 0
         
+        # Uma passada pelo autômato (sobre o texto normalizado) pontua todas as listas
+        pontuacao = self.AUTOMATO.pontuar(self.texto_para_palavras_chave(mensagem))
+        
         # PRIMEIRO: Verifica se é uma saudação (tem prioridade máxima)
-        saudações = self.INTENCOES['saudacao']
-        if any(saudacao in mensagem for saudacao in saudações):
+        if pontuacao.get('saudacao'):
             return {
                 'intencao': 'saudacao',
                 'confianca': 1.0,
@@ -163,96 +364,42 @@ class IntentClassifier:
         
         # Contexto especial: se está em opcoes_visao_dia e usuário quer pagar, move para confirmação
         if contexto == 'opcoes_visao_dia':
-            # Primeiro verifica se é pedido de opções de financiamento
-            pedidos_financiamento = ['mais detalhes dessa negociação', 'detalhes da negociação', 
-                                   'negociação', 'opções de negociação', 'outras opções', 
-                                   'opções de financiamento', 'como funciona', 'explicar opções']
-            if any(fin in mensagem for fin in pedidos_financiamento):
-                return {
-                    'intencao': 'ver_opcoes_financiamento',
-                    'confianca': 1.0,
-                    'parametros': {}
-                }
-            
-            # Depois verifica se NÃO é um pedido de informação sobre boletos
-            pedidos_info = ['saber mais', 'mais informações', 'informações', 'detalhes', 
-                           'mostrar', 'listar', 'ver boletos', 'quais boletos']
-            if any(info in mensagem for info in pedidos_info):
-                return {
-                    'intencao': 'ver_detalhes',
-                    'confianca': 1.0,
-                    'parametros': {}
-                }
-            
-            # Só depois verifica confirmações de pagamento
-            confirmacoes = ['sim', 'yes', 'confirmo', 'confirmar', 'pode pagar', 
-                           'executar pagamento', 'pagar agora', 'efetuar pagamento']
-            if any(conf in mensagem for conf in confirmacoes):
-                return {
-                    'intencao': 'pagar',
-                    'confianca': 1.0,
-                    'parametros': {}
-                }
+            # Primeiro pedido de opções de financiamento, depois pedido de
+            # informação sobre boletos e só então confirmação de pagamento
+            for lista, intencao in (('pedidos_financiamento', 'ver_opcoes_financiamento'),
+                                    ('pedidos_info', 'ver_detalhes'),
+                                    ('confirmacoes', 'pagar')):
+                if pontuacao.get(lista):
+                    return {
+                        'intencao': intencao,
+                        'confianca': 1.0,
+                        'parametros': {}
+                    }
         
         # Contexto especial: se está em confirmacao_pagamento aguardando sim/não
         if contexto == 'confirmacao_pagamento':
-            confirmacoes_sim = ['sim', 'confirmo', 'ok', 'pode', 'pagar', 'executar', 'confirmar',
-                              'aceito', 'aceito essa proposta', 'executar proposta', 'executar estratégia',
-                              'pagar assim', 'aceito proposta', 'aceito estratégia', 'quero executar',
-                              'prosseguir', 'continuar', 'sim,', 'aceito,', 'executar,']
-            confirmacoes_nao = ['não', 'nao', 'cancelar', 'voltar', 'negativo']
-            
-            if any(conf in mensagem for conf in confirmacoes_sim):
-                return {
-                    'intencao': 'pagar',
-                    'confianca': 1.0,
-                    'parametros': {}
-                }
-            elif any(conf in mensagem for conf in confirmacoes_nao):
-                return {
-                    'intencao': 'voltar',
-                    'confianca': 1.0,
-                    'parametros': {}
-                }
+            for lista, intencao in (('confirmacoes_sim', 'pagar'), ('confirmacoes_nao', 'voltar')):
+                if pontuacao.get(lista):
+                    return {
+                        'intencao': intencao,
+                        'confianca': 1.0,
+                        'parametros': {}
+                    }
         
-        for intencao, keywords in self.INTENCOES.items():
-            score = sum(1 for kw in keywords if kw in mensagem)
+        # Maior pontuação; no empate vale a primeira intenção de INTENCOES
+        for intencao in self.INTENCOES:
+            score = pontuacao.get(intencao, 0)
             if score > melhor_score:
                 melhor_score = score
                 melhor_intencao = intencao
         
-        # Extrai parâmetros básicos
-        parametros = {}
-        
-        import re
-        
-        # Detecta "próximos X dias" ou "próximas X semanas"
-        proximos_match = re.search(r'pr[oó]xim[oa]s?\s+(\d+)\s+(dia|semana|mes)', mensagem)
-        if proximos_match:
-            quantidade = int(proximos_match.group(1))
-            unidade = proximos_match.group(2)
-            
-            hoje = datetime.now()
-            parametros['data'] = hoje.strftime('%Y-%m-%d')
-            
-            if unidade == 'dia':
-                data_fim = hoje + timedelta(days=quantidade)
-            elif unidade == 'semana':
-                data_fim = hoje + timedelta(weeks=quantidade)
-            else:  # mes
-                data_fim = hoje + timedelta(days=quantidade * 30)
-            
-            parametros['data_fim'] = data_fim.strftime('%Y-%m-%d')
+        # Parâmetros: "próximos X dias/semanas/meses" e datas AAAA-MM-DD
+        entidades = extrair_entidades(mensagem)
+        parametros = entidades.parametros()
+        if entidades.periodo is not None:
             melhor_intencao = 'ver_intervalo'
             melhor_score = 10  # Alta confiança
         
-        # Detecta datas no formato AAAA-MM-DD
-        datas = re.findall(r'\d{4}-\d{2}-\d{2}', mensagem)
-        if datas:
-            parametros['data'] = datas[0]
-            if len(datas) > 1:
-                parametros['data_fim'] = datas[1]
-        
         confianca = min(melhor_score / 2, 1.0)  # Normaliza
         
         return {
@@ -329,7 +476,6 @@ Responda APENAS com um JSON no formato:
         resposta = response.choices[0].message.content.strip()
         
         # Parse do JSON
-        import json
         try:
             # Remove markdown se houver
             if '```json' in resposta:
@@ -343,3 +489,19 @@ Responda APENAS com um JSON no formato:
             # Fallback
             return {'intencao': 'desconhecida', 'confianca': 0.0, 'parametros': {}}
 
+
+@lru_cache(maxsize=1)
+def obter_modelo_intencoes() -> ModeloIntencoes:
+    """Modelo local: o treinado offline (modelo_intencoes.npz) ou um treinado agora com INTENCOES"""
+    if os.path.exists(ARQUIVO_MODELO):
+        return ModeloIntencoes.carregar(ARQUIVO_MODELO)
+    return ModeloIntencoes.treinar(IntentClassifier.exemplos_treino())
+
+
+def info_cache_intencoes() -> InfoCacheIntencoes:
+    """Estatísticas do cache de classificações (hits, misses, expirados, tamanho)"""
+    return IntentClassifier.CACHE.info()
+
+
+def limpar_cache_intencoes():
+    IntentClassifier.CACHE.limpar()
@@ -0,0 +1,97 @@
+"""
+Normalização de texto para a classificação de intenções
+
+normalizar(): minúsculas, sem acentos, pontuação vira espaço e espaços
+repetidos viram um só ("Olá!! Opções?" -> "ola opcoes"). As tabelas de
+palavras-chave e as mensagens passam pela mesma normalização, então as listas
+não precisam repetir variantes com e sem acento ou pontuação.
+
+CorretorOrtografico corrige erros de digitação contra o vocabulário das
+palavras-chave com um índice de deleções pré-calculado (estilo SymSpell): cada
+palavra do vocabulário é indexada por todas as formas com até
+`distancia_maxima` letras removidas; uma palavra desconhecida da mensagem gera
+as suas deleções, busca candidatos no índice e confirma a distância de edição
+(Damerau-Levenshtein restrita).
+"""
+import unicodedata
+from itertools import combinations
+
+LIMITE_CORRECOES_GUARDADAS = 10_000
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sem acentos e pontuação, espaços simples"""
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in sem_acentos).split())
+
+
+def normalizar_termos(termos) -> list:
+    """Termos normalizados, sem repetições (mantém a ordem)"""
+    return list(dict.fromkeys(t for t in map(normalizar, termos) if t))
+
+
+def _delecoes(palavra: str, distancia: int) -> set:
+    """A palavra com 0..distancia letras removidas"""
+    formas = {palavra}
+    for removidas in range(1, min(distancia, len(palavra)) + 1):
+        for posicoes in combinations(range(len(palavra)), removidas):
+            formas.add(''.join(c for i, c in enumerate(palavra) if i not in posicoes))
+    return formas
+
+
+def distancia_edicao(a: str, b: str) -> int:
+    """Damerau-Levenshtein restrita (inserção, remoção, troca e transposição vizinha)"""
+    anterior2, anterior = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        atual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            custo = a[i - 1] != b[j - 1]
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + custo)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                atual[j] = min(atual[j], anterior2[j - 2] + 1)
+        anterior2, anterior = anterior, atual
+    return anterior[-1]
+
+
+class CorretorOrtografico:
+    """
+    Corrige palavras desconhecidas para a palavra do vocabulário mais próxima.
+
+    Só palavras com pelo menos `tamanho_minimo` letras são corrigidas: as
+    curtas têm vizinhos demais ("dois" fica a uma letra de "dias").
+    """
+
+    def __init__(self, vocabulario, distancia_maxima: int = 1, tamanho_minimo: int = 6):
+        # posição no vocabulário = prioridade no empate
+        self.vocabulario = {palavra: i for i, palavra in enumerate(dict.fromkeys(vocabulario))}
+        self.distancia_maxima = distancia_maxima
+        self.tamanho_minimo = tamanho_minimo
+        self._indice = {}
+        for palavra in self.vocabulario:
+            for forma in _delecoes(palavra, distancia_maxima):
+                self._indice.setdefault(forma, []).append(palavra)
+        self._corrigidas = {}
+
+    def corrigir_palavra(self, palavra: str) -> str:
+        if palavra in self.vocabulario or len(palavra) < self.tamanho_minimo or palavra.isdigit():
+            return palavra
+        correcao = self._corrigidas.get(palavra)
+        if correcao is None:
+            candidatos = dict.fromkeys(
+                candidato
+                for forma in _delecoes(palavra, self.distancia_maxima)
+                for candidato in self._indice.get(forma, ())
+            )
+            distancias = [(distancia_edicao(palavra, c), c) for c in candidatos]
+            validos = [(d, c) for d, c in distancias if d <= self.distancia_maxima]
+            # Menor distância; no empate, a primeira do vocabulário
+            correcao = min(validos, key=lambda item: (item[0], self.vocabulario[item[1]]))[1] if validos else palavra
+            if len(self._corrigidas) >= LIMITE_CORRECOES_GUARDADAS:
+                self._corrigidas.clear()
+            self._corrigidas[palavra] = correcao
+        return correcao
+
+    def corrigir(self, texto_normalizado: str) -> str:
+        """Texto (já normalizado) com cada palavra corrigida"""
+        return ' '.join(self.corrigir_palavra(p) for p in texto_normalizado.split())
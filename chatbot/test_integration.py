@@ -54,20 +54,28 @@ def testar_conversao_crewai():
         cnpj = "12.345.678/0001-90"
         adapter = DDACrewAdapter(cnpj)
         
-        # Obtém dados e converte
+        # Obtém dados e converte (em memória, sem arquivo temporário)
         overview, boletos_crewai, temp_path = adapter.preparar_para_sugestao_acao("2025-10-19")
+        assert temp_path is None, "Sem salvar_arquivo não deveria gerar arquivo"
         
         print(f"\n✅ Conversão realizada com sucesso!")
-        print(f"Arquivo temporário criado em: {temp_path}")
         print(f"Boletos convertidos: {len(boletos_crewai)}")
         
         for boleto in boletos_crewai[:3]:
             print(f"  • {boleto['codigo']}: R$ {boleto['valor']:,.2f} (juros diário: {boleto['juros_diario']*100:.2f}%)")
         
-        # Limpa arquivo temporário
-        if os.path.exists(temp_path):
+        # A análise com a lista em memória é a mesma do modo arquivo (compatibilidade)
+        from crew_integration import executar_analise_financeira
+        _, boletos_arquivo, temp_path = adapter.preparar_para_sugestao_acao("2025-10-19", salvar_arquivo=True)
+        try:
+            assert os.path.exists(temp_path)
+            analise_arquivo = executar_analise_financeira(5000.0, boletos_file_path=temp_path)
+        finally:
             os.remove(temp_path)
-            print(f"\n🗑️ Arquivo temporário removido")
+        analise_memoria = executar_analise_financeira(5000.0, boletos=boletos_crewai)
+        assert analise_memoria == analise_arquivo, "Análise em memória difere do modo arquivo"
+        assert 'custo_atraso_estimado' not in boletos_crewai[0], "A análise não deveria alterar a lista recebida"
+        print(f"\n🧠 Análise em memória idêntica à do arquivo temporário")
         
         return True
     except Exception as e:
@@ -173,6 +181,1419 @@ def testar_chatbot_manager():
         return False
 
 
+def testar_cache_dataset():
+    """Testa o cache de dataset do DDA (parse único e recarga quando o arquivo muda)"""
+    print("\n" + "=" * 60)
+    print("TESTE 6: Testando Cache do Dataset DDA")
+    print("=" * 60)
+    
+    try:
+        import json
+        import shutil
+        import tempfile
+        from queries_dda import carregar_dataset, sistema_boletos
+        
+        dda_original = os.path.join(os.path.dirname(__file__), '..', 'DDA', 'dda.json')
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dda_path = os.path.join(tmp_dir, 'dda.json')
+            shutil.copy(dda_original, dda_path)
+            
+            dataset = carregar_dataset(dda_path)
+            assert carregar_dataset(dda_path) is dataset, "Dataset deveria vir do cache"
+            
+            # O DataFrame compartilhado não pode ser alterado pelas consultas
+            try:
+                dataset.df.loc[dataset.df.index[0], 'valor'] = 0.0
+                raise AssertionError("Dataset em cache deveria ser somente leitura")
+            except ValueError:
+                pass
+            
+            # Alterar o arquivo invalida o cache
+            with open(dda_path, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            dados['data'] = dados['data'][:3]
+            with open(dda_path, 'w', encoding='utf-8') as f:
+                json.dump(dados, f)
+            
+            dataset_novo = carregar_dataset(dda_path)
+            assert dataset_novo is not dataset and len(dataset_novo) == 3, "Dataset deveria ser recarregado"
+            
+            atrasados = sistema_boletos("atrasados", cnpj="12.345.678/0001-90", dda_json_path=dda_path)
+            assert len(atrasados) <= 3
+        
+        print(f"\n✅ Cache do dataset funcionando corretamente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar cache do dataset: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_indice_por_cnpj():
+    """Testa se as consultas via índice por CNPJ batem com o filtro sobre o DataFrame"""
+    print("\n" + "=" * 60)
+    print("TESTE 7: Testando Índice por CNPJ do DDA")
+    print("=" * 60)
+    
+    try:
+        import pandas as pd
+        from queries_dda import (DatasetDDA, boletos_do_dia, boletos_atrasados,
+                                 dash_intervalo, detalhe_boleto)
+        
+        # Várias empresas intercaladas no mesmo arquivo
+        registros = []
+        for i in range(60):
+            registros.append({
+                "id": f"BOL{i:03d}",
+                "cnpj": f"00.000.000/000{i % 3}-00",
+                "beneficiario": f"Fornecedor {i % 7}",
+                "valor": 100.0 + i,
+                "data_vencimento": f"2025-10-{(i * 7) % 28 + 1:02d}",
+                "multa": 0.02,
+                "status": "PAGO" if i % 4 == 0 else "NAO_PAGO"
+            })
+        df = pd.DataFrame(registros)
+        df['data_vencimento'] = pd.to_datetime(df['data_vencimento'])
+        dataset = DatasetDDA(df)
+        
+        for cnpj in df['cnpj'].unique():
+            assert boletos_do_dia(dataset, cnpj, "2025-10-15") == boletos_do_dia(df, cnpj, "2025-10-15")
+            assert dash_intervalo(dataset, cnpj, "2025-10-05", "2025-10-20") == dash_intervalo(df, cnpj, "2025-10-05", "2025-10-20")
+            
+            por_id = lambda b: b['id']
+            assert (sorted(boletos_atrasados(dataset, cnpj, "2025-10-10"), key=por_id) ==
+                    sorted(boletos_atrasados(df, cnpj, "2025-10-10"), key=por_id))
+        
+        assert detalhe_boleto(dataset, "00.000.000/0001-00", "BOL004") == detalhe_boleto(df, "00.000.000/0001-00", "BOL004")
+        assert detalhe_boleto(dataset, "00.000.000/0000-00", "BOL004") is None
+        
+        print(f"\n✅ Índice por CNPJ consistente com o filtro completo!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar índice por CNPJ: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_batch_dda():
+    """Testa se a consulta em lote devolve o mesmo que as chamadas individuais"""
+    print("\n" + "=" * 60)
+    print("TESTE 8: Testando Consulta em Lote do DDA")
+    print("=" * 60)
+    
+    try:
+        from queries_dda import sistema_boletos, sistema_boletos_batch
+        
+        cnpj = "12.345.678/0001-90"
+        acoes = [
+            {"acao": "overview_dia", "dia": "2025-10-19"},
+            "atrasados",
+            {"acao": "dash_intervalo", "data_inicio": "2025-10-10", "data_fim": "2025-10-30"},
+            {"acao": "atrasados", "referencia": "2025-10-19"},
+            {"acao": "detalhe_boleto", "id_boleto": "BOL002"}
+        ]
+        
+        resultados = sistema_boletos_batch(acoes, cnpj=cnpj)
+        
+        assert len(resultados) == len(acoes)
+        for acao, resultado in zip(acoes, resultados):
+            if isinstance(acao, str):
+                acao = {"acao": acao}
+            parametros = {k: v for k, v in acao.items() if k != "acao"}
+            assert resultado == sistema_boletos(acao["acao"], cnpj=cnpj, **parametros), acao["acao"]
+        
+        print(f"\n✅ Consulta em lote consistente com as consultas individuais!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar consulta em lote: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_formato_colunar():
+    """Testa a conversão para o formato colunar e a escolha automática do formato"""
+    print("\n" + "=" * 60)
+    print("TESTE 9: Testando Formato Colunar do DDA")
+    print("=" * 60)
+    
+    try:
+        import json
+        import shutil
+        import tempfile
+        import numpy as np
+        from armazenamento_dda import CODIGO_NULO
+        from queries_dda import carregar_dataset, converter_para_colunar, sistema_boletos_batch
+        
+        cnpj = "12.345.678/0001-90"
+        acoes = [
+            {"acao": "overview_dia", "dia": "2025-10-19"},
+            {"acao": "dash_intervalo", "data_inicio": "2025-10-01", "data_fim": "2025-11-30"},
+            {"acao": "atrasados", "referencia": "2025-10-20"},
+            {"acao": "detalhe_boleto", "id_boleto": "BOL003"}
+        ]
+        dda_original = os.path.join(os.path.dirname(__file__), '..', 'DDA', 'dda.json')
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dda_path = os.path.join(tmp_dir, 'dda.json')
+            shutil.copy(dda_original, dda_path)
+            
+            resultados_json = sistema_boletos_batch(acoes, cnpj=cnpj, dda_json_path=dda_path)
+            
+            destino = converter_para_colunar(dda_path)
+            assert os.path.exists(os.path.join(destino, 'manifest.json'))
+            
+            # Com o formato colunar atualizado, ele é escolhido automaticamente
+            dataset = carregar_dataset(dda_path)
+            valores = dataset.df['valor'].to_numpy()
+            assert isinstance(valores.base, np.memmap) or isinstance(valores, np.memmap), "Coluna deveria vir do memory-map"
+            assert str(dataset.df['cnpj'].dtype) == 'category'
+            
+            resultados_colunar = sistema_boletos_batch(acoes, cnpj=cnpj, dda_json_path=dda_path)
+            assert resultados_colunar == resultados_json, "Resultados do formato colunar diferem do JSON"
+            
+            # Se o JSON mudar depois da conversão, o colunar fica desatualizado e o JSON é usado
+            with open(dda_path, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            dados['data'] = dados['data'][:2]
+            with open(dda_path, 'w', encoding='utf-8') as f:
+                json.dump(dados, f)
+            assert len(carregar_dataset(dda_path)) == 2
+
+            # Nulos ficam com o código reservado, e não viram as strings 'None'/'nan'
+            with open(dda_original, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            for i, boleto in enumerate(dados['data']):
+                if i % 3 == 0:
+                    boleto['beneficiario'] = None
+                boleto['observacao'] = None if i % 4 == 0 else f"obs {boleto['id']}"
+            nulos_path = os.path.join(tmp_dir, 'dda_nulos.json')
+            with open(nulos_path, 'w', encoding='utf-8') as f:
+                json.dump(dados, f)
+
+            resultados_json = sistema_boletos_batch(acoes, cnpj=cnpj, dda_json_path=nulos_path)
+            df_json = carregar_dataset(nulos_path).df
+            destino = converter_para_colunar(nulos_path)
+            resultados_colunar = sistema_boletos_batch(acoes, cnpj=cnpj, dda_json_path=nulos_path)
+            assert resultados_colunar == resultados_json, "Resultados do formato colunar diferem do JSON com nulos"
+
+            df_colunar = carregar_dataset(nulos_path).df
+            with open(os.path.join(destino, 'manifest.json'), 'r', encoding='utf-8') as f:
+                manifest = {coluna['nome']: coluna for coluna in json.load(f)['colunas']}
+            for nome in ('beneficiario', 'observacao'):
+                assert manifest[nome]['nulo'] == CODIGO_NULO
+                assert not {'None', 'nan'} & set(manifest[nome]['categorias'])
+                codigos = np.load(os.path.join(destino, manifest[nome]['arquivo']))
+                assert ((codigos == CODIGO_NULO) == df_json[nome].isna().to_numpy()).all()
+                assert df_colunar[nome].isna().tolist() == df_json[nome].isna().tolist()
+                assert df_colunar[nome].dropna().tolist() == df_json[nome].dropna().tolist()
+
+        print(f"\n✅ Formato colunar consistente com o JSON!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar formato colunar: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_ingestao_delta():
+    """Testa a ingestão incremental (log de alterações) e a compactação"""
+    print("\n" + "=" * 60)
+    print("TESTE 10: Testando Ingestão Incremental do DDA")
+    print("=" * 60)
+    
+    try:
+        import shutil
+        import tempfile
+        import threading
+        import time
+        from armazenamento_dda import anexar_delta, trava_delta
+        from queries_dda import caminho_delta, carregar_dataset, compactar, ingest, sistema_boletos
+        
+        cnpj = "12.345.678/0001-90"
+        dda_original = os.path.join(os.path.dirname(__file__), '..', 'DDA', 'dda.json')
+        novo_boleto = {
+            "id": "BOL900",
+            "cnpj": cnpj,
+            "beneficiario": "Fornecedor Novo",
+            "valor": 321.5,
+            "data_vencimento": "2025-10-19",
+            "multa": 0.02,
+            "status": "NAO_PAGO"
+        }
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dda_path = os.path.join(tmp_dir, 'dda.json')
+            shutil.copy(dda_original, dda_path)
+            
+            dataset = carregar_dataset(dda_path)
+            total = len(dataset)
+            overview_antes, boletos_antes = sistema_boletos("overview_dia", cnpj=cnpj, dia="2025-10-19", dda_json_path=dda_path)
+            
+            ingest([novo_boleto, {"op": "status", "cnpj": cnpj, "id": "BOL003", "status": "PAGO"}], dda_path)
+            
+            # Os eventos são aplicados sobre o dataset em cache, sem novo parse do JSON
+            assert carregar_dataset(dda_path) is dataset
+            assert len(dataset) == total + 1
+            
+            overview, boletos = sistema_boletos("overview_dia", cnpj=cnpj, dia="2025-10-19", dda_json_path=dda_path)
+            assert overview['total_boletos_no_dia'] == overview_antes['total_boletos_no_dia'] + 1
+            assert f"Boleto_{total}" in boletos, "Boleto novo deveria receber o próximo código"
+            detalhe = sistema_boletos("detalhe_boleto", cnpj=cnpj, id_boleto="BOL003", dda_json_path=dda_path)
+            assert detalhe['status'] == "PAGO"
+            
+            # A compactação incorpora o log ao JSON mantendo os códigos Boleto_X
+            compactar(dda_path)
+            assert not os.path.exists(caminho_delta(dda_path))
+            recarregado = carregar_dataset(dda_path)
+            assert recarregado is not dataset and len(recarregado) == total + 1
+            assert sistema_boletos("overview_dia", cnpj=cnpj, dia="2025-10-19", dda_json_path=dda_path) == (overview, boletos)
+            assert sistema_boletos("detalhe_boleto", cnpj=cnpj, id_boleto="BOL003", dda_json_path=dda_path)['status'] == "PAGO"
+            
+            # Evento acrescentado por outro escritor durante a compactação: a
+            # compactação espera a trava do log e o evento não se perde
+            ingest([{**novo_boleto, "id": "BOL901"}], dda_path)
+            com_trava = threading.Event()
+            
+            def outro_escritor():
+                with trava_delta(caminho_delta(dda_path)):
+                    com_trava.set()
+                    time.sleep(0.2)
+                    anexar_delta(caminho_delta(dda_path), [{"op": "upsert", "boleto": {**novo_boleto, "id": "BOL902"}}])
+            
+            escritor = threading.Thread(target=outro_escritor)
+            escritor.start()
+            com_trava.wait()
+            compactar(dda_path)
+            escritor.join()
+            assert not os.path.exists(caminho_delta(dda_path))
+            for id_boleto in ("BOL901", "BOL902"):
+                assert sistema_boletos("detalhe_boleto", cnpj=cnpj, id_boleto=id_boleto, dda_json_path=dda_path)['valor'] == 321.5
+        
+        print(f"\n✅ Ingestão incremental e compactação funcionando!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar ingestão incremental: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_agregado_diario():
+    """Testa os totais por dia usados por dash_intervalo e resumo_intervalo"""
+    print("\n" + "=" * 60)
+    print("TESTE 11: Testando Agregado Diário do DDA")
+    print("=" * 60)
+    
+    try:
+        import shutil
+        import tempfile
+        import pandas as pd
+        from queries_dda import carregar_dataset, ingest, sistema_boletos
+        
+        cnpj = "12.345.678/0001-90"
+        dda_original = os.path.join(os.path.dirname(__file__), '..', 'DDA', 'dda.json')
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dda_path = os.path.join(tmp_dir, 'dda.json')
+            shutil.copy(dda_original, dda_path)
+            
+            df = carregar_dataset(dda_path).df
+            periodo = df[(df['cnpj'] == cnpj) & (df['data_vencimento'] >= '2025-10-01') & (df['data_vencimento'] <= '2025-10-31')]
+            pagos = periodo[periodo['status'] == 'PAGO']
+            
+            resumo = sistema_boletos("resumo_intervalo", cnpj=cnpj, data_inicio="2025-10-01", data_fim="2025-10-31", dda_json_path=dda_path)
+            print(f"\n📊 Resumo de outubro: {resumo}")
+            assert resumo['quantidade'] == len(periodo)
+            assert abs(resumo['valor_total'] - periodo['valor'].sum()) < 0.01
+            assert resumo['quantidade_pagos'] == len(pagos)
+            assert resumo['quantidade_nao_pagos'] == len(periodo) - len(pagos)
+            
+            dash = sistema_boletos("dash_intervalo", cnpj=cnpj, data_inicio="2025-10-01", data_fim="2025-10-31", dda_json_path=dda_path)
+            esperado = periodo.groupby(periodo['data_vencimento'].dt.strftime('%Y-%m-%d')).size()
+            for dia, quantidade in dash['dias_com_mais_boletos'].items():
+                assert esperado[dia] == quantidade
+            
+            # Alterações do log atualizam o agregado da empresa
+            ingest([{"op": "status", "cnpj": cnpj, "id": periodo['id'].iloc[0], "status": "PAGO"
+                     if periodo['status'].iloc[0] != "PAGO" else "NAO_PAGO"}], dda_path)
+            atualizado = sistema_boletos("resumo_intervalo", cnpj=cnpj, data_inicio="2025-10-01", data_fim="2025-10-31", dda_json_path=dda_path)
+            assert atualizado['quantidade'] == resumo['quantidade']
+            assert atualizado['quantidade_pagos'] != resumo['quantidade_pagos']
+        
+        print(f"\n✅ Agregado diário consistente com os boletos!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar agregado diário: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_streaming_json():
+    """Testa a leitura do dda.json em streaming contra o json.load"""
+    print("\n" + "=" * 60)
+    print("TESTE 12: Testando Leitura em Streaming do DDA")
+    print("=" * 60)
+    
+    try:
+        import json
+        import tempfile
+        import pandas as pd
+        from armazenamento_dda import ler_dataframe_json, ler_dataframe_json_streaming
+        
+        dda_path = os.path.join(os.path.dirname(__file__), '..', 'DDA', 'dda.json')
+        
+        # Blocos minúsculos forçam boletos cortados entre uma leitura e outra
+        for tamanho_bloco in (7, 64, 1024 * 1024):
+            pd.testing.assert_frame_equal(ler_dataframe_json_streaming(dda_path, tamanho_bloco), ler_dataframe_json(dda_path))
+        
+        # Outras chaves no nível superior, campos opcionais e aninhados
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            caminho = os.path.join(tmp_dir, 'dda.json')
+            with open(caminho, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "meta": {"gerado_em": "2025-10-19", "filtros": ["]", "{"]},
+                    "data": [
+                        {"id": "A", "valor": 10, "data_vencimento": "2025-10-19"},
+                        {"id": "B", "valor": 2.5, "data_vencimento": "2025-10-20", "pagador": {"nome": "X"}},
+                        {"id": "C", "valor": None, "data_vencimento": "2025-10-20", "observacao": "ok"}
+                    ]
+                }, f, indent=2)
+            
+            df = ler_dataframe_json_streaming(caminho, 5)
+            assert list(df['id']) == ["A", "B", "C"]
+            assert df['valor'].isna().tolist() == [False, False, True]
+            assert df['pagador.nome'].tolist() == [None, "X", None]
+            assert df['observacao'].tolist() == [None, None, "ok"]
+            assert str(df['data_vencimento'].dtype) == 'datetime64[ns]'
+
+            # Vírgulas faltando, repetidas ou sobrando são rejeitadas como no json.load
+            malformados = [
+                '{"data": [{"id": "A"},, {"id": "B"}]}',
+                '{"data": [{"id": "A"}, {"id": "B"},]}',
+                '{"data": [, {"id": "A"}]}',
+                '{"data": [{"id": "A"} {"id": "B"}]}',
+                '{"meta": 1,, "data": [{"id": "A"}]}',
+                '{"meta": 1 "data": [{"id": "A"}]}',
+            ]
+            for conteudo in malformados:
+                with open(caminho, 'w', encoding='utf-8') as f:
+                    f.write(conteudo)
+                for tamanho_bloco in (1, 5, 7, 1024):
+                    try:
+                        ler_dataframe_json_streaming(caminho, tamanho_bloco)
+                    except (ValueError, KeyError):
+                        continue
+                    raise AssertionError(f"JSON malformado aceito (bloco {tamanho_bloco}): {conteudo}")
+
+        print(f"\n✅ Leitura em streaming equivalente ao json.load!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar leitura em streaming: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_boleto_compacto():
+    """Testa o registro compacto de boleto (Boleto) retornado pelos atrasados"""
+    print("\n" + "=" * 60)
+    print("TESTE 13: Testando Registro Compacto de Boleto")
+    print("=" * 60)
+    
+    try:
+        import json
+        from datetime import date
+        from boleto_dda import Boleto
+        from queries_dda import carregar_dataset, sistema_boletos
+        
+        cnpj = "12.345.678/0001-90"
+        atrasados = sistema_boletos("atrasados", cnpj=cnpj, referencia="2025-10-20")
+        assert atrasados, "Deveria haver boletos atrasados em 2025-10-20"
+        
+        df = carregar_dataset().df
+        for boleto in atrasados:
+            assert isinstance(boleto, Boleto)
+            assert not hasattr(boleto, '__dict__'), "Boleto deveria usar apenas __slots__"
+            
+            # Mesmo conteúdo do registro original do dda.json
+            linha = df[(df['cnpj'] == cnpj) & (df['id'] == boleto['id'])].iloc[0]
+            assert boleto['valor'] == linha['valor']
+            assert boleto.valor_centavos == round(linha['valor'] * 100)
+            assert boleto['data_vencimento'] == linha['data_vencimento'].strftime('%Y-%m-%d')
+            assert boleto.vencimento == linha['data_vencimento'].date() < date(2025, 10, 20)
+            assert boleto.get('beneficiario', 'Não informado') == linha['beneficiario']
+            assert list(boleto.keys()) == list(df.columns)
+            assert boleto == boleto.to_dict()
+        
+        # Beneficiários repetidos compartilham a mesma string
+        por_beneficiario = {}
+        for boleto in atrasados:
+            assert por_beneficiario.setdefault(boleto.beneficiario, boleto.beneficiario) is boleto.beneficiario
+        
+        json.dumps([boleto.to_dict() for boleto in atrasados], ensure_ascii=False)
+        print(f"\n📋 {len(atrasados)} boletos atrasados; exemplo: {atrasados[0]}")
+        
+        print(f"\n✅ Registro compacto equivalente ao dict!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar registro compacto: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_precificacao_vetorizada():
+    """Testa a precificação vetorizada (atraso, juros e prioridade de pagamento)"""
+    print("\n" + "=" * 60)
+    print("TESTE 14: Testando Precificação Vetorizada")
+    print("=" * 60)
+    
+    try:
+        from datetime import datetime
+        from financial_tools_simple import calcular_plano_pagamento
+        from precificacao import precificar_boletos, priorizar_pagamento, taxa_juros_diaria
+        
+        cnpj = "12.345.678/0001-90"
+        adapter = DDACrewAdapter(cnpj)
+        vencidos = adapter.obter_boletos_atrasados("2025-10-20")
+        
+        # Mesmo resultado da conta boleto a boleto
+        precos = precificar_boletos(
+            [b['valor'] for b in vencidos],
+            [b['data_vencimento'] for b in vencidos],
+            "2025-10-20",
+            multas=[b['multa'] for b in vencidos]
+        )
+        for boleto, dias, juros in zip(vencidos, precos['dias_atraso'], precos['juros']):
+            dias_esperado = (datetime(2025, 10, 20) - datetime.strptime(boleto['data_vencimento'], '%Y-%m-%d')).days
+            assert dias == dias_esperado
+            assert juros == adapter.calcular_juros_acumulado(boleto['valor'], boleto['multa'], dias_esperado)
+        
+        # Taxa diária: juros / valor, ou 0.2% sem juros ou com valor zerado
+        assert taxa_juros_diaria([100.0, 100.0, 0.0], [2.0, 0.0, 5.0]).tolist() == [0.02, 0.002, 0.002]
+        
+        # Prioridade: maior custo diário primeiro; boleto que não cabe não bloqueia os seguintes
+        ordem, pagar, saldo_restante = priorizar_pagamento([500.0, 100.0, 300.0], [0.01, 0.08, 0.02], 450.0)
+        assert ordem.tolist() == [1, 2, 0]
+        assert pagar.tolist() == [True, True, False]
+        assert saldo_restante == 50.0
+        
+        # O pagamento parcial do ChatbotManager vem do plano, com a mesma priorização
+        estrategia = calcular_plano_pagamento(450.0, boletos=[
+            {'codigo': 'A', 'id': 'A', 'valor': 500.0, 'juros_diario': 0.01, 'beneficiario': 'A'},
+            {'codigo': 'B', 'id': 'B', 'valor': 100.0, 'juros_diario': 0.08, 'beneficiario': 'B'},
+            {'codigo': 'C', 'id': 'C', 'valor': 300.0, 'juros_diario': 0.02, 'beneficiario': 'C'},
+        ]).pagamento_parcial()
+        assert [b['id'] for b in estrategia['boletos_pagar_agora']] == ['B', 'C']
+        assert [b['id'] for b in estrategia['boletos_deixar_depois']] == ['A']
+        assert estrategia['valor_pagar_agora'] == 400.0 and estrategia['custo_juros'] == 5.0
+        
+        print(f"\n✅ Precificação vetorizada consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar precificação vetorizada: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_selecao_otima():
+    """Testa a seleção ótima de pagamentos (mochila) contra força bruta e o guloso"""
+    print("\n" + "=" * 60)
+    print("TESTE 15: Testando Seleção Ótima de Pagamentos")
+    print("=" * 60)
+    
+    try:
+        import itertools
+        import numpy as np
+        from financial_tools_simple import calcular_plano_pagamento
+        from selecao_pagamento import selecionar_pagamentos
+        
+        # Caso em que o guloso erra: o maior custo diário ocupa o saldo sozinho
+        valores, juros = [600.0, 500.0, 500.0], [0.02, 0.02, 0.02]
+        guloso = selecionar_pagamentos(valores, juros, 1000.0, modo="guloso")
+        otimo = selecionar_pagamentos(valores, juros, 1000.0)
+        assert guloso['pagar'].tolist() == [True, False, False]
+        assert otimo['pagar'].tolist() == [False, True, True]
+        assert otimo['metodo'] == "mochila" and otimo['exato']
+        assert otimo['juros_evitados'] == 20.0 and otimo['saldo_restante'] == 0.0
+        
+        # Igual à força bruta em casos pequenos e sempre dentro do saldo
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            n = int(rng.integers(1, 9))
+            valores = np.round(rng.uniform(10, 900, n), 2)
+            juros = rng.choice([0.002, 0.01, 0.02], n)
+            saldo = float(np.round(rng.uniform(0, valores.sum()), 2))
+            melhor = max(
+                (valores * juros)[list(m)].sum()
+                for m in itertools.product([False, True], repeat=n)
+                if valores[list(m)].sum() <= saldo + 1e-9
+            )
+            resultado = selecionar_pagamentos(valores, juros, saldo)
+            assert abs(resultado['juros_evitados'] - melhor) < 1e-9
+            assert resultado['valor_pago'] <= saldo + 1e-9
+        
+        # Poucos boletos com saldo alto (tabela grande demais): mochila esparsa, ainda exata
+        valores = np.round(rng.uniform(1000, 15000, 10), 2)
+        juros = rng.choice([0.002, 0.01, 0.02], 10)
+        melhor = max(
+            (valores * juros)[list(m)].sum()
+            for m in itertools.product([False, True], repeat=10)
+            if valores[list(m)].sum() <= 50000.0
+        )
+        esparsa = selecionar_pagamentos(valores, juros, 50000.0)
+        assert esparsa['metodo'] == "mochila_esparsa" and esparsa['exato']
+        assert abs(esparsa['juros_evitados'] - melhor) < 1e-9 and esparsa['valor_pago'] <= 50000.0
+        
+        # Escala aproximada (tabela pequena) continua viável e não perde do guloso
+        valores = np.round(rng.uniform(50, 2000, 300), 2)
+        juros = rng.choice([0.002, 0.01, 0.02], 300)
+        aproximado = selecionar_pagamentos(valores, juros, 20000.0, limite_celulas=10_000)
+        assert aproximado['valor_pago'] <= 20000.0 and not aproximado['exato']
+        assert aproximado['juros_evitados'] >= selecionar_pagamentos(valores, juros, 20000.0, modo="guloso")['juros_evitados']
+        
+        # O pagamento parcial do ChatbotManager (via plano) usa a seleção ótima
+        estrategia = calcular_plano_pagamento(1000.0, boletos=[
+            {'codigo': 'A', 'id': 'A', 'valor': 600.0, 'juros_diario': 0.02, 'beneficiario': 'A'},
+            {'codigo': 'B', 'id': 'B', 'valor': 500.0, 'juros_diario': 0.02, 'beneficiario': 'B'},
+            {'codigo': 'C', 'id': 'C', 'valor': 500.0, 'juros_diario': 0.02, 'beneficiario': 'C'},
+        ]).pagamento_parcial()
+        assert [b['id'] for b in estrategia['boletos_pagar_agora']] == ['B', 'C']
+        assert [b['id'] for b in estrategia['boletos_deixar_depois']] == ['A']
+        assert estrategia['saldo_restante'] == 0.0 and estrategia['custo_juros'] == 12.0
+        
+        print(f"\n✅ Seleção ótima consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar seleção ótima: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_cronograma_caixa():
+    """Testa o cronograma de pagamentos dia a dia com os recebíveis"""
+    print("\n" + "=" * 60)
+    print("TESTE 16: Testando Cronograma de Caixa")
+    print("=" * 60)
+    
+    try:
+        import time
+        import numpy as np
+        from chatbot_manager import ChatbotManager
+        from fluxo_caixa import agendar_pagamentos
+        
+        recebiveis = [
+            {"data": "2025-10-03", "valor": 3000.0},
+            {"data": "2025-10-10", "valor": 4000.0},
+            {"data": "2025-12-31", "valor": 9999.0},  # fora do horizonte de 30 dias
+        ]
+        boletos = [
+            {'codigo': 'A', 'valor': 500.0, 'juros_diario': 0.01},
+            {'codigo': 'B', 'valor': 3000.0, 'juros_diario': 0.002},
+            {'codigo': 'C', 'valor': 6000.0, 'juros_diario': 0.02},
+        ]
+        cronograma = agendar_pagamentos(boletos, 1000.0, recebiveis, "2025-10-01", horizonte_dias=30)
+        pagamentos = {p['codigo']: p for p in cronograma['pagamentos']}
+        
+        # C (maior taxa) esperaria 9 dias = R$ 1.080 de juros > 8% de giro: financia hoje;
+        # A sai do saldo hoje e B espera o recebível de 03/10 (2 dias, R$ 12 de juros)
+        assert pagamentos['C']['origem'] == 'capital_giro' and pagamentos['C']['dia'] == 0
+        assert pagamentos['A']['origem'] == 'saldo' and pagamentos['A']['dia'] == 0
+        assert pagamentos['B']['origem'] == 'saldo' and pagamentos['B']['data'] == "2025-10-03"
+        assert cronograma['saques'] == [{'dia': 0, 'data': "2025-10-01", 'linha': 'capital_giro',
+                                         'valor': 6000.0, 'custo': 480.0}]
+        assert cronograma['custo_juros'] == 12.0 and cronograma['custo_total'] == 492.0
+        assert len(cronograma['fluxo_caixa']) == 31 and cronograma['fluxo_caixa'].min() >= 0
+        assert cronograma['fluxo_caixa'][-1] == 1000.0 + 7000.0 - 3500.0
+        
+        # Financia o boleto caro e deixa o barato esperar o recebível (não o contrário)
+        dois = [{'codigo': 'A', 'valor': 100.0, 'juros_diario': 0.001},
+                {'codigo': 'B', 'valor': 100.0, 'juros_diario': 0.005}]
+        troca = agendar_pagamentos(dois, 0.0, [{"data": "2025-10-11", "valor": 100.0}], "2025-10-01")
+        origens = {p['codigo']: (p['origem'], p['dia']) for p in troca['pagamentos']}
+        assert origens == {'A': ('saldo', 10), 'B': ('capital_giro', 0)}
+        assert round(troca['custo_total'], 6) == 9.0
+        
+        # Excesso de caixa no prazo: financia o menor boleto que resolve, não o maior
+        empate = agendar_pagamentos(
+            [{'codigo': 'A', 'valor': 500.0, 'juros_diario': 0.01, 'data_vencimento': "2025-10-01"},
+             {'codigo': 'B', 'valor': 2000.0, 'juros_diario': 0.01, 'data_vencimento': "2025-10-05"}],
+            2000.0, [{"data": "2025-10-18", "valor": 1000.0}], "2025-10-01", horizonte_dias=30)
+        origens = {p['codigo']: (p['origem'], p['dia']) for p in empate['pagamentos']}
+        assert origens == {'A': ('capital_giro', 0), 'B': ('saldo', 4)}
+        assert round(empate['custo_total'], 6) == 40.0
+        
+        # Com capital de giro limitado, adianta os recebíveis que sobram
+        limitado = agendar_pagamentos(boletos, 1000.0, recebiveis, "2025-10-01", horizonte_dias=30,
+                                      limite_capital_giro=1000.0)
+        assert {p['codigo']: p['origem'] for p in limitado['pagamentos']}['C'] in ('adiantamento', 'sem_cobertura')
+        assert limitado['fluxo_caixa'].min() >= 0
+        
+        # Escala: 90 dias e centenas de boletos
+        rng = np.random.default_rng(3)
+        recebiveis = [{"data": str(np.datetime64("2025-10-01") + int(d)), "valor": float(v)}
+                      for d, v in zip(rng.integers(0, 90, 200), rng.uniform(100, 5000, 200))]
+        boletos = [{'codigo': f"X{i}", 'valor': float(v), 'juros_diario': float(j),
+                    'data_vencimento': str(np.datetime64("2025-10-01") + int(d))}
+                   for i, (v, j, d) in enumerate(zip(rng.uniform(50, 5000, 500), rng.choice([0.002, 0.01, 0.02], 500),
+                                                      rng.integers(-30, 90, 500)))]
+        inicio = time.perf_counter()
+        grande = agendar_pagamentos(boletos, 5000.0, recebiveis, "2025-10-01")
+        tempo = (time.perf_counter() - inicio) * 1000
+        assert len(grande['pagamentos']) == 500 and grande['fluxo_caixa'].min() >= 0
+        print(f"   500 boletos × 90 dias: {tempo:.1f} ms")
+        
+        # O ChatbotManager mostra o cronograma nas opções de financiamento
+        manager = ChatbotManager("12.345.678/0001-90", saldo_atual=1000.0)
+        manager._gerar_visao_dia("2025-10-20")
+        resposta = manager._mostrar_opcoes_financiamento()
+        assert "CRONOGRAMA DE CAIXA" in resposta and "CRONOGRAMA DE PAGAMENTOS" in resposta
+        assert manager.contexto['cronograma']['data_referencia'] == "2025-10-20"
+        
+        print(f"\n✅ Cronograma de caixa consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar cronograma de caixa: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_financiamento_combinado():
+    """Testa a combinação ótima de produtos de financiamento e o seu cache"""
+    print("\n" + "=" * 60)
+    print("TESTE 17: Testando Financiamento Combinado")
+    print("=" * 60)
+    
+    try:
+        from chatbot_manager import ChatbotManager
+        from financial_tools_simple import calcular_melhor_financiamento
+        from financiamento import (ProdutoFinanciamento, info_cache_financiamento,
+                                   limpar_cache_financiamento, otimizar_financiamento)
+        
+        # Produtos padrão: capital de giro (mais barato, sem limite) cobre tudo
+        custo, metodo, total = calcular_melhor_financiamento(20000.0)
+        assert (custo, metodo, total) == (1600.0, "Capital de Giro (8%)", 21600.0)
+        
+        produtos = (
+            ProdutoFinanciamento("Capital de Giro", 0.08, limite=5000.0),
+            ProdutoFinanciamento("Adiantamento de Recebíveis", 0.15, limite=3000.0),
+            ProdutoFinanciamento("Cheque Especial", 0.30),
+            ProdutoFinanciamento("Linha Subsidiada", 0.03, limite=10000.0, disponivel_em="2025-11-01", tarifa=200.0),
+        )
+        
+        # Antes da linha subsidiada: preenche do mais barato ao mais caro
+        antes = otimizar_financiamento(12000.0, produtos, "2025-10-20")
+        assert [(t['produto'], t['valor']) for t in antes['tranches']] == [
+            ("Capital de Giro", 5000.0), ("Adiantamento de Recebíveis", 3000.0), ("Cheque Especial", 4000.0)]
+        assert antes['custo_total'] == 2050.0 and antes['valor_descoberto'] == 0.0
+        
+        # Depois dela: compensa a tarifa para 12 mil, mas não para 2 mil
+        depois = otimizar_financiamento(12000.0, produtos, "2025-11-05")
+        assert depois['metodo'] == "Linha Subsidiada (3%) + Capital de Giro (8%)" and depois['custo_total'] == 660.0
+        assert otimizar_financiamento(2000.0, produtos, "2025-11-05")['metodo'] == "Capital de Giro (8%)"
+        
+        # Limites insuficientes: informa o que fica descoberto
+        limitados = (ProdutoFinanciamento("Capital de Giro", 0.08, limite=1000.0),)
+        assert otimizar_financiamento(1500.0, limitados)['valor_descoberto'] == 500.0
+        
+        # Resultado em cache: as telas do chatbot reaproveitam o mesmo cálculo
+        limpar_cache_financiamento()
+        manager = ChatbotManager("12.345.678/0001-90", saldo_atual=1000.0)
+        manager._gerar_visao_dia("2025-10-20")
+        antes_opcoes = info_cache_financiamento()
+        manager._mostrar_opcoes_financiamento()
+        info = info_cache_financiamento()
+        assert info.misses == antes_opcoes.misses and info.hits > antes_opcoes.hits
+        
+        # Alterar o resultado devolvido não contamina o cache
+        primeiro = otimizar_financiamento(12000.0, produtos, "2025-10-20")
+        primeiro['tranches'].clear()
+        assert len(otimizar_financiamento(12000.0, produtos, "2025-10-20")['tranches']) == 3
+        
+        print(f"\n✅ Financiamento combinado consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar financiamento combinado: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_simulacao_cenarios():
+    """Testa a simulação em lote de cenários de saldo e taxas"""
+    print("\n" + "=" * 60)
+    print("TESTE 18: Testando Simulação de Cenários")
+    print("=" * 60)
+    
+    try:
+        import json
+        import tempfile
+        import numpy as np
+        from financial_tools_simple import calcular_melhor_financiamento
+        from financiamento import ProdutoFinanciamento, otimizar_financiamento
+        from selecao_pagamento import selecionar_pagamentos
+        from simulacao import simular_cenarios
+        
+        rng = np.random.default_rng(11)
+        boletos = [{'codigo': f"B{i}", 'valor': float(v), 'juros_diario': float(j)}
+                   for i, (v, j) in enumerate(zip(rng.integers(10, 900, 30), rng.choice([0.002, 0.01, 0.02], 30)))]
+        valores = [b['valor'] for b in boletos]
+        juros = [b['juros_diario'] for b in boletos]
+        total = sum(valores)
+        saldos = [0.0, 1500.0, 4000.0, 4000.0, total + 10]
+        taxas_giro, taxas_adiantamento = [0.08, 0.2], [0.15, 0.1]
+        
+        tabela = simular_cenarios(saldos, taxas_giro, taxas_adiantamento, boletos=boletos)
+        # Uma linha por cenário, na ordem saldo, giro, adiantamento (saldos repetidos
+        # são selecionados uma vez só, mas mantêm a sua linha)
+        assert len(tabela) == 20
+        assert (tabela[8:12] == tabela[12:16]).all()
+        assert tabela['saldo'].tolist()[:4] == [0.0] * 4 and tabela['taxa_giro'].tolist()[:4] == [0.08, 0.08, 0.2, 0.2]
+        
+        for linha in tabela:
+            # Seleção igual à de selecionar_pagamentos (tabela exata: valores inteiros)
+            selecao = selecionar_pagamentos(valores, juros, linha['saldo'])
+            assert linha['valor_pago'] == selecao['valor_pago']
+            assert abs(linha['juros_evitados'] - selecao['juros_evitados']) < 1e-9
+            assert linha['boletos_pagos'] == selecao['pagar'].sum()
+            
+            # Financiamento igual ao do otimizador com as taxas do cenário
+            produtos = (ProdutoFinanciamento("Capital de Giro", linha['taxa_giro']),
+                        ProdutoFinanciamento("Adiantamento de Recebíveis", linha['taxa_adiantamento'], limite=11800.0))
+            financiamento = otimizar_financiamento(max(total - linha['saldo'], 0), produtos)
+            assert abs(linha['custo_financiamento'] - financiamento['custo_total']) < 1e-9
+        
+        # Taxas padrão reproduzem calcular_melhor_financiamento
+        padrao = simular_cenarios([1500.0], boletos=boletos)
+        assert abs(padrao['custo_financiamento'][0] - calcular_melhor_financiamento(total - 1500.0)[0]) < 1e-9
+        
+        # Saldo suficiente: paga tudo e não financia
+        sobra = tabela[tabela['saldo'] == total + 10]
+        assert (sobra['boletos_pagos'] == 30).all() and (sobra['custo_financiamento'] == 0).all()
+        
+        # Modo compatível com arquivo
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(boletos, f)
+        try:
+            do_arquivo = simular_cenarios(saldos, taxas_giro, taxas_adiantamento, boletos_file_path=f.name)
+        finally:
+            os.remove(f.name)
+        assert (do_arquivo == tabela).all()
+        
+        print(f"\n✅ Simulação de cenários consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar simulação de cenários: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_risco_recebiveis():
+    """Testa a simulação Monte Carlo de atraso e inadimplência dos recebíveis"""
+    print("\n" + "=" * 60)
+    print("TESTE 19: Testando Risco dos Recebíveis")
+    print("=" * 60)
+    
+    try:
+        import time
+        from financial_tools_simple import RECEBIVEIS_FUTUROS, analisar_pagamento_boletos
+        from fluxo_caixa import agendar_pagamentos
+        from risco_recebiveis import ESTRATEGIAS, simular_risco_recebiveis
+        
+        boletos = [{'codigo': f"B{i}", 'valor': 400.0 + 150 * i, 'juros_diario': [0.002, 0.01, 0.02][i % 3]}
+                   for i in range(20)]
+        total = sum(b['valor'] for b in boletos)
+        
+        # Sem risco, o cronograma custa o mesmo que o plano determinístico
+        sem_risco = {r['origem']: (0.0, 0.0) for r in RECEBIVEIS_FUTUROS}
+        certo = simular_risco_recebiveis(boletos, 3000.0, data_referencia="2025-10-20", caminhos=200,
+                                         risco=sem_risco, semente=1)
+        plano = agendar_pagamentos(boletos, 3000.0, data_referencia="2025-10-20")
+        assert abs(certo['cronograma']['custo_esperado'] - plano['custo_total']) < 1e-6
+        assert certo['cronograma']['desvio'] < 1e-6
+        assert certo['capital_giro']['custo_esperado'] == (total - 3000.0) * 0.08
+        
+        # Códigos repetidos ou ausentes não confundem os boletos (o cronograma devolve o índice)
+        assert [p['indice'] for p in plano['pagamentos']] == sorted(
+            range(len(boletos)), key=lambda i: [p['codigo'] for p in plano['pagamentos']].index(f"B{i}"))
+        for variante in ([{**b, 'codigo': "MESMO"} for b in boletos],
+                         [{k: v for k, v in b.items() if k != 'codigo'} for b in boletos]):
+            resultado = simular_risco_recebiveis(variante, 3000.0, data_referencia="2025-10-20", caminhos=200,
+                                                 risco=sem_risco, semente=1)
+            assert resultado['cronograma'] == certo['cronograma']
+        
+        # Com risco: custo de cauda >= esperado e mesmo resultado com pool de processos
+        inicio = time.perf_counter()
+        risco = simular_risco_recebiveis(boletos, 3000.0, data_referencia="2025-10-20", caminhos=100_000, semente=3)
+        tempo = time.perf_counter() - inicio
+        print(f"   100.000 caminhos: {tempo * 1000:.0f} ms")
+        for nome in ESTRATEGIAS:
+            assert risco[nome]['cvar95'] >= risco[nome]['p95'] - 1e-9 >= risco[nome]['custo_esperado'] - 1e-6
+        assert risco['cronograma']['custo_esperado'] >= certo['cronograma']['custo_esperado'] - 1e-6
+        assert risco['melhor_estrategia'] in ESTRATEGIAS
+        
+        com_pool = simular_risco_recebiveis(boletos, 3000.0, data_referencia="2025-10-20", caminhos=30_000,
+                                            semente=5, processos=2)
+        sem_pool = simular_risco_recebiveis(boletos, 3000.0, data_referencia="2025-10-20", caminhos=30_000,
+                                            semente=5)
+        assert com_pool == sem_pool
+        
+        # Relatório: seção de risco só quando pedida
+        relatorio = analisar_pagamento_boletos(3000.0, boletos=boletos)
+        assert "RISCO DOS RECEBÍVEIS" not in relatorio
+        relatorio = analisar_pagamento_boletos(3000.0, boletos=boletos, caminhos_risco=2000,
+                                               data_referencia="2025-10-20")
+        assert "RISCO DOS RECEBÍVEIS (2,000 cenários" in relatorio
+        
+        print(f"\n✅ Risco dos recebíveis consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar risco dos recebíveis: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_plano_pagamento():
+    """Testa o plano de pagamento estruturado, seus formatos e o reaproveitamento na sessão"""
+    print("\n" + "=" * 60)
+    print("TESTE 20: Testando Plano de Pagamento")
+    print("=" * 60)
+    
+    try:
+        import json
+        import shutil
+        import tempfile
+        from chatbot_manager import ChatbotManager
+        from dda_crew_adapter import DDACrewAdapter
+        from financial_tools_simple import analisar_pagamento_boletos, calcular_plano_pagamento
+        from queries_dda import ingest
+        
+        boletos = [{'codigo': f"B{i}", 'valor': 300.0 + 120 * i, 'juros_diario': [0.002, 0.01, 0.02][i % 3]}
+                   for i in range(12)]
+        
+        # Texto idêntico ao relatório, montado só quando pedido e uma única vez
+        plano = calcular_plano_pagamento(2500.0, boletos=boletos)
+        assert plano._texto is None and plano._dict is None
+        texto = plano.para_texto()
+        assert texto == analisar_pagamento_boletos(2500.0, boletos=boletos)
+        assert plano.para_texto() is texto
+        
+        # Formatos estruturados coerentes com o texto
+        dados = json.loads(plano.para_json())
+        assert dados['total_boletos'] == 12
+        assert sorted(dados['pagar_com_saldo'] + dados['financiar']) == sorted(b['codigo'] for b in boletos)
+        assert abs(dados['divida_a_cobrir'] - (sum(b['valor'] for b in boletos) - 2500.0)) < 1e-6
+        assert dados['financiamento']['metodo'] in texto
+        assert plano.para_compacto().startswith(f"Pagar {len(dados['pagar_com_saldo'])} boletos")
+        assert "saldo suficiente" in calcular_plano_pagamento(1e6, boletos=boletos).para_compacto()
+        
+        # Sessão: o plano é calculado uma vez por dia/saldo/boletos pagos
+        manager = ChatbotManager("12.345.678/0001-90", saldo_atual=1000.0)
+        manager._gerar_visao_dia("2025-10-20")
+        plano_sessao = manager._obter_plano("2025-10-20")
+        manager._mostrar_opcoes_financiamento()
+        manager._obter_sugestao_ia()
+        assert manager._obter_plano("2025-10-20") is plano_sessao
+        assert manager.contexto['analise_ia'] == plano_sessao.para_texto()
+        manager.saldo_atual += 500.0
+        assert manager._obter_plano("2025-10-20") is not plano_sessao
+        
+        # Visão do dia consulta o DDA uma vez; as telas de opções usam os números do plano
+        cnpj = "12.345.678/0001-90"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dda_path = os.path.join(tmp_dir, 'dda.json')
+            shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'DDA', 'dda.json'), dda_path)
+            manager = ChatbotManager(cnpj, saldo_atual=1000.0)
+            manager.adapter = DDACrewAdapter(cnpj, dda_path)
+            consultas = []
+            obter_visao = manager.adapter.obter_visao_dia_completa
+            manager.adapter.obter_visao_dia_completa = lambda dia=None: consultas.append(dia) or obter_visao(dia)
+            manager._gerar_visao_dia("2025-10-20")
+            assert consultas == ["2025-10-20"]
+            
+            # A visão pode vir com dicts simples no lugar dos Boletos do DDA
+            overview, boletos_dia, vencidos = obter_visao("2025-10-20")
+            _, com_boletos, _ = manager.adapter.preparar_para_sugestao_acao(
+                "2025-10-20", visao=(dict(overview), boletos_dia, vencidos))
+            _, com_dicts, _ = manager.adapter.preparar_para_sugestao_acao(
+                "2025-10-20", visao=(dict(overview), boletos_dia, [dict(b) for b in vencidos]))
+            assert com_dicts == com_boletos
+            
+            plano_sessao = manager._obter_plano("2025-10-20")
+            resposta = manager._mostrar_opcoes_financiamento()
+            assert consultas == ["2025-10-20"]
+            custos = plano_sessao.custos_por_produto()
+            assert f"R$ {custos['capital_giro']:,.2f}" in resposta
+            assert f"R$ {plano_sessao.pagamento_parcial()['custo_juros']:,.2f}" in resposta
+            assert f"R$ {plano_sessao.otimizacao_financiamento()['custo_total']:,.2f}" in resposta
+            
+            # Boleto novo no DDA (ingest): mesmo dia, saldo e pagos, mas outro plano
+            ingest([{"id": "BOL901", "cnpj": cnpj, "beneficiario": "Fornecedor Novo", "valor": 321.5,
+                     "data_vencimento": "2025-10-20", "multa": 0.02, "status": "NAO_PAGO"}], dda_path)
+            plano_novo = manager._obter_plano("2025-10-20")
+            assert plano_novo is not plano_sessao
+            assert 'BOL901' not in {b['id'] for b in plano_sessao.boletos_ordenados}
+            assert 'BOL901' in {b['id'] for b in plano_novo.boletos_ordenados}
+            assert manager._obter_plano("2025-10-20") is plano_novo
+            
+            # Mesmos boletos pagos em outra ordem: mesmo plano
+            manager.boletos_pagos = ["Boleto_1", "Boleto_2"]
+            plano_pagos = manager._obter_plano("2025-10-20")
+            manager.boletos_pagos = ["Boleto_2", "Boleto_1"]
+            assert manager._obter_plano("2025-10-20") is plano_pagos
+            
+            # Sem plano (erro no cálculo): ainda há sugestão e nenhuma estratégia parcial antiga fica valendo
+            manager.boletos_pagos = []
+            manager._estrategia_parcial_atual = {'valor_pagar_agora': 1.0, 'boletos_pagar_agora': []}
+            def plano_indisponivel(dia=None, visao=None):
+                raise RuntimeError("motor indisponível")
+            manager._obter_plano = plano_indisponivel
+            resposta = manager._gerar_visao_dia("2025-10-20")
+            assert "SUGESTÃO DO QUITADOR" in resposta and "Não foi possível calcular o plano" in resposta
+            assert manager._estrategia_parcial_atual is None
+        
+        print(f"\n✅ Plano de pagamento consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar plano de pagamento: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_importacao_crewai():
+    """Testa que o caminho simples e o import de crew.py não carregam o CrewAI"""
+    print("\n" + "=" * 60)
+    print("TESTE 21: Testando Importação Preguiçosa do CrewAI")
+    print("=" * 60)
+    
+    try:
+        import subprocess
+        
+        # Processo novo que registra qualquer tentativa de importar o CrewAI
+        script = """
+import sys
+tentativas = []
+class Registro:
+    def find_spec(self, nome, caminho=None, alvo=None):
+        if nome.split('.')[0] in ('crewai', 'crewai_tools', 'langchain', 'pysqlite3'):
+            tentativas.append(nome)
+        return None
+sys.meta_path.insert(0, Registro())
+from crew_integration import executar_analise_financeira
+relatorio = executar_analise_financeira(1000.0, boletos=[{'codigo': 'A', 'valor': 1500.0, 'juros_diario': 0.01}])
+assert 'PLANO DE PAGAMENTO' in relatorio
+import crew
+servico = crew.obter_servico_crewai()
+assert servico is crew.obter_servico_crewai() and not servico.iniciado
+print(tentativas)
+"""
+        saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert saida.returncode == 0, saida.stderr
+        assert saida.stdout.strip() == "[]", saida.stdout
+        
+        print(f"\n✅ CrewAI só é importado sob demanda!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar importação do CrewAI: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_ferramenta_crewai():
+    """Testa que a ferramenta do CrewAI usa o mesmo motor da análise simples"""
+    print("\n" + "=" * 60)
+    print("TESTE 22: Testando Ferramenta CrewAI no Motor Único")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        from financial_tools import FinancialAnalysisTool
+        from financial_tools_simple import analisar_pagamento_boletos
+        
+        boletos_path = os.path.join(os.path.dirname(__file__), '..', 'Sugestao-acao', 'boletos.json')
+        ferramenta = FinancialAnalysisTool()
+        
+        # Mesmo relatório e mesmo financiamento nos dois pontos de entrada
+        for saldo in (0.0, 5000.0, 35000.0, 1e7):
+            assert ferramenta._run(saldo, boletos_path) == analisar_pagamento_boletos(saldo, boletos_path)
+        
+        # Erros de arquivo continuam com as mensagens da ferramenta
+        assert ferramenta._run(100.0, "/nao/existe.json").startswith("ERRO: Arquivo JSON não encontrado")
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            f.write("{invalido")
+        try:
+            assert ferramenta._run(100.0, f.name) == "ERRO: O arquivo JSON está em um formato inválido."
+        finally:
+            os.remove(f.name)
+        
+        print(f"\n✅ Ferramenta CrewAI e análise simples consistentes!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar ferramenta CrewAI: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_automato_intencoes():
+    """Testa o autômato de palavras-chave contra a classificação por substring"""
+    print("\n" + "=" * 60)
+    print("TESTE 23: Testando Autômato de Intenções")
+    print("=" * 60)
+    
+    try:
+        from automato_palavras import AutomatoPalavrasChave
+        from benchmark_chatbot import CONTEXTOS, MENSAGENS, _classificar_por_substring
+        from nlp_intent import IntentClassifier
+        
+        classificador = IntentClassifier()
+        
+        # Mesmas classificações de antes para as mensagens usuais
+        mensagens = MENSAGENS + [
+            "olá, tudo bem?", "e aí", "boletos hoje", "outra data", "pendentes", "ok", "prosseguir",
+            "detalhes", "quais boletos", "outras opções", "comparar opções", "valores por dia",
+            "menu", "não", "help", "como funciona", "negativo", "aceito, vamos", "mostrar boletos",
+            "yes", "efetuar pagamento", "xyz", "dashboard período", "continuar", "menus",
+        ]
+        for mensagem in mensagens:
+            for contexto in CONTEXTOS:
+                resultado = classificador._classificar_com_patterns(mensagem, contexto)
+                esperado = _classificar_por_substring(mensagem, contexto)
+                assert (resultado['intencao'], resultado['confianca']) == esperado, (mensagem, contexto)
+        
+        # Limites de palavra: palavras-chave dentro de outras palavras não contam mais
+        corrigidas = {
+            "pagar depois": 'pagar',  # "oi" em "depois"
+            "dois boletos": 'desconhecida',
+            "simulação": 'desconhecida',  # "sim"
+            "falar com alguém": 'desconhecida',  # "fala"
+            "hipoteca": 'desconhecida',  # "hi"
+            "okay": 'desconhecida',  # "ok"
+            "entregar relatório": 'desconhecida',  # "entre"
+        }
+        for mensagem, intencao in corrigidas.items():
+            assert _classificar_por_substring(mensagem, 'menu_principal')[0] != intencao
+            assert classificador._classificar_com_patterns(mensagem, 'menu_principal')['intencao'] == intencao
+        
+        # Autômato: sobreposições, pontuação por tabela e repetições na lista
+        automato = AutomatoPalavrasChave({'a': ['he', 'she', 'hers', 'he'], 'b': ['his', 'sim,']})
+        assert automato.encontrar("she said hers") == {'she', 'hers'}
+        assert automato.pontuar("he and his") == {'a': 2, 'b': 1}
+        assert automato.pontuar("sim, claro") == {'b': 1} and automato.pontuar("ushers") == {}
+        
+        print(f"\n✅ Autômato de intenções consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar autômato de intenções: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_modelo_intencoes():
+    """Testa o modelo local de intenções e o desvio para a LLM só em baixa confiança"""
+    print("\n" + "=" * 60)
+    print("TESTE 24: Testando Modelo Local de Intenções")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        import time
+        from modelo_intencoes import LIMIAR_CONFIANCA, ModeloIntencoes, carregar_frases
+        from nlp_intent import IntentClassifier, obter_modelo_intencoes
+        
+        modelo = obter_modelo_intencoes()
+        exemplos = IntentClassifier.exemplos_treino()
+        acertos = sum(modelo.prever(frase)[0] == intencao for frase, intencao in exemplos)
+        assert acertos / len(exemplos) >= 0.95
+        
+        # n-gramas de caracteres toleram erros de digitação; fora do domínio a confiança é baixa
+        assert modelo.prever("boletos venciddos")[0] == 'ver_atrasados'
+        assert modelo.prever("me mostra as opções de financiamento")[0] == 'ver_opcoes_financiamento'
+        assert modelo.prever("qual a previsão do tempo")[1] < LIMIAR_CONFIANCA
+        assert modelo.prever("xyz") == ('desconhecida', 0.0)
+        
+        inicio = time.perf_counter()
+        for _ in range(1000):
+            modelo.prever("quero ver as contas atrasadas")
+        tempo = (time.perf_counter() - inicio) * 1000
+        print(f"   predição local: {tempo:.0f} µs por mensagem")
+        assert tempo < 5000
+        
+        # Salvar e carregar mantém as predições
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "modelo.npz")
+            modelo.salvar(caminho)
+            carregado = ModeloIntencoes.carregar(caminho)
+            for frase in ("quero pagar os boletos", "bom diaa", "voltar pro menu"):
+                assert carregado.prever(frase) == modelo.prever(frase)
+            
+            # LLM só abaixo do limiar; frases classificadas por ela ficam registradas
+            classificador = IntentClassifier()
+            classificador.use_openai = True
+            classificador.arquivo_frases = os.path.join(pasta, "frases.jsonl")
+            chamadas = []
+            
+            def llm_falsa(mensagem, contexto):
+                chamadas.append(mensagem)
+                return {'intencao': 'ajuda', 'confianca': 0.9, 'parametros': {}}
+            
+            classificador._classificar_com_openai = llm_falsa
+            assert classificador.classificar_intencao("quero ver os boletos vencidos")['intencao'] == 'ver_atrasados'
+            assert classificador.classificar_intencao("mostra os detalhes")['intencao'] == 'ver_detalhes'
+            assert classificador.classificar_intencao("quero pagar todos os boletos")['intencao'] == 'pagar'
+            assert chamadas == []
+            assert classificador.classificar_intencao("qual a previsão do tempo")['intencao'] == 'ajuda'
+            assert chamadas == ["qual a previsão do tempo"]
+            assert carregar_frases(classificador.arquivo_frases) == [("qual a previsão do tempo", 'ajuda')]
+            
+            # Confirmações dependem do contexto e negações nunca viram 'pagar' localmente
+            chamadas.clear()
+            negadas = [
+                ("não aceito essa proposta", 'confirmacao_pagamento'),
+                ("nao confirmo", 'confirmacao_pagamento'),
+                ("pode cancelar, não quero executar", 'confirmacao_pagamento'),
+                ("não, não quero pagar", None),
+            ]
+            for mensagem, contexto in negadas:
+                local = classificador._classificar_localmente(mensagem.lower(), contexto)
+                assert local['intencao'] != 'pagar' or local['confianca'] < LIMIAR_CONFIANCA, mensagem
+                assert classificador.classificar_intencao(mensagem, contexto)['intencao'] == 'ajuda', mensagem
+            assert chamadas == [mensagem for mensagem, _ in negadas]
+            assert classificador.classificar_intencao("sim", 'confirmacao_pagamento')['intencao'] == 'pagar'
+            assert len(chamadas) == len(negadas)
+        
+        print(f"\n✅ Modelo local de intenções consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar modelo local de intenções: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_cache_intencoes():
+    """Testa o cache LRU/TTL das classificações de intenção"""
+    print("\n" + "=" * 60)
+    print("TESTE 25: Testando Cache de Intenções")
+    print("=" * 60)
+    
+    try:
+        from nlp_intent import CacheIntencoes, IntentClassifier, info_cache_intencoes, limpar_cache_intencoes
+        
+        # Mesmo cache para todas as sessões; chave com mensagem normalizada e contexto
+        limpar_cache_intencoes()
+        sessao_1, sessao_2 = IntentClassifier(), IntentClassifier()
+        chamadas = []
+        classificar = IntentClassifier._classificar
+        
+        def contar(self, mensagem, mensagem_lower, contexto):
+            chamadas.append((mensagem_lower, contexto))
+            return classificar(self, mensagem, mensagem_lower, contexto)
+        
+        IntentClassifier._classificar = contar
+        try:
+            primeiro = sessao_1.classificar_intencao("Sim", 'confirmacao_pagamento')
+            assert sessao_2.classificar_intencao("  sim ", 'confirmacao_pagamento') == primeiro
+            assert sessao_2.classificar_intencao("sim", 'opcoes_visao_dia')['intencao'] == 'pagar'
+            assert len(chamadas) == 2
+            
+            # Resultado devolvido é uma cópia; parâmetros relativos a hoje não são guardados
+            primeiro['intencao'] = 'alterado'
+            assert sessao_1.classificar_intencao("sim", 'confirmacao_pagamento')['intencao'] == 'pagar'
+            sessao_1.classificar_intencao("próximos 10 dias")
+            sessao_1.classificar_intencao("próximos 10 dias")
+            assert len(chamadas) == 4
+        finally:
+            IntentClassifier._classificar = classificar
+        
+        info = info_cache_intencoes()
+        assert (info.hits, info.misses, info.currsize) == (2, 4, 2)
+        
+        # Com LLM: o fallback depois de erro da LLM não é guardado (a próxima tenta de novo)
+        classificador = IntentClassifier()
+        classificador.use_openai = True
+        chamadas_llm = []
+        
+        def llm_com_erro(mensagem, contexto):
+            chamadas_llm.append(mensagem)
+            raise RuntimeError("LLM indisponível")
+        
+        classificador._classificar_com_openai = llm_com_erro
+        for _ in range(2):
+            assert classificador.classificar_intencao("não aceito essa proposta", 'confirmacao_pagamento')['intencao'] == 'pagar'
+        assert len(chamadas_llm) == 2
+        
+        # Resposta da LLM é guardada
+        classificador._classificar_com_openai = lambda mensagem, contexto: (
+            chamadas_llm.append(mensagem) or {'intencao': 'voltar', 'confianca': 0.9, 'parametros': {}})
+        for _ in range(2):
+            assert classificador.classificar_intencao("não aceito essa proposta", 'confirmacao_pagamento')['intencao'] == 'voltar'
+        assert len(chamadas_llm) == 3
+        limpar_cache_intencoes()
+        
+        # LRU limitado e validade (TTL)
+        agora = [0.0]
+        cache = CacheIntencoes(maxsize=2, ttl=10.0, relogio=lambda: agora[0])
+        for chave in ('a', 'b'):
+            cache.guardar(chave, {'intencao': chave, 'confianca': 1.0, 'parametros': {}})
+        assert cache.obter('a')['intencao'] == 'a'
+        cache.guardar('c', {'intencao': 'c', 'confianca': 1.0, 'parametros': {}})  # descarta 'b', o menos usado
+        assert cache.obter('b') is None and cache.obter('c')['intencao'] == 'c'
+        agora[0] = 11.0
+        assert cache.obter('a') is None
+        assert cache.info() == (2, 2, 1, 2, 1)
+        
+        print(f"\n✅ Cache de intenções consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar cache de intenções: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_normalizacao():
+    """Testa a normalização de texto e a correção de digitação na classificação"""
+    print("\n" + "=" * 60)
+    print("TESTE 26: Testando Normalização de Texto")
+    print("=" * 60)
+    
+    try:
+        from nlp_intent import IntentClassifier
+        from normalizacao import CorretorOrtografico, distancia_edicao, normalizar, normalizar_termos
+        
+        assert normalizar("  Olá!!  Opções?  ") == "ola opcoes"
+        assert normalizar("Me dê MAIS informações...") == "me de mais informacoes"
+        assert normalizar_termos(['Bom dia', 'bom dia!', 'olá', 'ola', '!!']) == ['bom dia', 'ola']
+        
+        # As listas não repetem mais variantes de acento e pontuação
+        for nome, termos in {**IntentClassifier.INTENCOES, **IntentClassifier.PADROES_CONTEXTO}.items():
+            assert len(IntentClassifier.TABELAS[nome]) == len(termos), nome
+        print(f"📋 Palavras-chave: {sum(map(len, IntentClassifier.TABELAS.values()))} normalizadas")
+        assert all(termo == normalizar(termo) for termos in IntentClassifier.TABELAS.values() for termo in termos)
+        
+        classificador = IntentClassifier()
+        classificador.use_openai = False
+        pares = [
+            ("Opções de financiamento", "opcoes de financiamento"),
+            ("Olá!", "ola"),
+            ("Não", "nao"),
+            ("Boletos VENCIDOS!!!", "boletos vencidos"),
+            ("me dê mais informações", "me de mais informacoes"),
+        ]
+        for com_acento, sem_acento in pares:
+            for contexto in (None, 'opcoes_visao_dia', 'confirmacao_pagamento'):
+                a = classificador._classificar_com_patterns(com_acento, contexto)
+                b = classificador._classificar_com_patterns(sem_acento, contexto)
+                assert a['intencao'] == b['intencao'] != 'desconhecida', (com_acento, contexto)
+        
+        # Erros de digitação corrigidos contra o vocabulário; palavras curtas não
+        assert distancia_edicao("atrasdos", "atrasados") == 1 and distancia_edicao("vencdios", "vencidos") == 1
+        assert classificador.texto_para_palavras_chave("boletos venciddos") == "boletos vencidos"
+        assert classificador.texto_para_palavras_chave("contas atrasdos") == "contas atrasados"
+        assert classificador.texto_para_palavras_chave("dois boletos") == "dois boletos"
+        assert classificador._classificar_com_patterns("boletos vencdios", None)['intencao'] == 'ver_atrasados'
+        classificador.corrigir_digitacao = False
+        assert classificador._classificar_com_patterns("boletos vencdios", None)['intencao'] != 'ver_atrasados'
+        
+        corretor = CorretorOrtografico(['vencidos', 'vendidos', 'boletos'])
+        assert corretor.corrigir("boletso vencidso") == "boletos vencidos"
+        assert corretor.corrigir_palavra("vencxdos") == "vencidos"  # empate: primeira do vocabulário
+        assert corretor.corrigir_palavra("financeiro") == "financeiro"
+        
+        print(f"\n✅ Normalização de texto consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar normalização de texto: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def testar_extracao_entidades():
+    """Testa a extração de períodos, datas e códigos de boleto em uma varredura"""
+    print("\n" + "=" * 60)
+    print("TESTE 27: Testando Extração de Entidades")
+    print("=" * 60)
+    
+    try:
+        from datetime import date, datetime, timedelta
+        from chatbot_manager import ChatbotManager
+        from extracao_entidades import Periodo, extrair_entidades
+        from nlp_intent import IntentClassifier
+        
+        entidades = extrair_entidades("boleto_3 e os próximos 2 meses a partir de 2025-10-20")
+        assert entidades.periodo == Periodo(2, 'meses')
+        assert entidades.datas == ('2025-10-20',)
+        assert entidades.codigos_boleto == (('BOLETO_3', '3'),) and entidades.numeros == ()
+        
+        assert extrair_entidades("boletos dos proximos 15 dias").periodo == Periodo(15, 'dias')
+        assert extrair_entidades("3 semanas próximas").periodo == Periodo(3, 'semanas')
+        assert extrair_entidades("Próximo 1 MÊS").periodo == Periodo(1, 'meses')
+        assert extrair_entidades("ver BOL001 e bol 2").codigos_boleto == (('BOL001', '001'), ('BOL 2', '2'))
+        entidades = extrair_entidades("2025-10-19 até 2025-10-30, uns 20 dias")
+        assert entidades.datas == ('2025-10-19', '2025-10-30') and entidades.numeros == (20,)
+        assert entidades.periodo is None
+        
+        # Parâmetros: período relativo a hoje, datas explícitas têm prioridade
+        hoje = date(2025, 10, 20)
+        assert extrair_entidades("próximas 2 semanas").parametros(hoje) == {'data': '2025-10-20', 'data_fim': '2025-11-03'}
+        assert extrair_entidades("próximos 10 dias a partir de 2025-11-01").parametros(hoje) == {
+            'data': '2025-11-01', 'data_fim': '2025-10-30'}
+        assert extrair_entidades("sem datas").parametros(hoje) == {}
+        
+        # IntentClassifier preenche os parâmetros com as entidades
+        classificador = IntentClassifier()
+        classificador.use_openai = False
+        resultado = classificador._classificar_com_patterns("boletos dos próximos 15 dias", None)
+        hoje = datetime.now().date()
+        assert resultado['intencao'] == 'ver_intervalo' and resultado['confianca'] == 1.0
+        assert resultado['parametros'] == {'data': hoje.strftime('%Y-%m-%d'),
+                                           'data_fim': (hoje + timedelta(days=15)).strftime('%Y-%m-%d')}
+        resultado = classificador._classificar_com_patterns("ver período de 2025-10-19 até 2025-10-30", None)
+        assert resultado['parametros'] == {'data': '2025-10-19', 'data_fim': '2025-10-30'}
+        
+        # ChatbotManager: intervalo automático e códigos de boleto
+        manager = ChatbotManager("12.345.678/0001-90", saldo_atual=1000.0)
+        intervalos = []
+        manager._processar_intervalo = lambda mensagem: intervalos.append(mensagem) or mensagem
+        manager._calcular_intervalo_automatico("quero ver 3 semanas próximas")
+        manager._calcular_intervalo_automatico("e os 5 seguintes?")
+        assert intervalos == [f"{hoje:%Y-%m-%d} até {hoje + timedelta(weeks=3):%Y-%m-%d}",
+                              f"{hoje:%Y-%m-%d} até {hoje + timedelta(days=5):%Y-%m-%d}"]
+        assert manager._calcular_intervalo_automatico("quero ver o período").startswith("❌")
+        
+        manager.contexto['boletos_dict'] = {'Boleto_1': {}, 'Boleto_12': {}}
+        manager.contexto['boletos_vencidos'] = [{'id': 'BOL_001'}]
+        assert manager._extrair_codigo_boleto("detalhes do boleto 12") == 'Boleto_12'
+        assert manager._extrair_codigo_boleto("detalhes do Boleto_1") == 'Boleto_1'
+        assert manager._extrair_codigo_boleto("e o bol_001?") == 'BOL_001'
+        assert manager._extrair_codigo_boleto("detalhes do boleto") is None
+        
+        print(f"\n✅ Extração de entidades consistente!")
+        return True
+    except Exception as e:
+        print(f"\n❌ Erro ao testar extração de entidades: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def main():
     """Executa todos os testes"""
     print("\n" + "=" * 60)
@@ -187,6 +1608,28 @@ def main():
     resultados.append(("Dashboard de Intervalo", testar_dash_intervalo()))
     resultados.append(("Boletos Atrasados", testar_boletos_atrasados()))
     resultados.append(("Chatbot Manager", testar_chatbot_manager()))
+    resultados.append(("Cache do Dataset DDA", testar_cache_dataset()))
+    resultados.append(("Índice por CNPJ", testar_indice_por_cnpj()))
+    resultados.append(("Consulta em Lote do DDA", testar_batch_dda()))
+    resultados.append(("Formato Colunar do DDA", testar_formato_colunar()))
+    resultados.append(("Ingestão Incremental do DDA", testar_ingestao_delta()))
+    resultados.append(("Agregado Diário do DDA", testar_agregado_diario()))
+    resultados.append(("Leitura em Streaming do DDA", testar_streaming_json()))
+    resultados.append(("Registro Compacto de Boleto", testar_boleto_compacto()))
+    resultados.append(("Precificação Vetorizada", testar_precificacao_vetorizada()))
+    resultados.append(("Seleção Ótima de Pagamentos", testar_selecao_otima()))
+    resultados.append(("Cronograma de Caixa", testar_cronograma_caixa()))
+    resultados.append(("Financiamento Combinado", testar_financiamento_combinado()))
+    resultados.append(("Simulação de Cenários", testar_simulacao_cenarios()))
+    resultados.append(("Risco dos Recebíveis", testar_risco_recebiveis()))
+    resultados.append(("Plano de Pagamento", testar_plano_pagamento()))
+    resultados.append(("Importação Preguiçosa do CrewAI", testar_importacao_crewai()))
+    resultados.append(("Ferramenta CrewAI no Motor Único", testar_ferramenta_crewai()))
+    resultados.append(("Autômato de Intenções", testar_automato_intencoes()))
+    resultados.append(("Modelo Local de Intenções", testar_modelo_intencoes()))
+    resultados.append(("Cache de Intenções", testar_cache_intencoes()))
+    resultados.append(("Normalização de Texto", testar_normalizacao()))
+    resultados.append(("Extração de Entidades", testar_extracao_entidades()))
     
     # Relatório final
     print("\n" + "=" * 60)